@@ -3,16 +3,38 @@
 class AudioProcessor extends AudioWorkletProcessor {
   constructor(options) {
     super(options);
-    this.bufferSize = options.processorOptions.bufferSize || 4096;
+    const processorOptions = (options && options.processorOptions) || {};
+    this.bufferSize = processorOptions.bufferSize || 4096;
     this.buffer = new Int16Array(this.bufferSize);
     this.bufferIndex = 0;
+    // Hooks that drive recording with start/stop messages pass autoStart: false
+    this.recording = processorOptions.autoStart !== false;
+
+    this.port.onmessage = (event) => {
+      if (event.data.type === 'start') {
+        this.recording = true;
+      } else if (event.data.type === 'stop') {
+        this.flush();
+        this.recording = false;
+        // After the last audio, so the main thread can end the utterance
+        this.port.postMessage({ type: 'stopped' });
+      }
+    };
+  }
+
+  flush() {
+    if (this.bufferIndex === 0) return;
+    const audio = this.buffer.slice(0, this.bufferIndex).buffer;
+    // Transfer instead of copy: the main thread sends it as-is in a binary frame
+    this.port.postMessage({ type: 'audio', audio }, [audio]);
+    this.bufferIndex = 0;
   }
 
   process(inputs, outputs, parameters) {
     const input = inputs[0];
-    if (input.length > 0) {
+    if (this.recording && input.length > 0) {
       const inputChannel = input[0]; // Assuming mono input
-      
+
       // Convert Float32Array [-1, 1] to Int16Array [-32768, 32767]
       for (let i = 0; i < inputChannel.length; i++) {
         const s = Math.max(-1, Math.min(1, inputChannel[i]));
@@ -20,8 +42,7 @@ class AudioProcessor extends AudioWorkletProcessor {
 
         if (this.bufferIndex >= this.bufferSize) {
           // Send the filled buffer back to the main thread
-          this.port.postMessage({ pcmData: this.buffer.buffer.slice(0) });
-          this.bufferIndex = 0;
+          this.flush();
         }
       }
     }
@@ -29,4 +50,4 @@ class AudioProcessor extends AudioWorkletProcessor {
   }
 }
 
-registerProcessor('audio-processor', AudioProcessor);
\ No newline at end of file
+registerProcessor('audio-processor', AudioProcessor);
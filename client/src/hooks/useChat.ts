@@ -34,25 +34,76 @@ export const useChat = (sessionId: string) => {
     setInput('');
     setIsLoading(true);
 
+    const botMessageId = uuidv4();
+    setMessages((prev) => [...prev, { id: botMessageId, role: 'assistant', content: '' }]);
+
+    const updateBotMessage = (content: string) => {
+      setMessages((prev) =>
+        prev.map((msg) => (msg.id === botMessageId ? { ...msg, content } : msg))
+      );
+    };
+
     try {
-      const response = await apiClient.post('/chat', {
-        session_id: sessionId,
-        message: input,
-        use_rag: isRagEnabled, // <-- Pass the flag to the backend
+      // Stream the answer token by token from the SSE endpoint
+      const response = await fetch(`${apiClient.defaults.baseURL}/chat/stream`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+          session_id: sessionId,
+          message: input,
+          use_rag: isRagEnabled, // <-- Pass the flag to the backend
+        }),
       });
-      const botMessage: Message = {
-        id: uuidv4(),
-        role: 'assistant',
-        content: response.data.response,
-      };
-      setMessages((prev) => [...prev, botMessage]);
+
+      if (!response.ok || !response.body) {
+        throw new Error(`Stream request failed with status ${response.status}`);
+      }
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      let answer = '';
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // SSE events are separated by a blank line
+        const events = buffer.split(/\r?\n\r?\n/);
+        buffer = events.pop() ?? '';
+
+        for (const rawEvent of events) {
+          let eventName = 'message';
+          let data = '';
+          for (const line of rawEvent.split(/\r?\n/)) {
+            if (line.startsWith('event:')) eventName = line.slice(6).trim();
+            else if (line.startsWith('data:')) data += line.slice(5).trim();
+          }
+          if (!data) continue;
+
+          const payload = JSON.parse(data);
+          if (eventName === 'token') {
+            answer += payload.token;
+            updateBotMessage(answer);
+          } else if (eventName === 'done') {
+            answer = payload.response || answer;
+            updateBotMessage(answer);
+          } else if (eventName === 'error') {
+            throw new Error(payload.response);
+          }
+        }
+      }
     } catch (error) {
       const errorMessage: Message = {
         id: uuidv4(),
         role: 'system',
         content: 'Error: Could not get a response. Please try again.',
       };
-      setMessages((prev) => [...prev, errorMessage]);
+      setMessages((prev) => [
+        ...prev.filter((msg) => msg.id !== botMessageId || msg.content),
+        errorMessage,
+      ]);
     } finally {
       setIsLoading(false);
     }
@@ -79,8 +130,26 @@ export const useChat = (sessionId: string) => {
       if (!response.ok) {
         throw new Error(result.detail || 'File upload failed');
       }
+
+      // The server processes the file in the background; poll the job until it finishes
+      let job = result;
+      while (job.status !== 'completed') {
+        if (job.status === 'failed' || job.status === 'cancelled') {
+          throw new Error(job.error || `File processing ${job.status}`);
+        }
+        toast.loading(
+          `Processing ${file.name}... ${job.chunks_stored ?? 0}/${job.chunks_parsed || '?'} chunks`,
+          { id: uploadToastId }
+        );
+        await new Promise((resolve) => setTimeout(resolve, 1000));
+        const statusResponse = await fetch(`http://localhost:8000/api/v1/upload/${result.job_id}`);
+        job = await statusResponse.json();
+        if (!statusResponse.ok) {
+          throw new Error(job.detail || 'Could not get upload status');
+        }
+      }
       
-      toast.success(result.message || 'File uploaded successfully!', { id: uploadToastId });
+      toast.success(`File processed: ${job.chunks_stored} chunks added to the knowledge base.`, { id: uploadToastId });
       
       const systemMessage: Message = {
         id: uuidv4(),
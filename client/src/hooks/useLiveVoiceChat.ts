@@ -1,5 +1,13 @@
 import { useState, useRef, useCallback } from 'react';
 import toast from 'react-hot-toast';
+import {
+  AUDIO_FORMAT,
+  FRAME_PCM16,
+  arrayBufferToBase64,
+  base64ToArrayBuffer,
+  decodeFrame,
+  encodeFrame,
+} from '@/lib/audioFrames';
 
 type ConnectionStatus = 'disconnected' | 'connecting' | 'connected' | 'error';
 type ConversationStatus = 'idle' | 'recording' | 'processing' | 'speaking';
@@ -53,6 +61,11 @@ export const useLiveVoiceChat = (isRagEnabled: boolean, sessionId: string) => {
   const recordingAudioContextRef = useRef<AudioContext | null>(null);
   const mediaStreamRef = useRef<MediaStream | null>(null);
   const audioWorkletNodeRef = useRef<AudioWorkletNode | null>(null);
+  // Set once the server confirms binary frames; old servers keep base64 JSON
+  const binaryAudioRef = useRef(false);
+  const sequenceRef = useRef(0);
+  // Server-side voice session; sent back on reconnect to keep the conversation
+  const resumeIdRef = useRef<string | null>(null);
 
   const processAudioQueue = useCallback(async () => {
     if (isPlayingRef.current || audioQueueRef.current.length === 0) return;
@@ -90,13 +103,18 @@ export const useLiveVoiceChat = (isRagEnabled: boolean, sessionId: string) => {
     if (socketRef.current || connectionStatus === 'connecting') return;
     setConnectionStatus('connecting');
     const ws = new WebSocket(`ws://localhost:8000/ws/v1/live-chat`);
+    ws.binaryType = 'arraybuffer';
+    binaryAudioRef.current = false;
+    sequenceRef.current = 0;
 
     ws.onopen = () => {
       // --- [NEW] Send initial configuration on connect ---
       ws.send(JSON.stringify({
         config: {
           isRagEnabled: isRagEnabled,
-          sessionId: sessionId
+          sessionId: sessionId,
+          audioFormat: AUDIO_FORMAT,
+          resumeId: resumeIdRef.current
         }
       }));
       // ------------------------------------------------
@@ -107,14 +125,21 @@ export const useLiveVoiceChat = (isRagEnabled: boolean, sessionId: string) => {
     };
 
     ws.onmessage = (event) => {
-        const data = JSON.parse(event.data);
-        if (data.audio_chunk) {
-            const byteString = atob(data.audio_chunk);
-            const byteArray = new Uint8Array(byteString.length);
-            for (let i = 0; i < byteString.length; i++) {
-                byteArray[i] = byteString.charCodeAt(i);
+        if (event.data instanceof ArrayBuffer) {
+            const frame = decodeFrame(event.data);
+            if (frame) {
+                audioQueueRef.current.push(frame.payload);
+                processAudioQueue();
             }
-            audioQueueRef.current.push(byteArray.buffer);
+            return;
+        }
+        const data = JSON.parse(event.data);
+        if (data.type === 'protocol') {
+            binaryAudioRef.current = data.audioFormat === AUDIO_FORMAT;
+        } else if (data.type === 'session') {
+            resumeIdRef.current = data.resumeId;
+        } else if (data.audio_chunk) {
+            audioQueueRef.current.push(base64ToArrayBuffer(data.audio_chunk));
             processAudioQueue();
         }
     };
@@ -150,14 +175,13 @@ export const useLiveVoiceChat = (isRagEnabled: boolean, sessionId: string) => {
         );
         audioWorkletNodeRef.current = workletNode;
         workletNode.port.onmessage = (event) => {
-            if (socketRef.current?.readyState === WebSocket.OPEN) {
-                const pcmData = new Uint8Array(event.data.pcmData);
-                let binary = '';
-                for (let i = 0; i < pcmData.byteLength; i++) {
-                    binary += String.fromCharCode(pcmData[i]);
+            if (event.data.type === 'audio' && socketRef.current?.readyState === WebSocket.OPEN) {
+                const pcmData: ArrayBuffer = event.data.audio;
+                if (binaryAudioRef.current) {
+                    socketRef.current.send(encodeFrame(FRAME_PCM16, sequenceRef.current++, pcmData));
+                } else {
+                    socketRef.current.send(JSON.stringify({ audio_chunk: arrayBufferToBase64(pcmData) }));
                 }
-                const base64Audio = btoa(binary);
-                socketRef.current.send(JSON.stringify({ audio_chunk: base64Audio }));
             }
         };
         const source = recordingAudioContextRef.current.createMediaStreamSource(stream);
@@ -1,4 +1,12 @@
 import { useState, useRef, useCallback, useEffect } from 'react';
+import {
+  AUDIO_FORMAT,
+  FRAME_PCM16,
+  arrayBufferToBase64,
+  base64ToArrayBuffer,
+  decodeFrame,
+  encodeFrame,
+} from '@/lib/audioFrames';
 
 export type SarvamConnectionStatus = 'disconnected' | 'connecting' | 'connected' | 'error';
 export type SarvamConversationStatus = 'idle' | 'recording' | 'processing' | 'speaking';
@@ -13,6 +21,15 @@ export function useSarvamVoiceChat(isRagEnabled: boolean, sessionId: string, sel
   const audioContextRef = useRef<AudioContext | null>(null);
   const workletRef = useRef<AudioWorkletNode | null>(null);
   const streamRef = useRef<MediaStream | null>(null);
+  // Back-to-back playback of streamed TTS segments
+  const playbackChainRef = useRef<Promise<void>>(Promise.resolve());
+  const nextStartTimeRef = useRef<number>(0);
+  const pendingSegmentsRef = useRef<number>(0);
+  // Set once the server confirms binary frames; old servers keep base64 JSON
+  const binaryAudioRef = useRef(false);
+  const sequenceRef = useRef(0);
+  // Server-side voice session; sent back on reconnect to keep the conversation
+  const resumeIdRef = useRef<string | null>(null);
 
   const connect = useCallback(async () => {
     if (wsRef.current?.readyState === WebSocket.OPEN) {
@@ -44,14 +61,52 @@ export function useSarvamVoiceChat(isRagEnabled: boolean, sessionId: string, sel
       await audioContext.audioWorklet.addModule('/worklets/audio-processor.js');
       
       const source = audioContext.createMediaStreamSource(stream);
-      const workletNode = new AudioWorkletNode(audioContext, 'audio-processor');
+      const workletNode = new AudioWorkletNode(audioContext, 'audio-processor', {
+        processorOptions: { bufferSize: 4096, autoStart: false }
+      });
       workletRef.current = workletNode;
 
       source.connect(workletNode);
 
       // Connect to Sarvam WebSocket
       const ws = new WebSocket('ws://localhost:8000/ws/v1/sarvam-live-chat');
+      ws.binaryType = 'arraybuffer';
       wsRef.current = ws;
+      binaryAudioRef.current = false;
+      sequenceRef.current = 0;
+
+      // Segments arrive sentence by sentence; queue each one to start
+      // right after the previous segment instead of overlapping them
+      const playSegment = (audioBuffer: ArrayBuffer) => {
+        // Decode in arrival order so segments are never reordered
+        playbackChainRef.current = playbackChainRef.current
+          .then(() => audioContext.decodeAudioData(audioBuffer))
+          .then(decodedBuffer => {
+            const source = audioContext.createBufferSource();
+            source.buffer = decodedBuffer;
+            source.connect(audioContext.destination);
+
+            const startAt = Math.max(audioContext.currentTime, nextStartTimeRef.current);
+            source.start(startAt);
+            nextStartTimeRef.current = startAt + decodedBuffer.duration;
+            pendingSegmentsRef.current += 1;
+            
+            setConversationStatus('speaking');
+            
+            source.onended = () => {
+              pendingSegmentsRef.current -= 1;
+              if (pendingSegmentsRef.current === 0) {
+                setConversationStatus('idle');
+              }
+            };
+          })
+          .catch(err => {
+            console.error('Error decoding audio:', err);
+            if (pendingSegmentsRef.current === 0) {
+              setConversationStatus('idle');
+            }
+          });
+      };
 
       ws.onopen = () => {
         console.log('Sarvam WebSocket connected');
@@ -63,12 +118,20 @@ export function useSarvamVoiceChat(isRagEnabled: boolean, sessionId: string, sel
             isRagEnabled,
             sessionId,
             language: selectedLanguage,
-            voice: selectedVoice
+            voice: selectedVoice,
+            audioFormat: AUDIO_FORMAT,
+            resumeId: resumeIdRef.current
           }
         }));
       };
 
       ws.onmessage = (event) => {
+        if (event.data instanceof ArrayBuffer) {
+          // Binary TTS segment; its text came in the preceding ai_response_segment
+          const frame = decodeFrame(event.data);
+          if (frame) playSegment(frame.payload);
+          return;
+        }
         try {
           const data = JSON.parse(event.data);
           console.log('Sarvam WebSocket message:', data);
@@ -83,34 +146,30 @@ export function useSarvamVoiceChat(isRagEnabled: boolean, sessionId: string, sel
               setConversationStatus('processing');
               break;
               
+            case 'protocol':
+              binaryAudioRef.current = data.audioFormat === AUDIO_FORMAT;
+              break;
+
+            case 'session':
+              resumeIdRef.current = data.resumeId;
+              console.log(`Sarvam session ${data.resumed ? 'resumed' : 'started'} on ${data.worker} (${data.turns} turns)`);
+              break;
+
             case 'audio_response':
-              // Play audio response
+              // Base64 fallback for servers without binary frames
               if (data.audio_chunk) {
-                const audioData = atob(data.audio_chunk);
-                const audioBuffer = new ArrayBuffer(audioData.length);
-                const view = new Uint8Array(audioBuffer);
-                for (let i = 0; i < audioData.length; i++) {
-                  view[i] = audioData.charCodeAt(i);
-                }
-                
-                audioContext.decodeAudioData(audioBuffer).then(decodedBuffer => {
-                  const source = audioContext.createBufferSource();
-                  source.buffer = decodedBuffer;
-                  source.connect(audioContext.destination);
-                  source.start();
-                  
-                  setConversationStatus('speaking');
-                  
-                  source.onended = () => {
-                    setConversationStatus('idle');
-                  };
-                }).catch(err => {
-                  console.error('Error decoding audio:', err);
-                  setConversationStatus('idle');
-                });
+                playSegment(base64ToArrayBuffer(data.audio_chunk));
               }
               break;
               
+            case 'ai_response_segment':
+              console.log(`AI Response segment ${data.index}:`, data.text);
+              break;
+
+            case 'ai_response':
+              console.log('AI Response:', data.text);
+              break;
+              
             case 'text_response':
               // Handle text response for display
               console.log('AI Response:', data.text);
@@ -143,14 +202,21 @@ export function useSarvamVoiceChat(isRagEnabled: boolean, sessionId: string, sel
 
       // Setup audio worklet message handling
       workletNode.port.onmessage = (event) => {
-        if (event.data.type === 'audio' && ws.readyState === WebSocket.OPEN && conversationStatus === 'recording') {
-          const audioData = event.data.audio;
-          const base64Audio = btoa(String.fromCharCode(...new Uint8Array(audioData)));
-          
-          ws.send(JSON.stringify({
-            type: 'audio_chunk',
-            audio_chunk: base64Audio
-          }));
+        // The worklet only emits audio between the start and stop messages
+        if (event.data.type === 'audio' && ws.readyState === WebSocket.OPEN) {
+          const audioData: ArrayBuffer = event.data.audio;
+          if (binaryAudioRef.current) {
+            ws.send(encodeFrame(FRAME_PCM16, sequenceRef.current++, audioData));
+          } else {
+            ws.send(JSON.stringify({
+              type: 'audio_chunk',
+              audio_chunk: arrayBufferToBase64(audioData)
+            }));
+          }
+        }
+        if (event.data.type === 'stopped' && ws.readyState === WebSocket.OPEN) {
+          // Let the server close the utterance without waiting for trailing silence
+          ws.send(JSON.stringify({ type: 'audio_end' }));
         }
       };
 
@@ -220,6 +286,7 @@ export function useSarvamVoiceChat(isRagEnabled: boolean, sessionId: string, sel
       if (workletRef.current) {
         workletRef.current.port.postMessage({ type: 'stop' });
       }
+
     }
   }, [conversationStatus]);
 
@@ -0,0 +1,56 @@
+// Binary audio frames shared with the server (app/services/audio_protocol.py).
+// Header: version (u8), frame type (u8), reserved (u16), sequence (u32), little endian.
+
+export const AUDIO_FORMAT = 'binary-v1';
+export const FRAME_HEADER_SIZE = 8;
+export const PROTOCOL_VERSION = 1;
+
+export const FRAME_PCM16 = 1; // Raw 16-bit mono PCM
+export const FRAME_ENCODED = 2; // A complete audio file (e.g. WAV)
+
+export interface AudioFrame {
+  type: number;
+  sequence: number;
+  payload: ArrayBuffer;
+}
+
+export function encodeFrame(type: number, sequence: number, payload: ArrayBuffer): ArrayBuffer {
+  const frame = new ArrayBuffer(FRAME_HEADER_SIZE + payload.byteLength);
+  const view = new DataView(frame);
+  view.setUint8(0, PROTOCOL_VERSION);
+  view.setUint8(1, type);
+  view.setUint16(2, 0, true);
+  view.setUint32(4, sequence >>> 0, true);
+  new Uint8Array(frame, FRAME_HEADER_SIZE).set(new Uint8Array(payload));
+  return frame;
+}
+
+export function decodeFrame(frame: ArrayBuffer): AudioFrame | null {
+  if (frame.byteLength < FRAME_HEADER_SIZE) return null;
+  const view = new DataView(frame);
+  if (view.getUint8(0) !== PROTOCOL_VERSION) return null;
+  return {
+    type: view.getUint8(1),
+    sequence: view.getUint32(4, true),
+    payload: frame.slice(FRAME_HEADER_SIZE),
+  };
+}
+
+// Fallback for servers that only speak the base64-in-JSON format
+export function base64ToArrayBuffer(base64: string): ArrayBuffer {
+  const byteString = atob(base64);
+  const bytes = new Uint8Array(byteString.length);
+  for (let i = 0; i < byteString.length; i++) {
+    bytes[i] = byteString.charCodeAt(i);
+  }
+  return bytes.buffer;
+}
+
+export function arrayBufferToBase64(buffer: ArrayBuffer): string {
+  const bytes = new Uint8Array(buffer);
+  let binary = '';
+  for (let i = 0; i < bytes.byteLength; i++) {
+    binary += String.fromCharCode(bytes[i]);
+  }
+  return btoa(binary);
+}
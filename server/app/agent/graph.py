@@ -1,15 +1,85 @@
+from contextlib import aclosing
+from functools import lru_cache, wraps
+from typing import AsyncIterator, Optional
 from langgraph.graph import StateGraph, END
+from langchain_core.runnables import RunnableLambda
 from app.agent.state import AgentState
+from app.core.telemetry import node_span
 from app.agent.nodes import (
     agent_entry,
     check_for_rag,
     retrieve_from_rag,
+    aretrieve_from_rag,
     run_web_search,
+    arun_web_search,
+    retrieve_rag_and_web,
+    aretrieve_rag_and_web,
     generate_with_context,
+    agenerate_with_context,
     generate_with_web_context,
+    agenerate_with_web_context,
+    generate_with_combined_context,
+    agenerate_with_combined_context,
     generate_direct,
+    agenerate_direct,
 )
 
+# Nodes whose LLM tokens make up the final answer
+GENERATE_NODES = {
+    "generate_direct",
+    "generate_with_context",
+    "generate_with_web_context",
+    "generate_with_combined_context",
+}
+
+# Route each node belongs to, the "route" label of its latency metric
+NODE_ROUTES = {
+    "agent_entry": "entry",
+    "check_for_rag": "entry",
+    "retrieve_from_rag": "rag",
+    "generate_with_context": "rag",
+    "run_web_search": "web_search",
+    "generate_with_web_context": "web_search",
+    "retrieve_rag_and_web": "rag_and_web",
+    "generate_with_combined_context": "rag_and_web",
+    "generate_direct": "direct",
+}
+
+
+def _timed(func):
+    """Records the node's latency, with the session id on its span."""
+    node = func.__name__
+    route = NODE_ROUTES.get(node, "other")
+
+    @wraps(func)
+    def wrapper(state):
+        with node_span(node, route, session_id=state.get("session_id")):
+            return func(state)
+
+    return wrapper
+
+
+def _atimed(afunc):
+    # agenerate_direct is timed as generate_direct
+    node = afunc.__name__[1:]
+    route = NODE_ROUTES.get(node, "other")
+
+    @wraps(afunc)
+    async def wrapper(state):
+        with node_span(node, route, session_id=state.get("session_id")):
+            return await afunc(state)
+
+    return wrapper
+
+
+def _node(func, afunc):
+    """
+    Wraps a node so that graph.invoke uses the sync function and
+    graph.ainvoke / astream_events use the native async one, instead of
+    running blocking LLM and I/O calls on the event loop.
+    """
+    return RunnableLambda(_timed(func), afunc=_atimed(afunc))
+
 def create_agent_graph():
     """
     Creates the LangGraph agent by defining nodes and the edges between them.
@@ -18,12 +88,15 @@ def create_agent_graph():
     graph = StateGraph(AgentState)
 
     # 1. Add all nodes to the graph
-    graph.add_node("agent_entry", agent_entry)
-    graph.add_node("retrieve_from_rag", retrieve_from_rag)
-    graph.add_node("run_web_search", run_web_search)
-    graph.add_node("generate_with_context", generate_with_context)
-    graph.add_node("generate_with_web_context", generate_with_web_context)
-    graph.add_node("generate_direct", generate_direct)
+    graph.add_node("agent_entry", _timed(agent_entry))
+    graph.add_node("retrieve_from_rag", _node(retrieve_from_rag, aretrieve_from_rag))
+    graph.add_node("run_web_search", _node(run_web_search, arun_web_search))
+    graph.add_node("generate_with_context", _node(generate_with_context, agenerate_with_context))
+    graph.add_node("generate_with_web_context", _node(generate_with_web_context, agenerate_with_web_context))
+    graph.add_node("generate_direct", _node(generate_direct, agenerate_direct))
+    # Fan-out path: documents and web searched in parallel, one generate step
+    graph.add_node("retrieve_rag_and_web", _node(retrieve_rag_and_web, aretrieve_rag_and_web))
+    graph.add_node("generate_with_combined_context", _node(generate_with_combined_context, agenerate_with_combined_context))
 
     # 2. Set the entry point for the graph
     graph.set_entry_point("agent_entry")
@@ -31,10 +104,11 @@ def create_agent_graph():
     # 3. Define the conditional routing from entry
     graph.add_conditional_edges(
         source="agent_entry",
-        path=check_for_rag,
+        path=_timed(check_for_rag),
         path_map={
             "rag_retrieval": "retrieve_from_rag",
             "web_search": "run_web_search",
+            "rag_and_web": "retrieve_rag_and_web",
             "generate_direct": "generate_direct"
         }
     )
@@ -42,11 +116,46 @@ def create_agent_graph():
     # 4. Define the edges for different paths
     graph.add_edge("retrieve_from_rag", "generate_with_context")
     graph.add_edge("run_web_search", "generate_with_web_context")
+    graph.add_edge("retrieve_rag_and_web", "generate_with_combined_context")
 
     # 5. Define the finish points for all paths
     graph.add_edge("generate_with_context", END)
     graph.add_edge("generate_with_web_context", END)
+    graph.add_edge("generate_with_combined_context", END)
     graph.add_edge("generate_direct", END)
 
     # 6. Compile the graph into a runnable executor
-    return graph.compile()
\ No newline at end of file
+    return graph.compile()
+
+
+@lru_cache(maxsize=1)
+def get_agent_graph():
+    """
+    The compiled agent graph, built once per process and shared by the chat
+    endpoint and every voice connection. The graph holds no per-request
+    state, so one instance serves concurrent invocations.
+    """
+    return create_agent_graph()
+
+
+async def astream_answer(agent_graph, inputs: dict, config: Optional[dict] = None) -> AsyncIterator[str]:
+    """
+    Yields the answer tokens of the generate nodes as they are produced.
+    If nothing was streamed (e.g. a node returned an error message), the
+    final message content is yielded once at the end instead.
+    """
+    streamed = False
+    final_output = None
+    # aclosing: a caller that stops early closes the graph run, and with it the LLM stream
+    async with aclosing(agent_graph.astream_events(inputs, config=config, version="v2")) as events:
+        async for event in events:
+            if event["event"] == "on_chat_model_stream" and event.get("metadata", {}).get("langgraph_node") in GENERATE_NODES:
+                token = event["data"]["chunk"].content
+                if token:
+                    streamed = True
+                    yield token
+            elif event["event"] == "on_chain_end" and not event.get("parent_ids"):
+                final_output = event["data"].get("output")
+
+    if not streamed and isinstance(final_output, dict) and final_output.get("messages"):
+        yield final_output["messages"][-1].content
@@ -1,11 +1,18 @@
 # from langchain_anthropic import ChatAnthropic
-from langchain_google_genai import ChatGoogleGenerativeAI
-# from langchain_openai import ChatOpenAI
-from langchain_groq import ChatGroq
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from itertools import zip_longest
 from app.services import vector_store
+from app.services.session_context import session_context
+from app.services.context_packer import context_packer
+from app.services.llm_router import RoutedChatModel, llm_router
+from app.services.intent_classifier import IntentPrediction, intent_classifier
 from app.tools import web_search
+from langchain_core.documents import Document
 from langchain_core.messages import HumanMessage
 from app.core.config import settings
+from app.core.logger import HOT, get_logger
 
 from app.agent.state import AgentState
 import os 
@@ -15,63 +22,27 @@ from dotenv import load_dotenv
 load_dotenv()
 
 os.environ["GOOGLE_API_KEY"] = os.getenv("GOOGLE_API_KEY")
-# os.environ["GROQ_API_KEY"] = os.getenv("GROQ_API_KEY")
-
-
-
-llm_gemini = ChatGoogleGenerativeAI(model=os.getenv("GEMINI_MODEL"), temperature=0)
-# llm_groq = ChatGroq(model=os.getenv("GROQ_MODEL"), temperature=0)
-
-llm_gemini_rag = ChatGoogleGenerativeAI(
-    model=os.getenv("GEMINI_MODEL"),
-    temperature=0.7,
-    convert_system_message_to_human=True # Important for Gemini
-)
-
-
-def route_to_llm(state: AgentState) -> str:
-    """According to the prompt decide which LLm to use"""
-    lastmessage = state["messages"][-1].content
-    
-    if "creative" in lastmessage.lower() or "write" in lastmessage.lower():
-        return "gemini"
-    
-    if "code" in lastmessage.lower() or "python" in lastmessage.lower():
-        return "groq"
-    
-    return "ginini"
-
-
-
-# def generate_gemini(state: AgentState):
-#     """Node to call Gimini."""
-#     human_messages = [msg for msg in state["messages"] if isinstance(msg, HumanMessage)] 
-#     response = llm_gemini.invoke(human_messages)
-#     return {"messages": [response]}
-
-def generate_gemini(state: AgentState):
-    last_msg = state["messages"][-1].content.strip()
-
-    if not last_msg:
-        raise ValueError("Last message content is empty — cannot invoke Gemini.")
-
-    # Ensure proper format: list of message objects
-    messages = [HumanMessage(content=last_msg)]
-    
-    response = llm_gemini.invoke(messages)
-    return {"messages": [response]}
-
-# def generate_groq(state: AgentState):
-#     """Node to call Groq."""
-#     response = llm_groq.invoke(state["messages"])
-#     return {"messages": [response]}
-
-
-# ---- similar for other model
 
+logger = get_logger(__name__)
 
 
+# Every LLM call goes through the provider router (Gemini, plus Groq and a
+# local OpenAI-compatible model when configured), which picks a provider per
+# call by task type, rolling p95 latency, error rate and token cost.
+llm = RoutedChatModel(router=llm_router, temperature=0)   # Task type classified per message
+llm_rag = RoutedChatModel(router=llm_router, task="rag", temperature=0)
+llm_web = RoutedChatModel(router=llm_router, task="web", temperature=0.7)
+llm_summary = RoutedChatModel(router=llm_router, task="summary", temperature=0)
 
+# Graph path for each intent. Product and order questions have no dedicated
+# nodes yet and are answered directly until they do.
+INTENT_ROUTES = {
+    "rag": "rag_retrieval",
+    "web_search": "web_search",
+    "direct": "generate_direct",
+    "product": "generate_direct",
+    "order": "generate_direct",
+}
 
 
 # def check_for_rag(state: AgentState):
@@ -93,60 +64,83 @@ def generate_gemini(state: AgentState):
 #     print("---ROUTING: Direct to LLM---")
 #     return "__end__" # LangGraph convention for routing to another router
 
-def check_for_rag(state: AgentState):
+def route_for(state: AgentState, prediction: IntentPrediction) -> str:
     """
-    Enhanced router that checks for RAG, web search keywords, or direct generation.
-    This node acts as a router to decide the agent's path.
-    Its string return value is used by the conditional edge router.
+    The agent's path for a classified message: RAG when the user turned it
+    on (RAG plus web search in parallel if the question is about something
+    current), otherwise the path for the message's intent. Pure, so the chat
+    endpoint can use it for the response-cache key without logging a route.
     """
-    print(f"--- ROUTER: Checking routing options ---")
-    print(f"use_rag flag: {state.get('use_rag')}")
-    
-    # Priority 1: Check for explicit RAG flag
+    # Priority 1: Check for explicit RAG flag. Questions about recency still
+    # need the web, so those fan out to both sources.
     if state.get("use_rag", False):
-        print("---ROUTING: RAG retrieval---")
+        if prediction.intent == "web_search" and prediction.source == "model":
+            return "rag_and_web"
         return "rag_retrieval"
-    
-    # Priority 2: Check for web search keywords
-    last_message = state["messages"][-1].content.lower()
-    search_keywords = [
-        "latest", "current", "recent", "news", "today", "2024", "2025",
-        "search for", "find information about", "what's happening",
-        "web search", "google", "internet", "online information",
-        "real-time", "live", "up-to-date", "newest"
-    ]
-    
-    if any(keyword in last_message for keyword in search_keywords):
-        print("---ROUTING: Web search---")
-        return "web_search"
-    
-    # Default: Direct generation
-    print("---ROUTING: Direct generation---")
-    return "generate_direct"
-    
-    
-    
+
+    # Priority 2: Intent of the last message
+    route = INTENT_ROUTES[prediction.intent]
+    if route == "rag_retrieval" and not state.get("session_id"):
+        route = "generate_direct"  # No session, so no documents to search
+    return route
+
+
+def check_for_rag(state: AgentState):
+    """
+    Router that picks the agent's path (see route_for). Reuses the intent the
+    chat endpoint classified for this request, and only runs the local intent
+    classifier (keyword rules when it is not confident) when there is none.
+    Its string return value is used by the conditional edge router.
+    """
+    prediction = state.get("intent") or intent_classifier.classify(state["messages"][-1].content)
+    route = route_for(state, prediction)
+    logger.info("agent.route", sample=HOT, route=route, use_rag=state.get("use_rag", False),
+                intent=prediction.intent, confidence=round(prediction.confidence, 2), source=prediction.source)
+    return route
+
+
 def retrieve_from_rag(state: AgentState):
     """
     Retrieves relevant documents from the ChromaDB vector store,
     filtered by the session_id from the agent's state.
     """
     
-    print("Retrieving context from RAG...")
+    logger.debug("node.start", node="retrieve_from_rag")
     user_query = state["messages"][-1].content
     session_id = state.get("session_id")
     
     if not session_id:
-        print("Warning: No session_id found in state for RAG retrieval.")
+        logger.warning("rag.no_session")
         return {"context": "Error: No session ID provided for document retrieval."}
     
-    retriever = vector_store.get_retriever(session_id=session_id)
+    # Hybrid vector + keyword search, near-duplicate snippets collapsed
+    retrieved_docs = session_context.retrieve(session_id, user_query)
     
-    retrieved_docs = retriever.invoke(user_query)
+    # Overlapping chunks merged, redundancy removed, fitted to the budget, with citations
+    context = context_packer.pack(user_query, retrieved_docs, route="rag").text
     
-    context = "\n\n".join([doc.page_content for doc in retrieved_docs])
+    logger.info("rag.retrieved", sample=HOT, session_id=session_id, documents=len(retrieved_docs), context_chars=len(context))
     
-    print(f"Retrieved context for session {session_id}: {context[:300]}...")
+    return {"context": context}
+
+async def aretrieve_from_rag(state: AgentState):
+    """Async version of retrieve_from_rag, used when the graph runs with ainvoke."""
+    
+    logger.debug("node.start", node="retrieve_from_rag")
+    user_query = state["messages"][-1].content
+    session_id = state.get("session_id")
+    
+    if not session_id:
+        logger.warning("rag.no_session")
+        return {"context": "Error: No session ID provided for document retrieval."}
+    
+    # Hybrid vector + keyword search (both legs concurrently), near-duplicate snippets collapsed
+    retrieved_docs = await session_context.aretrieve(session_id, user_query)
+    
+    # Overlapping chunks merged, redundancy removed, fitted to the budget, with citations
+    context = context_packer.pack(user_query, retrieved_docs, route="rag").text
+    
+    logger.info("rag.retrieved", sample=HOT, session_id=session_id, documents=len(retrieved_docs), context_chars=len(context))
     
     return {"context": context}
 
@@ -154,40 +148,164 @@ def retrieve_from_rag(state: AgentState):
 #     """Node to call the primary LLM directly without context."""
 #     print("Generating direct response...")
 #     # Using Gemini Pro as the default direct LLM
-#     response = llm_gemini.invoke(state["messages"])
+#     response = llm.invoke(state["messages"])
 #     return {"messages": [response]}
 
+def _format_search_results(search_results) -> str:
+    """Formats Tavily results into the context string used by the web generate node."""
+    if isinstance(search_results, list):
+        return "\n\n".join([
+            f"Source: {result.get('url', 'Unknown')}\n{result.get('content', '')}"
+            for result in search_results[:3]  # Limit to top 3 results
+        ])
+    return str(search_results)
+
 def run_web_search(state: AgentState):
     """Node to perform web search using Tavily."""
-    print("--- NODE: Running web search ---")
+    logger.debug("node.start", node="run_web_search")
     try:
         search_tool = web_search.get_web_search_tool()
         user_query = state["messages"][-1].content
-        print(f"Searching for: {user_query}")
+        logger.debug("web_search.query", query=user_query)
         
         search_results = search_tool.invoke({"query": user_query})
         
         # Format the search results for better context
-        if isinstance(search_results, list):
-            formatted_context = "\n\n".join([
-                f"Source: {result.get('url', 'Unknown')}\n{result.get('content', '')}"
-                for result in search_results[:3]  # Limit to top 3 results
-            ])
-        else:
-            formatted_context = str(search_results)
+        formatted_context = _format_search_results(search_results)
         
-        print(f"Web search results: {formatted_context[:200]}...")
+        logger.info("web_search.results", sample=HOT, context_chars=len(formatted_context))
         return {"context": formatted_context}
         
     except Exception as e:
-        print(f"Error during web search: {e}")
+        logger.error("web_search.failed", error=e)
         return {"context": f"Web search failed: {str(e)}. Please try asking a different question."}
 
-def generate_with_web_context(state: AgentState):
+async def arun_web_search(state: AgentState):
+    """Async version of run_web_search."""
+    logger.debug("node.start", node="run_web_search")
+    try:
+        search_tool = web_search.get_web_search_tool()
+        user_query = state["messages"][-1].content
+        logger.debug("web_search.query", query=user_query)
+        
+        search_results = await search_tool.ainvoke({"query": user_query})
+        
+        formatted_context = _format_search_results(search_results)
+        
+        logger.info("web_search.results", sample=HOT, context_chars=len(formatted_context))
+        return {"context": formatted_context}
+        
+    except Exception as e:
+        logger.error("web_search.failed", error=e)
+        return {"context": f"Web search failed: {str(e)}. Please try asking a different question."}
+
+def _merge_contexts(query: str, docs: list, search_results) -> str:
     """
-    Generates a response using the LLM with web search context.
+    Merges document chunks and web results into one context: interleaved
+    by rank so the best hit of each source comes first, then packed into
+    the route's token budget with a citation per passage.
+    """
+    web_docs = [
+        Document(page_content=result.get("content", ""), metadata={"source": result.get("url", "Unknown"), "web": True})
+        for result in (search_results if isinstance(search_results, list) else [])
+        if result.get("content")
+    ][:3]
+    interleaved = [doc for pair in zip_longest(docs, web_docs) for doc in pair if doc is not None]
+    if not interleaved:
+        return "Neither the uploaded documents nor the web search returned anything relevant."
+    return context_packer.pack(query, interleaved, route="rag_and_web").text
+
+def retrieve_rag_and_web(state: AgentState):
+    """
+    Fan-out node: document retrieval and web search run in parallel under
+    one deadline, then their results are merged for a single generate step.
+    A leg that misses the deadline is left out rather than waited for.
+
+    Running threads cannot be cancelled, so the legs get threads of their
+    own rather than a shared pool that overdue legs could fill, and the web
+    leg is given the deadline so its requests and retries end by it.
     """
-    print("--- NODE: Generating response with web context ---")
+    logger.debug("node.start", node="retrieve_rag_and_web")
+    user_query = state["messages"][-1].content
+    session_id = state.get("session_id")
+    deadline = time.monotonic() + settings.FANOUT_DEADLINE_SECONDS
+    pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="fanout")
+    legs = {"web": pool.submit(web_search.get_web_search_tool().invoke, {"query": user_query}, deadline=deadline)}
+    if session_id:
+        legs["rag"] = pool.submit(session_context.retrieve, session_id, user_query)
+    pool.shutdown(wait=False)   # Threads exit once their leg returns
+
+    done, not_done = wait(legs.values(), timeout=settings.FANOUT_DEADLINE_SECONDS)
+    results = {}
+    for name, future in legs.items():
+        if future in not_done:
+            logger.warning("fanout.deadline_missed", leg=name, deadline_seconds=settings.FANOUT_DEADLINE_SECONDS)
+        elif future.exception() is not None:
+            logger.warning("fanout.leg_failed", leg=name, error=future.exception())
+        else:
+            results[name] = future.result()
+    return {"context": _merge_contexts(user_query, results.get("rag", []), results.get("web", []))}
+
+async def aretrieve_rag_and_web(state: AgentState):
+    """Async version of retrieve_rag_and_web; latency is max(legs), capped by the deadline."""
+    logger.debug("node.start", node="retrieve_rag_and_web")
+    user_query = state["messages"][-1].content
+    session_id = state.get("session_id")
+    legs = {"web": asyncio.create_task(web_search.get_web_search_tool().ainvoke({"query": user_query}))}
+    if session_id:
+        # Picks up a speculative retrieval already started for this query
+        legs["rag"] = asyncio.create_task(session_context.aretrieve(session_id, user_query))
+
+    done, pending = await asyncio.wait(legs.values(), timeout=settings.FANOUT_DEADLINE_SECONDS)
+    for task in pending:
+        task.cancel()
+    results = {}
+    for name, task in legs.items():
+        if task in pending:
+            logger.warning("fanout.deadline_missed", leg=name, deadline_seconds=settings.FANOUT_DEADLINE_SECONDS)
+        elif task.exception() is not None:
+            logger.warning("fanout.leg_failed", leg=name, error=task.exception())
+        else:
+            results[name] = task.result()
+    return {"context": _merge_contexts(user_query, results.get("rag", []), results.get("web", []))}
+
+def _build_combined_prompt(state: AgentState) -> list:
+    """Builds the messages for the generate node after the fan-out."""
+    user_query = state["messages"][-1].content
+    context = state.get("context", "")
+
+    prompt = f"""You are a helpful shopping and research assistant. Answer the user's question using the context below, which combines snippets from the user's uploaded documents and current web search results.
+
+- Use the document snippets for facts about the user's own catalogue, orders or files.
+- Use the web results (labelled "Web:") for anything that may have changed recently.
+- Cite the numbers of the snippets you used, like [1].
+- If the two disagree, say so and explain which one is more recent.
+- If neither contains the answer, say that you could not find it.
+
+CONTEXT:
+---
+{context}
+---
+
+USER'S QUESTION:
+"{user_query}"
+"""
+    return state["messages"][:-1] + [("user", prompt)]
+
+def generate_with_combined_context(state: AgentState):
+    """Generates the answer from the merged document + web context."""
+    logger.debug("node.start", node="generate_with_combined_context")
+    response = llm_web.invoke(_build_combined_prompt(state))
+    return {"messages": [response]}
+
+async def agenerate_with_combined_context(state: AgentState):
+    """Async version of generate_with_combined_context."""
+    logger.debug("node.start", node="generate_with_combined_context")
+    response = await llm_web.ainvoke(_build_combined_prompt(state))
+    return {"messages": [response]}
+
+def _build_web_prompt(state: AgentState) -> list:
+    """Builds the messages for the web-context generate node."""
     user_query = state["messages"][-1].content
     context = state.get("context", "")
 
@@ -206,22 +324,38 @@ Instructions:
 
 Answer:"""
 
+    return [HumanMessage(content=prompt)]
+
+def generate_with_web_context(state: AgentState):
+    """
+    Generates a response using the LLM with web search context.
+    """
+    logger.debug("node.start", node="generate_with_web_context")
     try:
-        messages = [HumanMessage(content=prompt)]
-        response = llm_gemini_rag.invoke(messages)
-        print(f"Generated web response: {response.content[:100]}...")
+        messages = _build_web_prompt(state)
+        response = llm_web.invoke(messages)
+        logger.debug("web.generated", chars=len(response.content))
         return {"messages": [response]}
     except Exception as e:
-        print(f"Error generating web response: {e}")
+        logger.error("web.generate_failed", error=e)
         error_response = HumanMessage(content=f"I apologize, but I encountered an error while processing the web search results: {str(e)}")
         return {"messages": [error_response]}
 
-def generate_with_context(state: AgentState):
-    """
-    Generates a response using the LLM with the retrieved context.
-    This is the final step in the RAG path.
-    """
-    print("--- NODE: Generating response with context ---")
+async def agenerate_with_web_context(state: AgentState):
+    """Async version of generate_with_web_context."""
+    logger.debug("node.start", node="generate_with_web_context")
+    try:
+        messages = _build_web_prompt(state)
+        response = await llm_web.ainvoke(messages)
+        logger.debug("web.generated", chars=len(response.content))
+        return {"messages": [response]}
+    except Exception as e:
+        logger.error("web.generate_failed", error=e)
+        error_response = HumanMessage(content=f"I apologize, but I encountered an error while processing the web search results: {str(e)}")
+        return {"messages": [error_response]}
+
+def _build_rag_prompt(state: AgentState) -> list:
+    """Builds the messages for the RAG generate node."""
     user_query = state["messages"][-1].content
     context = state.get("context", "")
 
@@ -230,7 +364,7 @@ def generate_with_context(state: AgentState):
 
     If the user's question is general, like "what is this document about?" or "summarize this file", provide a concise summary of the provided context.
 
-    If the user asks a specific question, answer it directly using only the information in the snippets.
+    If the user asks a specific question, answer it directly using only the information in the snippets, and cite the snippet numbers you used, like [1].
 
     If the snippets do not contain the answer to a specific question, state that the provided document doesn't seem to contain that information.
 
@@ -245,11 +379,23 @@ def generate_with_context(state: AgentState):
     # --------------------------
 
     # We replace the user's last message with this new, enriched prompt
-    messages_for_llm = state["messages"][:-1] + [
+    return state["messages"][:-1] + [
         ( "user", prompt)
     ]
 
-    response = llm_gemini.invoke(messages_for_llm)
+def generate_with_context(state: AgentState):
+    """
+    Generates a response using the LLM with the retrieved context.
+    This is the final step in the RAG path.
+    """
+    logger.debug("node.start", node="generate_with_context")
+    response = llm_rag.invoke(_build_rag_prompt(state))
+    return {"messages": [response]}
+
+async def agenerate_with_context(state: AgentState):
+    """Async version of generate_with_context."""
+    logger.debug("node.start", node="generate_with_context")
+    response = await llm_rag.ainvoke(_build_rag_prompt(state))
     return {"messages": [response]}
 
 def generate_direct(state: AgentState):
@@ -257,12 +403,18 @@ def generate_direct(state: AgentState):
     Generates a response using the LLM directly, without any RAG context.
     This is the standard chat path.
     """
-    print("--- NODE: Generating direct response (no RAG) ---")
-    response = llm_gemini.invoke(state["messages"])
+    logger.debug("node.start", node="generate_direct")
+    response = llm.invoke(state["messages"])
+    return {"messages": [response]}
+
+async def agenerate_direct(state: AgentState):
+    """Async version of generate_direct."""
+    logger.debug("node.start", node="generate_direct")
+    response = await llm.ainvoke(state["messages"])
     return {"messages": [response]}
 
 
 def agent_entry(state: AgentState):
     """A dummy entry point node that does nothing but start the graph."""
-    print("--- AGENT ENTRY ---")
+    logger.debug("node.start", node="agent_entry")
     return {} # It's a valid node because it returns a dictionary
\ No newline at end of file
@@ -1,5 +1,6 @@
 from typing import TypedDict,List
 from langchain_core.messages import BaseMessage
+from app.services.intent_classifier import IntentPrediction
 
 
 class AgentState(TypedDict):
@@ -7,6 +8,7 @@ class AgentState(TypedDict):
     context: str # To hold retrive context
     use_rag: bool # Flag to decide if we should use rag or not
     session_id: str
+    intent: IntentPrediction # Classified once by the chat endpoint; the router reuses it
     
     
     
\ No newline at end of file
@@ -1,10 +1,39 @@
-from fastapi import APIRouter
+import asyncio
+import json
+from contextlib import aclosing
+from fastapi import APIRouter, Request
 from pydantic import BaseModel
-from langchain_core.messages import HumanMessage
-from app.agent.graph import create_agent_graph
+from sse_starlette.sse import EventSourceResponse
+from langchain_core.messages import AIMessage, HumanMessage
+from app.agent.graph import GENERATE_NODES, get_agent_graph
+from app.agent.nodes import llm_summary, route_for
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.core.session import ConversationMemory
+from app.services.context_packer import context_packer
+from app.services.intent_classifier import IntentPrediction, intent_classifier
+from app.services.llm_router import llm_router
+from app.services.response_cache import response_cache
+from app.services.session_context import session_context
+from app.tools.web_search import web_search_client
 
+logger = get_logger(__name__)
 
-agent_executer = create_agent_graph()
+agent_executer = get_agent_graph()
+memory = ConversationMemory(summarizer=llm_summary)
+
+# Keep references to background summarisation tasks so they are not GC'd
+_background_tasks = set()
+
+# Graph nodes whose start tells the client which route the router picked
+ROUTE_NODES = {
+    "retrieve_from_rag": "rag_retrieval",
+    "run_web_search": "web_search",
+    "retrieve_rag_and_web": "rag_and_web",
+    "generate_direct": "generate_direct",
+}
+# Nodes that produce the context handed to the generate step
+RETRIEVAL_NODES = {"retrieve_from_rag", "run_web_search", "retrieve_rag_and_web"}
 
 router = APIRouter()
 
@@ -27,24 +56,243 @@ class ChatRequest(BaseModel):
     
 #     return {"response": response["messages"][-1].content}
 
+def start_speculative_retrieval(request: ChatRequest, prediction: IntentPrediction) -> None:
+    """
+    Starts document retrieval before the history load, the cache lookup and
+    the router have run, when the request is likely to need it: RAG is on,
+    or the intent classifier gives the rag intent a fair probability. The
+    RAG node picks the result up; an unused retrieval is simply dropped.
+    """
+    if not request.use_rag:
+        if prediction.scores.get("rag", 0.0) < settings.SPECULATIVE_RAG_MIN_PROB:
+            return
+    session_context.prefetch(request.session_id, request.message)
+
+
+async def build_agent_inputs(request: ChatRequest, prediction: IntentPrediction) -> dict:
+    """
+    Builds the agent state for a request: the session's summary and recent
+    history (bounded by the token budget) followed by the new message, and
+    the message's intent so the router does not classify it again.
+    Falls back to the single message if Redis is unavailable.
+    """
+    try:
+        messages = await memory.build_messages(request.session_id, request.message)
+    except Exception as e:
+        logger.warning("history.load_failed", session_id=request.session_id, error=e)
+        messages = [HumanMessage(content=request.message)]
+
+    return {
+        "messages": messages,
+        "use_rag": request.use_rag,
+        "session_id": request.session_id,
+        "intent": prediction,
+    }
+
+
+async def remember_turn(session_id: str, user_message: str, answer: str):
+    """Saves the turn and schedules rolling summarisation in the background."""
+    try:
+        length = await memory.save_turn(session_id, HumanMessage(content=user_message), AIMessage(content=answer))
+    except Exception as e:
+        logger.warning("history.save_failed", session_id=session_id, error=e)
+        return
+
+    task = asyncio.create_task(memory.summarize_if_needed(session_id, length))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def get_cache_key(request: ChatRequest, inputs: dict):
+    """
+    Returns the response-cache key for this request, or None when the answer
+    must not be shared: follow-up turns depend on the conversation history.
+    """
+    if len(inputs["messages"]) > 1:
+        return None
+    route = route_for(inputs, inputs["intent"])
+    return await response_cache.make_key(request.message, route, request.session_id)
+
+
+async def lookup_cached(request: ChatRequest, inputs: dict):
+    """
+    Returns (cache key, cached answer, query embedding) for the request.
+    The cache is an optimisation: if the lookup fails (embedding API, Redis)
+    the request is answered without it, and the answer is not stored.
+    """
+    try:
+        cache_key = await get_cache_key(request, inputs)
+        if cache_key is None:
+            return None, None, None
+        cached, embedding = await response_cache.lookup(cache_key)
+        return cache_key, cached, embedding
+    except Exception as e:
+        logger.warning("chat.cache_failed", session_id=request.session_id, error=e)
+        return None, None, None
+
+
+async def store_cached(cache_key, answer: str, embedding, session_id: str) -> None:
+    """Stores an answer under its cache key; a failure only costs the cache entry."""
+    if cache_key is None:
+        return
+    try:
+        await response_cache.store(cache_key, answer, embedding)
+    except Exception as e:
+        logger.warning("chat.cache_store_failed", session_id=session_id, error=e)
+
+
 @router.post("/chat")
 async def chat(request: ChatRequest):
     # Pass the use_rag flag into the agent's state
     config = {"configurable": {"session_id": request.session_id}}
-    inputs = {
-        "messages": [HumanMessage(content=request.message)],
-        "use_rag": request.use_rag, # ADD this
-        "session_id": request.session_id
-    }
+    prediction = intent_classifier.classify(request.message)
+    start_speculative_retrieval(request, prediction)
+    inputs = await build_agent_inputs(request, prediction)
     
+    cache_key, cached, embedding = await lookup_cached(request, inputs)
+    if cached:
+        await remember_turn(request.session_id, request.message, cached)
+        return {"response": cached, "cached": True}
+
     try:
-        # We will use stream for better UX later, but for now invoke works
         response_state = await agent_executer.ainvoke(inputs, config=config)
         last_message = response_state["messages"][-1]
+        await remember_turn(request.session_id, request.message, last_message.content)
+        await store_cached(cache_key, last_message.content, embedding, request.session_id)
         return {"response": last_message.content}
         
     except Exception as e:
-        print(f"Error during agent execution: {e}")
+        logger.exception("chat.failed", session_id=request.session_id)
         return {"response": "Sorry, an error occurred while processing your request."}
 
 
+async def stream_agent_events(request: Request, inputs: dict, config: dict, cache_key=None, embedding=None):
+    """
+    Runs the agent graph with astream_events and converts the raw LangGraph
+    events into SSE messages for the browser:
+
+    - "route":   emitted once the router has picked a path
+    - "context": emitted when RAG retrieval or web search has finished
+    - "token":   one per streamed chunk from the generate nodes
+    - "done":    the final, complete answer
+    - "error":   anything went wrong while running the graph
+
+    Stops consuming the graph as soon as the client goes away, so a stuck or
+    closed connection does not keep Gemini busy.
+    """
+    answer_parts = []
+    final_output = None
+    # Wrapped nodes can report the same name twice (node + inner runnable)
+    announced = set()
+
+    try:
+        # aclosing: leaving the loop early closes the graph run, and with it the Gemini stream
+        async with aclosing(agent_executer.astream_events(inputs, config=config, version="v2")) as events:
+            async for event in events:
+                if await request.is_disconnected():
+                    logger.info("chat.client_disconnected", session_id=inputs["session_id"])
+                    break
+
+                kind = event["event"]
+                name = event.get("name")
+                node = event.get("metadata", {}).get("langgraph_node")
+
+                if kind == "on_chain_start" and name in ROUTE_NODES and node == name and "route" not in announced:
+                    announced.add("route")
+                    yield {"event": "route", "data": json.dumps({"route": ROUTE_NODES[name]})}
+
+                elif kind == "on_chain_end" and name in RETRIEVAL_NODES and node == name and name not in announced:
+                    announced.add(name)
+                    output = event["data"].get("output") or {}
+                    context = output.get("context", "") if isinstance(output, dict) else ""
+                    yield {
+                        "event": "context",
+                        "data": json.dumps({"source": ROUTE_NODES[name], "length": len(context)}),
+                    }
+
+                elif kind == "on_chat_model_stream" and node in GENERATE_NODES:
+                    token = event["data"]["chunk"].content
+                    if token:
+                        answer_parts.append(token)
+                        yield {"event": "token", "data": json.dumps({"token": token})}
+
+                elif kind == "on_chain_end" and not event.get("parent_ids"):
+                    final_output = event["data"].get("output")
+
+            else:
+                answer = "".join(answer_parts)
+                # A node can return a message without streaming (e.g. a web search error)
+                if not answer and isinstance(final_output, dict) and final_output.get("messages"):
+                    answer = final_output["messages"][-1].content
+                yield {"event": "done", "data": json.dumps({"response": answer})}
+                await remember_turn(inputs["session_id"], inputs["messages"][-1].content, answer)
+                await store_cached(cache_key, answer, embedding, inputs["session_id"])
+
+    except Exception as e:
+        logger.exception("chat.stream_failed", session_id=inputs["session_id"])
+        yield {
+            "event": "error",
+            "data": json.dumps({"response": "Sorry, an error occurred while processing your request."}),
+        }
+
+
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest, http_request: Request):
+    """
+    Streaming variant of /chat. Returns Server-Sent Events so the client can
+    render the answer token by token instead of waiting for the full response.
+    """
+    config = {"configurable": {"session_id": request.session_id}}
+    prediction = intent_classifier.classify(request.message)
+    start_speculative_retrieval(request, prediction)
+    inputs = await build_agent_inputs(request, prediction)
+
+    cache_key, cached, embedding = await lookup_cached(request, inputs)
+    if cached:
+        await remember_turn(request.session_id, request.message, cached)
+        return EventSourceResponse(stream_cached_response(cache_key, cached))
+
+    return EventSourceResponse(stream_agent_events(http_request, inputs, config, cache_key, embedding))
+
+
+async def stream_cached_response(cache_key, response: str):
+    """Replays a cached answer with the same event sequence as a live run."""
+    route = cache_key.bucket.split("|", 1)[0]
+    yield {"event": "route", "data": json.dumps({"route": route, "cached": True})}
+    yield {"event": "done", "data": json.dumps({"response": response, "cached": True})}
+
+
+@router.get("/chat/cache/stats")
+async def chat_cache_stats():
+    """Hit/miss metrics of the response cache."""
+    return response_cache.stats.as_dict()
+
+
+@router.get("/llm/stats")
+async def llm_router_stats():
+    """Per-provider latency, error rate, cost and circuit state of the LLM router."""
+    return llm_router.as_dict()
+
+
+@router.get("/chat/intent/stats")
+async def chat_intent_stats():
+    """Routing decisions of the intent classifier and how often it fell back to keywords."""
+    return intent_classifier.stats.as_dict()
+
+
+@router.get("/chat/retrieval/stats")
+async def chat_retrieval_stats():
+    """How often speculative document retrieval was used, missed or wasted."""
+    return session_context.prefetch_stats.as_dict()
+
+
+@router.get("/chat/web-search/stats")
+async def chat_web_search_stats():
+    """Tavily requests, cache hits and how much of the returned text was kept."""
+    return web_search_client.stats.as_dict()
+
+
+@router.get("/chat/context/stats")
+async def chat_context_stats():
+    """Chunks and tokens going into the context packer, and how many came out."""
+    return context_packer.stats.as_dict()
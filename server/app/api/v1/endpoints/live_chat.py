@@ -1,62 +1,68 @@
 import asyncio
 import json
-import base64
+import time
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from google.genai.types import LiveConnectConfig, SpeechConfig, VoiceConfig, PrebuiltVoiceConfig, Blob
+from google.genai.types import LiveConnectConfig, SpeechConfig, VoiceConfig, PrebuiltVoiceConfig, Blob, SessionResumptionConfig
 from app.core.config import settings
+from app.core.logger import bind, get_logger, unbind
+from app.core.telemetry import record_voice_stage, voice_stage
 from google import genai
-from app.services import vector_store 
+from app.services.session_context import session_context
+from app.services.audio_protocol import AudioTransport
+from app.services.audio_relay import SendTimeout, live_relay_metrics, relay_audio
+from app.services.voice_sessions import WORKER_ID, refuse_connection, voice_admission, voice_sessions
 
 router = APIRouter()
+logger = get_logger(__name__)
 
 client = genai.Client(api_key=settings.GOOGLE_API_KEY)
 MODEL = "gemini-2.0-flash-exp" # Use the latest supported model
 
-# --- [NEW] Helper to get RAG context ---
-def get_rag_context_for_session(session_id: str) -> str:
-    """
-    Fetches all documents for a given session and concatenates their content
-    to create a broad context for the entire voice conversation.
-    """
-    if not session_id:
-        return "No session ID was provided."
-        
-    print(f"Fetching RAG context for session_id: {session_id}")
-    # Retrieve more documents for a conversational context
-    retriever = vector_store.get_retriever(session_id=session_id, search_kwargs={"k": 10})
-    # Use a generic query to get a broad set of documents from the session
-    all_docs = retriever.get_relevant_documents("all content about the uploaded documents") 
-    
-    if not all_docs:
-        print(f"No documents found for session_id: {session_id}")
-        return "No documents were found for this session."
-        
-    context = "\n\n---\n\n".join([doc.page_content for doc in all_docs])
-    print(f"Found {len(all_docs)} document chunks for context.")
-    return context
-
-
 @router.websocket("/live-chat")
 async def live_chat(websocket: WebSocket):
     await websocket.accept()
-    print("WebSocket connection accepted.")
+    if not voice_admission.try_acquire():
+        await refuse_connection(websocket, voice_admission)
+        return
+    logger.info("voice.connected", channel="live")
+    log_token = None
 
     try:
         # --- [MODIFIED] Wait for initial config from client ---
         initial_config_raw = await websocket.receive_text()
         initial_config = json.loads(initial_config_raw).get("config", {})
+
+        # Prompt and Gemini resumption handle live in Redis, so a reconnect
+        # can land on any worker and continue the same Live conversation
+        voice_session = await voice_sessions.open(
+            "live",
+            initial_config.pop("resumeId", None),
+            initial_config,
+        )
+        session_config = voice_session.data["config"]
         
-        is_rag_enabled = initial_config.get("isRagEnabled", False)
-        session_id = initial_config.get("sessionId")
+        is_rag_enabled = session_config.get("isRagEnabled", False)
+        session_id = session_config.get("sessionId")
+        # Every record from this connection and its tasks carries these fields
+        log_token = bind(channel="live", session_id=session_id, resume_id=voice_session.resume_id)
+
+        # Raw PCM in binary frames for clients that ask for it, base64 JSON otherwise
+        transport = AudioTransport(websocket, binary=AudioTransport.wants_binary(initial_config))
+        await transport.announce()
         
         system_prompt = "You are a friendly and helpful voice assistant. Keep your responses concise and conversational."
 
-        if is_rag_enabled:
-            print("Voice RAG mode enabled. Fetching context...")
-            rag_context = get_rag_context_for_session(session_id)
+        if voice_session.data.get("system_prompt"):
+            logger.info("voice.configured", rag=is_rag_enabled, resumed=True)
+            system_prompt = voice_session.data["system_prompt"]
+        elif is_rag_enabled:
+            logger.info("voice.configured", rag=True, resumed=voice_session.resumed)
+            with voice_stage("live", "context"):
+                rag_context = await session_context.get_context_text(session_id, model=MODEL)
             system_prompt = f"""You are an intelligent assistant. Your ONLY source of knowledge is the following set of documents provided by the user. Do not use your general knowledge.
             When asked a question, answer it directly using only information from these documents.
             If the answer is not in the documents, you MUST say 'The provided documents do not contain that information.'
+            The [n] labels only mark which document a passage comes from; do not read them out.
 
             DOCUMENTS:
             ---
@@ -66,8 +72,17 @@ async def live_chat(websocket: WebSocket):
             Now, begin the conversation and answer the user's questions based on these documents.
             """
         else:
-            print("Standard voice chat mode enabled.")
+            logger.info("voice.configured", rag=False, resumed=voice_session.resumed)
         # --- End Modified Section ---
+        voice_session.data["system_prompt"] = system_prompt
+        await voice_sessions.save(voice_session)
+        await websocket.send_text(json.dumps({
+            "type": "session",
+            "resumeId": voice_session.resume_id,
+            "resumed": voice_session.resumed,
+            "turns": voice_session.turns,
+            "worker": WORKER_ID,
+        }))
 
         config = LiveConnectConfig(
             response_modalities=["AUDIO"],
@@ -75,47 +90,67 @@ async def live_chat(websocket: WebSocket):
                 voice_config=VoiceConfig(prebuilt_voice_config=PrebuiltVoiceConfig(voice_name="Puck"))
             ),
             system_instruction=system_prompt, # <-- Use the dynamic prompt
+            # Continue the previous Live conversation if this is a reconnect
+            session_resumption=SessionResumptionConfig(handle=voice_session.data.get("resumption_handle")),
         )
 
+        connect_started = time.perf_counter()
         async with client.aio.live.connect(model=MODEL, config=config) as session:
-            print("Gemini Live session started.")
-
-            async def browser_to_gemini():
-                while True:
-                    try:
-                        message = await websocket.receive_text()
-                        data = json.loads(message)
-                        
-                        if "audio_chunk" in data:
-                            pcm_data = base64.b64decode(data["audio_chunk"])
-                            await session.send_realtime_input(
-                                audio=Blob(data=pcm_data, mime_type="audio/pcm;rate=16000")
-                            )
-                    except WebSocketDisconnect:
-                        break
-                    except Exception as e:
-                        print(f"Error in browser_to_gemini: {e}")
-                        break
-
-            async def gemini_to_browser():
-                while True:
-                    try:
-                        async for response in session.receive():
-                            if response.server_content and response.server_content.model_turn:
-                                for part in response.server_content.model_turn.parts:
-                                    if part.inline_data:
-                                        audio_data = part.inline_data.data
-                                        base64_audio = base64.b64encode(audio_data).decode('utf-8')
-                                        await websocket.send_text(json.dumps({"audio_chunk": base64_audio}))
-                    except Exception as e:
-                        print(f"Error in gemini_to_browser: {e}")
-                        break
-            
-            await asyncio.gather(browser_to_gemini(), gemini_to_browser())
+            record_voice_stage("live", "connect", time.perf_counter() - connect_started)
+            logger.info("voice.live_session_started")
+            # Gemini detects the end of speech itself, so time to first audio
+            # runs from the first user audio after the model's last turn
+            turn = {"user_audio_at": None}
+
+            async def receive_from_browser():
+                pcm_data, _ = await transport.receive()
+                if pcm_data and turn["user_audio_at"] is None:
+                    turn["user_audio_at"] = time.perf_counter()
+                return pcm_data
+
+            async def send_to_gemini(pcm_data: bytes):
+                await session.send_realtime_input(
+                    audio=Blob(data=pcm_data, mime_type="audio/pcm;rate=16000")
+                )
+
+            async def gemini_audio():
+                async for response in session.receive():
+                    update = response.session_resumption_update
+                    if update and update.resumable and update.new_handle:
+                        voice_session.data["resumption_handle"] = update.new_handle
+                        await voice_sessions.save(voice_session)
+                    if response.server_content and response.server_content.turn_complete:
+                        voice_session.data["turns"] = voice_session.turns + 1
+                    if response.server_content and response.server_content.model_turn:
+                        for part in response.server_content.model_turn.parts:
+                            if part.inline_data:
+                                if turn["user_audio_at"] is not None:
+                                    record_voice_stage("live", "first_audio", time.perf_counter() - turn["user_audio_at"])
+                                    turn["user_audio_at"] = None
+                                yield part.inline_data.data
+
+            # Bounded queues both ways; the first side to finish tears down the rest
+            relay_stats = live_relay_metrics.opened()
+            try:
+                await relay_audio(receive_from_browser, transport.send_audio, send_to_gemini, gemini_audio, relay_stats)
+            except SendTimeout as e:
+                logger.warning("voice.send_stalled", error=e)
+            finally:
+                live_relay_metrics.closed(relay_stats)
+                logger.info("voice.relay_stats", **relay_stats.as_dict())
 
     except WebSocketDisconnect:
-        print("WebSocket connection closed by client.")
+        logger.info("voice.disconnected")
     except Exception as e:
-        print(f"An error occurred: {e}")
+        logger.exception("voice.connection_failed")
     finally:
-        print("Live chat session ended.")
\ No newline at end of file
+        voice_admission.release()
+        logger.info("voice.ended")
+        if log_token is not None:
+            unbind(log_token)
+
+
+@router.get("/live-chat/stats")
+async def live_chat_stats():
+    """Queue lag, merges, drops and send timeouts of the Live relay."""
+    return live_relay_metrics.as_dict()
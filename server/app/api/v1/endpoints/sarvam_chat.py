@@ -3,14 +3,26 @@ from fastapi.responses import JSONResponse
 import json
 import asyncio
 import base64
+import time
 from app.core.config import settings
-from app.services.sarvam_service import sarvam_service, SARVAM_LANGUAGES
-from app.services import vector_store 
-from app.agent.graph import create_agent_graph
+from app.core.logger import HOT, bind, get_logger, unbind
+from app.core.telemetry import record_voice_stage, voice_stage
+from app.services.sarvam_service import sarvam_service
+from app.services.session_context import session_context
+from app.agent.graph import astream_answer, get_agent_graph
+from app.api.v1.endpoints.chat import memory, remember_turn
+from app.services.voice_pipeline import run_sentence_pipeline
+from app.services.translation_cache import translation_cache
+from app.services.tts_cache import tts_cache
+from app.services.audio_protocol import FRAME_ENCODED, AudioTransport
+from app.services.audio_relay import run_until_first_exit
+from app.services.vad import UtteranceSegmenter, pcm_to_wav, vad_stats
+from app.services.voice_sessions import WORKER_ID, refuse_connection, voice_admission, voice_sessions
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage
 
 router = APIRouter()
+logger = get_logger(__name__)
 
 # Initialize LLM for text generation
 llm = ChatGoogleGenerativeAI(
@@ -19,169 +31,215 @@ llm = ChatGoogleGenerativeAI(
     temperature=0.7
 )
 
-def get_rag_context_for_session(session_id: str) -> str:
-    """
-    Fetches all documents for a given session and concatenates their content
-    to create a broad context for the entire voice conversation.
-    """
-    if not session_id:
-        return "No session ID was provided."
-        
-    print(f"Fetching RAG context for session_id: {session_id}")
-    try:
-        retriever = vector_store.get_retriever(session_id=session_id, search_kwargs={"k": 10})
-        all_docs = retriever.get_relevant_documents("all content about the uploaded documents") 
-        
-        if not all_docs:
-            print(f"No documents found for session_id: {session_id}")
-            return "No documents were found for this session."
-            
-        context = "\n\n---\n\n".join([doc.page_content for doc in all_docs])
-        print(f"Found {len(all_docs)} document chunks for context.")
-        return context
-    except Exception as e:
-        print(f"Error fetching RAG context: {e}")
-        return "Error retrieving document context."
-
+# Compiled once per process and shared by every connection
+agent_graph = get_agent_graph()
 
 @router.websocket("/sarvam-live-chat")
 async def sarvam_live_chat(websocket: WebSocket):
     await websocket.accept()
-    print("Sarvam WebSocket connection accepted.")
-
-    # Send supported languages and voices to client
-    await websocket.send_text(json.dumps({
-        "type": "languages",
-        "languages": sarvam_service.get_supported_languages(),
-        "voices": sarvam_service.get_available_voices()
-    }))
+    if not voice_admission.try_acquire():
+        await refuse_connection(websocket, voice_admission)
+        return
+    logger.info("voice.connected", channel="sarvam")
+    log_token = None
 
     try:
+        # Send supported languages and voices to client
+        await websocket.send_text(json.dumps({
+            "type": "languages",
+            "languages": sarvam_service.get_supported_languages(),
+            "voices": sarvam_service.get_available_voices()
+        }))
+
         # Wait for initial config from client
         initial_config_raw = await websocket.receive_text()
         initial_config = json.loads(initial_config_raw).get("config", {})
+
+        # Conversation state lives in Redis, so a reconnect can land on any worker
+        voice_session = await voice_sessions.open(
+            "sarvam",
+            initial_config.pop("resumeId", None),
+            initial_config,
+        )
+        session_config = voice_session.data["config"]
         
-        is_rag_enabled = initial_config.get("isRagEnabled", False)
-        session_id = initial_config.get("sessionId")
-        selected_language = initial_config.get("language", "hindi")
-        selected_voice = initial_config.get("voice", "anushka")  # Default to Anushka
-        
-        print(f"Sarvam chat config - RAG: {is_rag_enabled}, Language: {selected_language}, Voice: {selected_voice}, Session: {session_id}")
-        
-        # Create agent graph for better AI responses
-        agent_graph = create_agent_graph()
+        is_rag_enabled = session_config.get("isRagEnabled", False)
+        session_id = session_config.get("sessionId")
+        selected_language = session_config.get("language", "hindi")
+        selected_voice = session_config.get("voice", "anushka")  # Default to Anushka
         
-        # Prepare system context
-        language_name = SARVAM_LANGUAGES[selected_language]['name']
-        system_context = f"You are a helpful AI assistant speaking in {language_name}. Keep responses concise and natural."
+        # Raw audio in binary frames for clients that ask for it, base64 JSON otherwise
+        transport = AudioTransport(websocket, binary=AudioTransport.wants_binary(initial_config))
+        await transport.announce()
+
+        await voice_sessions.save(voice_session)
+        await websocket.send_text(json.dumps({
+            "type": "session",
+            "resumeId": voice_session.resume_id,
+            "resumed": voice_session.resumed,
+            "turns": voice_session.turns,
+            "worker": WORKER_ID,
+        }))
+
+        # Every record from this connection and its tasks carries these fields
+        log_token = bind(channel="sarvam", session_id=session_id, resume_id=voice_session.resume_id)
+        logger.info("voice.configured", rag=is_rag_enabled, language=selected_language,
+                    voice=selected_voice, resumed=voice_session.resumed)
         
-        if is_rag_enabled:
-            print("Sarvam Voice RAG mode enabled. Fetching context...")
-            rag_context = get_rag_context_for_session(session_id)
-            system_context = f"""You are an intelligent assistant. Answer questions based only on the provided documents. 
-            Respond in {language_name} language.
-            If the answer is not in the documents, say 'The provided documents do not contain that information' in {language_name}.
-
-            DOCUMENTS:
-            ---
-            {rag_context}
-            ---
+        # No up-front document context: with RAG on, every turn goes through
+        # the agent's hybrid retrieval for the transcript (prefetched below)
+
+        # Utterances waiting for the worker. Bounded: if the user keeps talking
+        # while several turns are still queued, the oldest one is dropped.
+        utterances: asyncio.Queue = asyncio.Queue(maxsize=settings.VOICE_UTTERANCE_QUEUE_SIZE)
+
+        async def send_json(payload: dict):
+            await websocket.send_text(json.dumps(payload))
+
+        # Per-connection VAD: buffers PCM and cuts it into utterances at pauses
+        segmenter = UtteranceSegmenter()
+
+        def enqueue(segments):
+            for utterance in segments:
+                if utterances.full():
+                    utterances.get_nowait()
+                    logger.warning("voice.utterance_dropped", queue_size=settings.VOICE_UTTERANCE_QUEUE_SIZE)
+                utterances.put_nowait(pcm_to_wav(utterance.pcm))
+
+        async def read_audio_input():
+            """Reader task: keeps reading the socket while turns are processed."""
+            while True:
+                audio_data, data = await transport.receive()
+
+                if audio_data:
+                    # Binary frame or legacy base64 chunk; only complete utterances reach STT
+                    enqueue(segmenter.feed(audio_data))
+                elif data and data.get("type") == "audio_end":
+                    # User stopped recording: close the current utterance now
+                    enqueue(segmenter.flush())
+
+        async def synthesize_sentence(sentence: str):
+            """Translate + TTS for one sentence of the English answer."""
+            if selected_language != "english":
+                sentence = await sarvam_service.translate_text(sentence, "english", selected_language)
+            audio = await sarvam_service.text_to_speech(sentence, selected_language, selected_voice)
+            return sentence, audio
+
+        async def process_turn(audio_data: bytes):
+            turn_started = time.perf_counter()
+            # Convert speech to text using Sarvam
+            with voice_stage("sarvam", "stt"):
+                transcript = await sarvam_service.speech_to_text(audio_data, selected_language)
+            if not transcript:
+                return
+
+            logger.debug("voice.transcript", language=selected_language, text=transcript)
+
+            if is_rag_enabled:
+                # Retrieval overlaps with the history load and routing
+                session_context.prefetch(session_id, transcript)
             
-            Answer the user's questions based on these documents in {language_name}.
-            """
+            # Send transcript to client for display
+            await send_json({
+                "type": "transcript",
+                "text": transcript,
+                "language": selected_language
+            })
+
+            # Earlier turns of this voice session, wherever they were handled
+            try:
+                with voice_stage("sarvam", "history"):
+                    messages = await memory.build_messages(voice_session.memory_id, transcript)
+            except Exception as e:
+                logger.warning("history.load_failed", error=e)
+                messages = [HumanMessage(content=transcript)]
+
+            agent_state = {
+                "messages": messages,
+                "use_rag": is_rag_enabled,
+                "session_id": session_id
+            }
+            translated_sentences = []
+            first_audio_sent = False
 
-        async def handle_audio_input():
-            """Handle incoming audio from browser"""
+            async def emit_segment(index: int, english: str, result):
+                translated, audio_response = result
+                translated_sentences.append(translated)
+                await send_json({
+                    "type": "ai_response_segment",
+                    "index": index,
+                    "text": translated,
+                    "language": selected_language,
+                })
+                if audio_response:
+                    nonlocal first_audio_sent
+                    if not first_audio_sent:
+                        # From the end of the utterance to the first audio the user hears
+                        first_audio_sent = True
+                        record_voice_stage("sarvam", "first_audio", time.perf_counter() - turn_started)
+                    # Send as soon as this sentence is ready; binary clients
+                    # already have the text from the segment message above
+                    await transport.send_audio(
+                        audio_response,
+                        frame_type=FRAME_ENCODED,
+                        type="audio_response",
+                        index=index,
+                        language=selected_language,
+                        voice=selected_voice,
+                        text=translated,
+                    )
+
+            # Generation, translation and TTS overlap sentence by sentence
+            with voice_stage("sarvam", "answer"):
+                english_sentences = await run_sentence_pipeline(
+                    astream_answer(agent_graph, agent_state),
+                    synthesize_sentence,
+                    emit_segment,
+                )
+
+            response_text = " ".join(translated_sentences)
+            logger.debug("voice.response", language=selected_language, text=response_text)
+
+            # Persist the turn before reporting it complete, so a client that
+            # reconnects right after ai_response resumes with it included
+            with voice_stage("sarvam", "persist"):
+                await remember_turn(voice_session.memory_id, transcript, " ".join(english_sentences))
+                voice_session.data["turns"] = voice_session.turns + 1
+                await voice_sessions.save(voice_session)
+
+            # Full text once the turn is complete
+            await send_json({
+                "type": "ai_response",
+                "text": response_text,
+                "language": selected_language,
+                "voice": selected_voice
+            })
+            turn_seconds = time.perf_counter() - turn_started
+            record_voice_stage("sarvam", "turn", turn_seconds)
+            logger.info("voice.turn", sample=HOT, seconds=round(turn_seconds, 3), sentences=len(english_sentences))
+
+        async def process_utterances():
+            """Worker task: runs turns one after another, in arrival order."""
             while True:
+                audio_data = await utterances.get()
                 try:
-                    message = await websocket.receive_text()
-                    data = json.loads(message)
-                    
-                    if data.get("type") == "audio_chunk":
-                        # Decode base64 audio
-                        audio_data = base64.b64decode(data["audio_chunk"])
-                        
-                        # Convert speech to text using Sarvam
-                        transcript = await sarvam_service.speech_to_text(audio_data, selected_language)
-                        
-                        if transcript:
-                            print(f"Transcript ({selected_language}): {transcript}")
-                            
-                            # Send transcript to client for display
-                            await websocket.send_text(json.dumps({
-                                "type": "transcript",
-                                "text": transcript,
-                                "language": selected_language
-                            }))
-                            
-                            # Generate AI response using agent graph for better routing
-                            try:
-                                # Use agent graph for better responses
-                                agent_state = {
-                                    "messages": [HumanMessage(content=transcript)],
-                                    "use_rag": is_rag_enabled,
-                                    "session_id": session_id
-                                }
-                                
-                                result = await asyncio.to_thread(agent_graph.invoke, agent_state)
-                                response_text = result["messages"][-1].content
-                                
-                                # Translate to selected language if not English
-                                if selected_language != "english":
-                                    response_text = await sarvam_service.translate_text(
-                                        response_text, "english", selected_language
-                                    )
-                                
-                                print(f"AI Response ({selected_language}): {response_text}")
-                                
-                                # Send text response to client
-                                await websocket.send_text(json.dumps({
-                                    "type": "ai_response",
-                                    "text": response_text,
-                                    "language": selected_language,
-                                    "voice": selected_voice
-                                }))
-                                
-                                # Convert response to speech using Sarvam with selected voice
-                                audio_response = await sarvam_service.text_to_speech(
-                                    response_text, selected_language, selected_voice
-                                )
-                                
-                                if audio_response:
-                                    # Encode audio to base64 and send
-                                    audio_base64 = base64.b64encode(audio_response).decode('utf-8')
-                                    await websocket.send_text(json.dumps({
-                                        "type": "audio_response",
-                                        "audio_chunk": audio_base64,
-                                        "language": selected_language,
-                                        "voice": selected_voice,
-                                        "text": response_text
-                                    }))
-                                    
-                            except Exception as e:
-                                print(f"Error generating AI response: {e}")
-                                await websocket.send_text(json.dumps({
-                                    "type": "error",
-                                    "message": f"Error generating response: {str(e)}"
-                                }))
-                        
+                    await process_turn(audio_data)
                 except WebSocketDisconnect:
-                    print("Sarvam WebSocket disconnected by client")
-                    break
+                    raise
                 except Exception as e:
-                    print(f"Error in audio input handler: {e}")
-                    await websocket.send_text(json.dumps({
+                    logger.exception("voice.turn_failed")
+                    await send_json({
                         "type": "error",
-                        "message": f"Audio processing error: {str(e)}"
-                    }))
+                        "message": f"Error generating response: {str(e)}"
+                    })
 
-        # Start audio handling
-        await handle_audio_input()
+        # Reader and worker run side by side; when either stops, stop the other
+        await run_until_first_exit(read_audio_input(), process_utterances())
 
     except WebSocketDisconnect:
-        print("Sarvam WebSocket connection closed by client.")
+        logger.info("voice.disconnected")
     except Exception as e:
-        print(f"An error occurred in Sarvam live chat: {e}")
+        logger.exception("voice.connection_failed")
         try:
             await websocket.send_text(json.dumps({
                 "type": "error",
@@ -190,7 +248,10 @@ async def sarvam_live_chat(websocket: WebSocket):
         except:
             pass
     finally:
-        print("Sarvam live chat session ended.")
+        voice_admission.release()
+        logger.info("voice.ended")
+        if log_token is not None:
+            unbind(log_token)
 
 
 @router.get("/sarvam-languages")
@@ -208,11 +269,32 @@ async def get_sarvam_languages():
             "status": "error"
         }
 
+@router.get("/voice-workers/stats")
+async def get_voice_worker_stats():
+    """Active and refused voice connections on this worker."""
+    return voice_admission.as_dict()
+
+@router.get("/sarvam-vad-stats")
+async def get_sarvam_vad_stats():
+    """STT calls saved and endpointing latency of the voice activity detection."""
+    return vad_stats.as_dict()
+
+@router.get("/sarvam-tts-cache-stats")
+async def get_sarvam_tts_cache_stats():
+    """Hit rate of the TTS audio cache."""
+    return tts_cache.stats.as_dict()
+
+@router.get("/sarvam-translation-cache-stats")
+async def get_sarvam_translation_cache_stats():
+    """Hit rate and batching of the sentence-level translation cache."""
+    return translation_cache.stats.as_dict()
+
 @router.post("/sarvam-test-tts")
 async def test_sarvam_tts():
     """Test Sarvam TTS functionality"""
     try:
         test_text = "नमस्ते! मैं सरवम एआई असिस्टेंट हूं।"  # Hello! I am Sarvam AI Assistant in Hindi
+        # Served from the TTS cache after the first call (or from the startup pre-warm)
         audio_data = await sarvam_service.text_to_speech(test_text, "hindi", "anushka")
         
         if audio_data:
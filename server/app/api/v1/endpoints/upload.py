@@ -1,3 +1,4 @@
+import asyncio
 import os
 import shutil
 import uuid
@@ -10,16 +11,18 @@ from fastapi import (
     status,
 )
 
-from app.services import document_parser, vector_store
+from app.core.logger import get_logger
+from app.services.ingestion import IngestionJob, IngestionQueueFull, ingestion_service
 
 router = APIRouter()
+logger = get_logger(__name__)
 
 # Define a directory to store temporary uploads
 UPLOAD_DIR = "temp_uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 
-@router.post("/upload")
+@router.post("/upload", status_code=status.HTTP_202_ACCEPTED)
 async def upload_file(
     file: UploadFile = File(...), 
     session_id: str = Form(...)
@@ -30,10 +33,9 @@ async def upload_file(
     This endpoint:
     1.  Receives a file and a session_id.
     2.  Saves the file to a temporary location with a unique name.
-    3.  Calls the document_parser service to extract content into chunks.
-    4.  Calls the vector_store service to embed and store the chunks.
-    5.  Cleans up the temporary file.
-    6.  Returns a success or error response.
+    3.  Queues an ingestion job (parse -> chunk -> embed -> store) that runs
+        on the background worker pool and cleans up the temporary file.
+    4.  Returns the job id immediately; poll /upload/{job_id} for progress.
     """
     
     if not file.filename:
@@ -48,50 +50,65 @@ async def upload_file(
     file_path = os.path.join(UPLOAD_DIR, unique_filename)
 
     try:
-        # Save the uploaded file to the temporary directory
+        # Save the uploaded file to the temporary directory without blocking the loop
         with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+            await asyncio.to_thread(shutil.copyfileobj, file.file, buffer)
 
-        # --- Core Logic: Parse and Embed ---
-        print(f"Parsing file: {file.filename} ({file_path})")
-        document_chunks = document_parser.parse_file(file_path, file_extension)
-
-        if not document_chunks:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Could not parse any content from the file: {file.filename}"
-            )
-
-        print(f"Adding {len(document_chunks)} chunks to the vector store.")
-        print(f"Adding chunks to vector store for session_id: {session_id}")
-        vector_store.add_documents_to_store(document_chunks, session_id)
-        # vector_store.add_documents_to_store(document_chunks)
-        
-        # Here you could also link the document IDs/chunks to the session_id in Redis/Postgres
-        # For now, we are adding to a global store for simplicity.
+        job = ingestion_service.submit(IngestionJob(
+            session_id=session_id,
+            filename=file.filename,
+            file_path=file_path,
+            file_extension=file_extension,
+        ))
+        logger.info("upload.queued", job_id=job.job_id, filename=file.filename, session_id=session_id)
 
         return {
-            "status": "success",
+            "status": "queued",
+            "job_id": job.job_id,
             "filename": file.filename,
-            "chunks_added": len(document_chunks),
-            "message": "File processed and added to the knowledge base successfully."
+            "message": "File received. Processing has started in the background."
         }
 
-    except HTTPException as e:
-        # Re-raise HTTP exceptions to be handled by FastAPI
-        raise e
+    except IngestionQueueFull as e:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
     except Exception as e:
-        # Catch any other unexpected errors during processing
-        print(f"Error processing file {file.filename}: {e}")
+        # Catch any other unexpected errors while saving the file
+        logger.error("upload.failed", filename=file.filename, session_id=session_id, error=e)
+        if os.path.exists(file_path):
+            os.remove(file_path)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"An unexpected error occurred while processing the file: {e}"
+            detail=f"An unexpected error occurred while receiving the file: {e}"
         )
     finally:
-        # --- Cleanup: Ensure the temporary file is always deleted ---
-        if os.path.exists(file_path):
-            os.remove(file_path)
-            print(f"Cleaned up temporary file: {file_path}")
-        
         # Ensure the file stream is closed
-        await file.close()
\ No newline at end of file
+        await file.close()
+
+
+@router.get("/upload/{job_id}")
+async def get_upload_status(job_id: str):
+    """Returns the progress of an ingestion job."""
+    job = ingestion_service.get(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown upload job: {job_id}"
+        )
+    return job.to_dict()
+
+
+@router.delete("/upload/{job_id}")
+async def cancel_upload(job_id: str):
+    """Cancels an ingestion job. Chunks already stored are kept."""
+    job = ingestion_service.cancel(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown upload job: {job_id}"
+        )
+    return job.to_dict()
@@ -1,3 +1,5 @@
+from typing import Dict
+
 from pydantic_settings import BaseSettings,SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -11,6 +13,153 @@ class Settings(BaseSettings):
     REDIS_URL: str = "redis://localhost:6379"
     TAVILY_API_KEY: str = ""
     SARVAM_API_KEY: str = ""
+    REDIS_MAX_CONNECTIONS: int = 50
+
+    # LLM providers behind the router; Groq and the local endpoint are optional
+    GROQ_API_KEY: str = ""
+    GROQ_MODEL: str = "llama-3.3-70b-versatile"
+    LOCAL_LLM_BASE_URL: str = ""       # OpenAI-compatible, e.g. http://localhost:12434/engines/v1
+    LOCAL_LLM_MODEL: str = "ai/llama3.2"
+    LOCAL_LLM_API_KEY: str = "docker"
+    # USD per million tokens, used for cost-aware routing
+    GEMINI_INPUT_COST_PER_M: float = 0.10
+    GEMINI_OUTPUT_COST_PER_M: float = 0.40
+    GROQ_INPUT_COST_PER_M: float = 0.59
+    GROQ_OUTPUT_COST_PER_M: float = 0.79
+    LOCAL_LLM_INPUT_COST_PER_M: float = 0.0
+    LOCAL_LLM_OUTPUT_COST_PER_M: float = 0.0
+
+    # LLM router
+    LLM_ROUTER_WINDOW: int = 200               # Recent calls per provider used for p95 and error rate
+    LLM_ROUTER_MIN_SAMPLES: int = 20           # Below this, a provider's latency is assumed to be the prior
+    LLM_ROUTER_PRIOR_LATENCY: float = 1.0      # Seconds
+    LLM_ROUTER_COST_WEIGHT: float = 0.5        # Seconds of latency worth $1 per million tokens
+    LLM_ROUTER_ERROR_WEIGHT: float = 5.0       # Seconds of latency worth a 100% error rate
+    LLM_ROUTER_TASK_PENALTY: float = 1.0       # Seconds added when a provider is not suited to the task
+    LLM_HEDGE_ENABLED: bool = True             # Start a second provider once the first passes its p95
+    LLM_BREAKER_FAILURES: int = 5              # Consecutive failures that open a provider's circuit
+    LLM_BREAKER_RESET_SECONDS: float = 30
+
+    # Conversation memory
+    HISTORY_TOKEN_BUDGET: int = 2000   # Max tokens of history sent with each prompt
+    HISTORY_MAX_MESSAGES: int = 40     # Older messages are folded into a summary
+    HISTORY_TTL_SECONDS: int = 60 * 60 * 24 * 7
+
+    # Response cache in front of the agent graph
+    RESPONSE_CACHE_MAX_ENTRIES: int = 2000
+    RESPONSE_CACHE_TTL_SECONDS: int = 60 * 60
+    RESPONSE_CACHE_SIMILARITY_THRESHOLD: float = 0.95  # 0 disables semantic lookup
+
+    # Embedding cache and batching
+    EMBEDDING_CACHE_DIR: str = "embedding_cache"
+    EMBEDDING_CACHE_MEMORY_ITEMS: int = 20000
+    EMBEDDING_BATCH_SIZE: int = 100
+    EMBEDDING_MAX_CONCURRENCY: int = 4
+
+    # Retrieval
+    RAG_TOP_K: int = 3                 # Chunks passed to the generate step
+    RAG_FETCH_K: int = 8               # Candidates fetched before near-duplicate collapse
+    RAG_DEDUP_THRESHOLD: float = 0.8   # Jaccard overlap above which chunks count as duplicates
+    RAG_HYBRID_ENABLED: bool = True    # Fuse BM25 keyword hits with the vector results
+    RAG_RRF_K: int = 60                # Reciprocal rank fusion constant
+    SESSION_CONTEXT_CACHE_SIZE: int = 512
+    SESSION_CONTEXT_CHUNKS: int = 10   # Chunks pasted into the voice system prompts
+    SESSION_CONTEXT_MAX_CHUNKS: int = 1000   # Chunks read from Chroma to build a context bundle
+    FANOUT_DEADLINE_SECONDS: float = 3.0     # Shared deadline of the parallel document + web legs
+    SPECULATIVE_RAG_MIN_PROB: float = 0.3    # Intent probability of "rag" above which retrieval starts early
+    RETRIEVAL_PREFETCH_MAX: int = 256        # Speculative retrievals kept in flight / waiting
+    RETRIEVAL_PREFETCH_TTL_SECONDS: float = 30.0
+
+    # Context packing: token budgets of the context block, by route or "route:model"
+    CONTEXT_TOKEN_BUDGETS: Dict[str, int] = {"rag": 600, "rag_and_web": 1000, "voice": 1500}
+    CONTEXT_DEFAULT_TOKEN_BUDGET: int = 800
+    CONTEXT_MMR_LAMBDA: float = 0.7          # 1.0 = relevance only, lower = more diversity
+    CONTEXT_MIN_OVERLAP_CHARS: int = 40      # Shared text needed to merge two chunks
+
+    # Web search (Tavily)
+    TAVILY_BASE_URL: str = "https://api.tavily.com"
+    WEB_SEARCH_MAX_RESULTS: int = 3              # The web generate node uses the top 3
+    WEB_SEARCH_DEPTH: str = "basic"
+    WEB_SEARCH_INCLUDE_RAW_CONTENT: bool = False # Full page text, trimmed to the budget below
+    WEB_SEARCH_RESULT_TOKENS: int = 250          # Per result, after sentence relevance trimming
+    WEB_SEARCH_CACHE_TTL_SECONDS: int = 600
+    WEB_SEARCH_CACHE_MAX_ITEMS: int = 1024
+    WEB_SEARCH_TIMEOUT: float = 10
+    WEB_SEARCH_MAX_CONNECTIONS: int = 16
+    WEB_SEARCH_MAX_RETRIES: int = 1
+    WEB_SEARCH_RETRY_BACKOFF: float = 0.25       # Seconds, doubled on each retry
+
+    # Intent routing in check_for_rag
+    INTENT_TRAIN_PATH: str = "app/data/intent_train.json"
+    INTENT_HASH_BITS: int = 16               # Feature buckets: 2**bits
+    INTENT_CONFIDENCE_THRESHOLD: float = 0.5 # Below this, the keyword rules decide
+
+    # Background ingestion for /upload
+    INGESTION_WORKERS: int = 2
+    INGESTION_QUEUE_SIZE: int = 100
+    INGESTION_JOB_TTL_SECONDS: int = 60 * 60
+    PDF_PARSE_WORKERS: int = 2
+    PDF_PAGES_PER_TASK: int = 25
+
+    # Sarvam HTTP client
+    SARVAM_BASE_URL: str = "https://api.sarvam.ai"
+    SARVAM_MAX_CONNECTIONS: int = 32
+    SARVAM_MAX_CONCURRENCY: int = 16
+    SARVAM_MAX_RETRIES: int = 2
+    SARVAM_RETRY_BACKOFF: float = 0.25  # Seconds, doubled on each retry
+    SARVAM_TTS_TIMEOUT: float = 20
+    SARVAM_STT_TIMEOUT: float = 20
+    SARVAM_TRANSLATE_TIMEOUT: float = 10
+    SARVAM_TTS_MODEL: str = "bulbul:v1"
+    SARVAM_TTS_SAMPLE_RATE: int = 22050
+    SARVAM_TRANSLATE_MAX_CHARS: int = 900     # Per request; several sentences are batched up to this
+
+    # Sentence-level translation cache
+    TRANSLATION_CACHE_MAX_ITEMS: int = 20000
+    TRANSLATION_CACHE_TTL_SECONDS: int = 60 * 60 * 24 * 30
+    TRANSLATION_CACHE_REDIS_ENABLED: bool = True
+
+    # TTS audio cache
+    TTS_CACHE_DIR: str = "tts_cache"
+    TTS_CACHE_MEMORY_MB: int = 64
+    TTS_CACHE_DISK_MB: int = 512
+    TTS_PREWARM_PHRASES_PATH: str = "app/data/tts_phrases.json"
+    TTS_PREWARM_CONCURRENCY: int = 4
+
+    # Voice turn pipeline
+    VOICE_MIN_SENTENCE_CHARS: int = 25         # Shorter sentences are merged with the next one
+    VOICE_MAX_SENTENCES_IN_FLIGHT: int = 3     # Sentences being translated/synthesised at once
+    VOICE_UTTERANCE_QUEUE_SIZE: int = 4        # Pending utterances per connection
+
+    # Voice sessions shared across workers
+    VOICE_SESSION_TTL_SECONDS: int = 60 * 30   # How long a dropped session can be resumed
+    VOICE_MAX_CONNECTIONS_PER_WORKER: int = 50
+
+    # Gemini Live relay flow control
+    LIVE_UPSTREAM_MAX_BYTES: int = 64 * 1024      # ~2 s of 16 kHz microphone PCM
+    LIVE_DOWNSTREAM_MAX_BYTES: int = 480 * 1024   # ~10 s of 24 kHz model PCM
+    LIVE_MERGE_BYTES: int = 16 * 1024             # Queued frames are coalesced up to this size
+    LIVE_SEND_TIMEOUT: float = 2.0
+    LIVE_MAX_SEND_TIMEOUTS: int = 3               # Consecutive timeouts before the peer is dropped
+
+    # Voice activity detection / endpointing before Sarvam STT
+    VAD_SAMPLE_RATE: int = 16000
+    VAD_FRAME_MS: int = 30
+    VAD_SPEECH_START_MS: int = 90      # Voiced audio needed to open an utterance
+    VAD_HANGOVER_MS: int = 600         # Silence that closes an utterance
+    VAD_PRE_ROLL_MS: int = 200         # Audio kept from before speech started
+    VAD_MIN_UTTERANCE_MS: int = 250    # Shorter bursts are treated as noise
+    VAD_MAX_UTTERANCE_SECONDS: int = 20
+    VAD_MIN_RMS: float = 300.0         # Absolute floor on the int16 RMS threshold
+    VAD_NOISE_RATIO: float = 3.0       # Threshold as a multiple of the noise floor
+
+    # Logging, metrics and tracing
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"                   # "json", or "text" for local development
+    LOG_HOT_PATH_SAMPLE_RATE: float = 0.1      # Share of per-node / per-call info records kept
+    OTEL_ENABLED: bool = False                 # Needs the opentelemetry-sdk and OTLP exporter packages
+    OTEL_SERVICE_NAME: str = "chatbot-server"
+    OTEL_EXPORTER_OTLP_ENDPOINT: str = ""      # Empty uses the exporter's default (localhost:4317)
     
     model_config = SettingsConfigDict(
         # Tell Pydantic to read variables from a file named .env
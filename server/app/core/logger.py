@@ -0,0 +1,107 @@
+# apps/backend/app/core/logger.py
+import contextvars
+import json
+import logging
+import random
+import sys
+import time
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+# Fields attached to every record logged while handling one request or
+# voice connection (session_id, channel, ...); see bind()
+_bound: contextvars.ContextVar[Dict[str, Any]] = contextvars.ContextVar("log_fields", default={})
+
+# Sample rate for info/debug records on hot paths (one per node, call or turn)
+HOT = settings.LOG_HOT_PATH_SAMPLE_RATE
+
+
+def bind(**fields) -> contextvars.Token:
+    """Adds fields to every record logged from this task and the tasks it starts."""
+    return _bound.set({**_bound.get(), **fields})
+
+
+def unbind(token: contextvars.Token) -> None:
+    _bound.reset(token)
+
+
+class StructuredLogger:
+    """
+    Logs an event name plus keyword fields, merged with the bound fields.
+
+    `sample` keeps only that share of the records; warnings and errors are
+    never sampled. A disabled level returns before any formatting work.
+    """
+
+    def __init__(self, name: str):
+        self._logger = logging.getLogger(name)
+
+    def _log(self, level: int, event: str, sample: Optional[float], exc_info, fields: Dict[str, Any]) -> None:
+        if not self._logger.isEnabledFor(level):
+            return
+        if sample is not None and level < logging.WARNING and random.random() >= sample:
+            return
+        self._logger.log(level, event, exc_info=exc_info, extra={"fields": {**_bound.get(), **fields}})
+
+    def debug(self, event: str, sample: Optional[float] = None, **fields) -> None:
+        self._log(logging.DEBUG, event, sample, None, fields)
+
+    def info(self, event: str, sample: Optional[float] = None, **fields) -> None:
+        self._log(logging.INFO, event, sample, None, fields)
+
+    def warning(self, event: str, **fields) -> None:
+        self._log(logging.WARNING, event, None, None, fields)
+
+    def error(self, event: str, exc_info=None, **fields) -> None:
+        self._log(logging.ERROR, event, None, exc_info, fields)
+
+    def exception(self, event: str, **fields) -> None:
+        self._log(logging.ERROR, event, None, True, fields)
+
+
+def get_logger(name: str) -> StructuredLogger:
+    return StructuredLogger(name)
+
+
+def _default(value: Any) -> str:
+    """JSON fallback for field values: exceptions as their repr, anything else as str."""
+    return repr(value) if isinstance(value, BaseException) else str(value)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, event and the fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "event": record.getMessage(),
+        }
+        payload.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=_default)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable variant for local development: key=value pairs after the event."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = " ".join(f"{key}={value!r}" for key, value in getattr(record, "fields", {}).items())
+        line = f"{time.strftime('%H:%M:%S', time.localtime(record.created))} {record.levelname:<7} {record.name}: {record.getMessage()}"
+        line = f"{line} {fields}" if fields else line
+        if record.exc_info:
+            line = f"{line}\n{self.formatException(record.exc_info)}"
+        return line
+
+
+def configure_logging(level: str = settings.LOG_LEVEL, fmt: str = settings.LOG_FORMAT) -> None:
+    """Sends the app's records to stdout in the configured format. Safe to call twice."""
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+    app_logger = logging.getLogger("app")
+    app_logger.handlers = [handler]
+    app_logger.setLevel(level.upper())
+    app_logger.propagate = False
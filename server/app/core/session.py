@@ -1,7 +1,158 @@
+import json
+from typing import List, Optional, Tuple
+
 import redis.asyncio as redis
 from app.core.config import settings
+from app.core.logger import get_logger
 
 from langchain_community.chat_message_histories import RedisChatMessageHistory
+from langchain_core.messages import (
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    messages_from_dict,
+    messages_to_dict,
+)
+
+logger = get_logger(__name__)
+
+# One connection pool per process, shared by every request
+redis_pool = redis.ConnectionPool.from_url(settings.REDIS_URL, max_connections=settings.REDIS_MAX_CONNECTIONS)
+
+HISTORY_KEY_PREFIX = "chat_history:"
+SUMMARY_KEY_PREFIX = "chat_summary:"
+SUMMARY_LOCK_PREFIX = "chat_summary_lock:"
+
 
 def get_session_history(session_id: str)-> RedisChatMessageHistory:
-    return RedisChatMessageHistory(session_id=session_id,url=settings.REDIS_URL)
\ No newline at end of file
+    return RedisChatMessageHistory(session_id=session_id,url=settings.REDIS_URL)
+
+
+def get_redis_client() -> redis.Redis:
+    """Returns an async Redis client backed by the shared connection pool."""
+    return redis.Redis(connection_pool=redis_pool)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token), good enough for budgeting."""
+    return len(text) // 4 + 1
+
+
+class ConversationMemory:
+    """
+    Per-session conversation memory stored in Redis.
+
+    Recent turns live in a Redis list, older turns are folded into a rolling
+    summary, so both the stored history and the prompt stay bounded no
+    matter how long the conversation gets.
+    """
+
+    def __init__(
+        self,
+        redis_client: Optional[redis.Redis] = None,
+        summarizer=None,
+        token_budget: int = settings.HISTORY_TOKEN_BUDGET,
+        max_messages: int = settings.HISTORY_MAX_MESSAGES,
+        ttl_seconds: int = settings.HISTORY_TTL_SECONDS,
+    ):
+        self.redis = redis_client or get_redis_client()
+        self.summarizer = summarizer
+        self.token_budget = token_budget
+        self.max_messages = max_messages
+        self.ttl_seconds = ttl_seconds
+
+    async def load(self, session_id: str) -> Tuple[Optional[str], List[BaseMessage]]:
+        """
+        Loads the rolling summary and the most recent messages that fit in the
+        token budget. Only the last `max_messages` entries are ever read.
+        """
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.get(SUMMARY_KEY_PREFIX + session_id)
+            pipe.lrange(HISTORY_KEY_PREFIX + session_id, -self.max_messages, -1)
+            summary, raw_messages = await pipe.execute()
+
+        if isinstance(summary, bytes):
+            summary = summary.decode("utf-8")
+
+        messages = messages_from_dict([json.loads(raw) for raw in raw_messages])
+
+        # Walk backwards from the newest message until the budget is used up
+        budget = self.token_budget - (estimate_tokens(summary) if summary else 0)
+        window: List[BaseMessage] = []
+        for message in reversed(messages):
+            cost = estimate_tokens(str(message.content))
+            if cost > budget:
+                break
+            window.append(message)
+            budget -= cost
+        window.reverse()
+
+        return summary, window
+
+    async def build_messages(self, session_id: str, user_message: str) -> List[BaseMessage]:
+        """Returns summary + windowed history + the new user message, ready for the agent."""
+        summary, history = await self.load(session_id)
+        messages: List[BaseMessage] = []
+        if summary:
+            messages.append(SystemMessage(content=f"Summary of the earlier conversation: {summary}"))
+        messages.extend(history)
+        messages.append(HumanMessage(content=user_message))
+        return messages
+
+    async def save_turn(self, session_id: str, *messages: BaseMessage) -> int:
+        """Appends the messages of one turn and refreshes the session TTL."""
+        key = HISTORY_KEY_PREFIX + session_id
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.rpush(key, *[json.dumps(item) for item in messages_to_dict(list(messages))])
+            pipe.expire(key, self.ttl_seconds)
+            pipe.expire(SUMMARY_KEY_PREFIX + session_id, self.ttl_seconds)
+            length, _, _ = await pipe.execute()
+        return length
+
+    async def summarize_if_needed(self, session_id: str, length: int) -> None:
+        """
+        Once the history grows past `max_messages`, folds the oldest half into
+        the rolling summary and trims the list. Runs after the response has
+        been sent, so it never adds latency to the turn itself.
+        """
+        if length <= self.max_messages or self.summarizer is None:
+            return
+
+        lock_key = SUMMARY_LOCK_PREFIX + session_id
+        if not await self.redis.set(lock_key, "1", nx=True, ex=60):
+            return  # Another request is already summarising this session
+
+        try:
+            key = HISTORY_KEY_PREFIX + session_id
+            keep = self.max_messages // 2
+            raw_old = await self.redis.lrange(key, 0, -keep - 1)
+            if not raw_old:
+                return
+
+            old_messages = messages_from_dict([json.loads(raw) for raw in raw_old])
+            previous = await self.redis.get(SUMMARY_KEY_PREFIX + session_id)
+            if isinstance(previous, bytes):
+                previous = previous.decode("utf-8")
+
+            transcript = "\n".join(f"{msg.type}: {msg.content}" for msg in old_messages)
+            prompt = f"""Update the running summary of a shopping assistant conversation.
+Keep product names, order details, preferences and open questions. Be concise.
+
+CURRENT SUMMARY:
+{previous or "(none)"}
+
+NEW TURNS:
+{transcript}
+
+UPDATED SUMMARY:"""
+            response = await self.summarizer.ainvoke([HumanMessage(content=prompt)])
+
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.set(SUMMARY_KEY_PREFIX + session_id, response.content, ex=self.ttl_seconds)
+                pipe.ltrim(key, len(raw_old), -1)
+                await pipe.execute()
+            logger.info("history.summarised", session_id=session_id, messages=len(raw_old))
+        except Exception as e:
+            logger.error("history.summarise_failed", session_id=session_id, error=e)
+        finally:
+            await self.redis.delete(lock_key)
@@ -0,0 +1,185 @@
+# apps/backend/app/core/telemetry.py
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Histogram, generate_latest
+from prometheus_client import REGISTRY
+from starlette.responses import Response
+
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Sub-10 ms buckets for caches and local calls, up to 30 s for slow LLM turns
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# Labels are kept to small, fixed sets (node, route, service, ...). Session
+# ids only go on spans and log records: as a label every session would
+# create new time series.
+NODE_DURATION = Histogram(
+    "agent_node_duration_seconds", "Time spent in one LangGraph node", ["node", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+EXTERNAL_CALL_DURATION = Histogram(
+    "external_call_duration_seconds", "Calls to LLMs, embeddings, Chroma, Tavily and Sarvam",
+    ["service", "operation", "provider", "outcome"], buckets=LATENCY_BUCKETS,
+)
+VOICE_STAGE_DURATION = Histogram(
+    "voice_stage_duration_seconds", "Stages of a voice turn over the websockets", ["channel", "stage"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP requests by route template", ["method", "path", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+
+_tracer = None
+
+
+def configure_tracing() -> None:
+    """
+    Sends spans to an OTLP collector when OTEL_ENABLED is set. OpenTelemetry
+    is optional: without the packages the spans are skipped and only the
+    Prometheus metrics are recorded.
+    """
+    global _tracer
+    if not settings.OTEL_ENABLED:
+        return
+    try:
+        from opentelemetry import trace
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError:
+        logger.warning("tracing.unavailable", reason="opentelemetry packages not installed")
+        return
+
+    exporter = OTLPSpanExporter(endpoint=settings.OTEL_EXPORTER_OTLP_ENDPOINT or None)
+    provider = TracerProvider(resource=Resource.create({"service.name": settings.OTEL_SERVICE_NAME}))
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    _tracer = trace.get_tracer("app")
+    logger.info("tracing.enabled", endpoint=settings.OTEL_EXPORTER_OTLP_ENDPOINT or "default")
+
+
+def _start_span(name: str, attributes: Dict[str, Any]):
+    return _tracer.start_as_current_span(
+        name, attributes={key: value for key, value in attributes.items() if value is not None}
+    )
+
+
+# Without a tracer each block is a timer and a histogram observation only
+@contextmanager
+def node_span(node: str, route: str, **attrs):
+    """Times one graph node; attrs (e.g. session_id) only go on the span."""
+    start = time.perf_counter()
+    try:
+        if _tracer is None:
+            yield
+        else:
+            with _start_span(f"node {node}", {"node": node, "route": route, **attrs}):
+                yield
+    finally:
+        NODE_DURATION.labels(node, route).observe(time.perf_counter() - start)
+
+
+class ExternalCall:
+    """Handle yielded by external_call; `outcome` can be set for errors that are not raised."""
+
+    def __init__(self):
+        self.span = None
+        self.outcome = "ok"
+
+
+@contextmanager
+def external_call(service: str, operation: str, provider: str = "", **attrs):
+    """Times a call to an outside service, labelled "error" if it raised."""
+    start = time.perf_counter()
+    call = ExternalCall()
+    try:
+        if _tracer is None:
+            yield call
+        else:
+            with _start_span(f"{service} {operation}", {"service": service, "operation": operation,
+                                                        "provider": provider, **attrs}) as call.span:
+                yield call
+    except BaseException:
+        call.outcome = "error"
+        raise
+    finally:
+        EXTERNAL_CALL_DURATION.labels(service, operation, provider, call.outcome).observe(time.perf_counter() - start)
+
+
+def record_external(service: str, operation: str, provider: str, outcome: str, seconds: float) -> None:
+    """Records a call timed elsewhere, e.g. one leg of the LLM race."""
+    EXTERNAL_CALL_DURATION.labels(service, operation, provider, outcome).observe(seconds)
+
+
+@contextmanager
+def voice_stage(channel: str, stage: str, **attrs):
+    start = time.perf_counter()
+    try:
+        if _tracer is None:
+            yield
+        else:
+            with _start_span(f"voice {stage}", {"channel": channel, "stage": stage, **attrs}):
+                yield
+    finally:
+        VOICE_STAGE_DURATION.labels(channel, stage).observe(time.perf_counter() - start)
+
+
+def record_voice_stage(channel: str, stage: str, seconds: float) -> None:
+    """Records a stage that does not map onto one block, e.g. time to first audio."""
+    VOICE_STAGE_DURATION.labels(channel, stage).observe(seconds)
+
+
+def route_template(scope) -> str:
+    """The request path with path parameter values put back as {name}; "unmatched" for 404s."""
+    if scope.get("route") is None:
+        return "unmatched"
+    names = {str(value): name for name, value in scope.get("path_params", {}).items()}
+    return "/".join(f"{{{names[part]}}}" if part in names else part for part in scope["path"].split("/"))
+
+
+class MetricsMiddleware:
+    """
+    Times HTTP requests by route template (/api/v1/upload/{job_id}, not
+    the raw path) so ids in the path do not multiply the series.
+    Websockets are left to the voice stage metrics.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUEST_DURATION.labels(scope["method"], route_template(scope), str(status)).observe(time.perf_counter() - start)
+
+
+def metrics_response() -> Response:
+    """Prometheus exposition; aggregates all workers when PROMETHEUS_MULTIPROC_DIR is set."""
+    registry: Optional[CollectorRegistry] = REGISTRY
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
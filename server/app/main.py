@@ -1,13 +1,43 @@
 # In: apps/backend/app/main.py
 
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.endpoints import chat, upload , live_chat, sarvam_chat 
+from app.core.logger import configure_logging
+from app.core.telemetry import MetricsMiddleware, configure_tracing, metrics_response
+from app.services.ingestion import ingestion_service
+from app.services.sarvam_service import sarvam_service
+from app.services.tts_cache import tts_cache
+from app.tools.web_search import web_search_client
+
+configure_logging()
+configure_tracing()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Start background services on startup, stop them on shutdown
+    await ingestion_service.start()
+    await sarvam_service.start()
+    await web_search_client.start()
+    # Warm the TTS cache with the canned phrases without delaying startup
+    prewarm_task = asyncio.create_task(sarvam_service.prewarm_tts())
+    yield
+    prewarm_task.cancel()
+    await asyncio.gather(prewarm_task, return_exceptions=True)
+    await sarvam_service.close()
+    await web_search_client.close()
+    await tts_cache.flush()
+    await ingestion_service.stop()
+
 
 # Create the FastAPI app instance
 app = FastAPI(
     title="Intelligent Chatbot API",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # --- ADD THIS CORS MIDDLEWARE SECTION ---
@@ -28,6 +58,9 @@ app.add_middleware(
 )
 # -----------------------------------------
 
+# Request latency by route template, read from /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Include your API routers
 app.include_router(chat.router, prefix="/api/v1", tags=["Chat"])
 app.include_router(upload.router, prefix="/api/v1", tags=["File Upload"])
@@ -35,6 +68,10 @@ app.include_router(live_chat.router, prefix="/ws/v1", tags=["Live Chat"])
 app.include_router(sarvam_chat.router, prefix="/ws/v1", tags=["Sarvam Chat"])
 app.include_router(sarvam_chat.router, prefix="/api/v1", tags=["Sarvam API"])
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return metrics_response()
+
 @app.get("/", tags=["Root"])
 async def read_root():
     return {"message": "Welcome to the Intelligent Chatbot API!"}
\ No newline at end of file
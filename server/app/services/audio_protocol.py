@@ -0,0 +1,120 @@
+# apps/backend/app/services/audio_protocol.py
+import base64
+import json
+import struct
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+# Binary audio frame: version, frame type, reserved, sequence number (little endian),
+# followed by the payload. Control messages stay JSON text frames.
+FRAME_HEADER = struct.Struct("<BBHI")
+PROTOCOL_VERSION = 1
+
+FRAME_PCM16 = 1      # Raw 16-bit mono PCM
+FRAME_ENCODED = 2    # A complete audio file (e.g. WAV from Sarvam TTS)
+
+BINARY_AUDIO_FORMAT = "binary-v1"
+
+
+class FrameError(ValueError):
+    """Raised for binary frames that cannot be decoded."""
+
+
+def encode_frame(frame_type: int, sequence: int, payload: bytes) -> bytes:
+    return FRAME_HEADER.pack(PROTOCOL_VERSION, frame_type, 0, sequence & 0xFFFFFFFF) + payload
+
+
+def decode_frame(frame: bytes) -> Tuple[int, int, bytes]:
+    """Returns (frame type, sequence, payload)."""
+    if len(frame) < FRAME_HEADER.size:
+        raise FrameError(f"Frame too short: {len(frame)} bytes")
+    version, frame_type, _, sequence = FRAME_HEADER.unpack_from(frame)
+    if version != PROTOCOL_VERSION:
+        raise FrameError(f"Unsupported frame version {version}")
+    return frame_type, sequence, frame[FRAME_HEADER.size:]
+
+
+@dataclass
+class TransportStats:
+    frames_in: int = 0
+    frames_out: int = 0
+    audio_bytes_in: int = 0
+    audio_bytes_out: int = 0
+    sequence_gaps: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(self.__dict__)
+
+
+class AudioTransport:
+    """
+    Audio I/O over a websocket for both wire formats.
+
+    Clients that ask for `audioFormat: "binary-v1"` in their config message
+    exchange raw PCM in binary frames (see FRAME_HEADER). Older clients keep
+    the base64-in-JSON `audio_chunk` messages. Binary frames are accepted
+    from either kind of client.
+    """
+
+    def __init__(self, websocket: WebSocket, binary: bool = False):
+        self.websocket = websocket
+        self.binary = binary
+        self.stats = TransportStats()
+        self._sequence_out = 0
+        self._last_sequence_in: Optional[int] = None
+
+    @staticmethod
+    def wants_binary(config: dict) -> bool:
+        return config.get("audioFormat") == BINARY_AUDIO_FORMAT
+
+    async def announce(self) -> None:
+        """Tells the client which audio format this connection will use."""
+        await self.websocket.send_text(json.dumps({
+            "type": "protocol",
+            "audioFormat": BINARY_AUDIO_FORMAT if self.binary else "json-base64",
+        }))
+
+    async def receive(self) -> Tuple[Optional[bytes], Optional[dict]]:
+        """
+        Waits for the next message. Returns (audio, None) for audio, from
+        either format, and (None, message) for any other JSON message.
+        """
+        message = await self.websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000))
+
+        if message.get("bytes") is not None:
+            frame_type, sequence, payload = decode_frame(message["bytes"])
+            if self._last_sequence_in is not None and sequence != (self._last_sequence_in + 1) & 0xFFFFFFFF:
+                self.stats.sequence_gaps += 1
+            self._last_sequence_in = sequence
+            self.stats.frames_in += 1
+            self.stats.audio_bytes_in += len(payload)
+            return payload, None
+
+        data = json.loads(message["text"])
+        if "audio_chunk" in data:
+            audio = base64.b64decode(data["audio_chunk"])
+            self.stats.frames_in += 1
+            self.stats.audio_bytes_in += len(audio)
+            return audio, data
+        return None, data
+
+    async def send_audio(self, audio: bytes, frame_type: int = FRAME_PCM16, **legacy_fields) -> None:
+        """
+        Sends audio in the negotiated format. `legacy_fields` are only added
+        to the JSON message of old clients; binary clients get any metadata
+        in a separate control message.
+        """
+        self.stats.frames_out += 1
+        self.stats.audio_bytes_out += len(audio)
+        if self.binary:
+            await self.websocket.send_bytes(encode_frame(frame_type, self._sequence_out, audio))
+            self._sequence_out += 1
+            return
+        await self.websocket.send_text(json.dumps({
+            **legacy_fields,
+            "audio_chunk": base64.b64encode(audio).decode("utf-8"),
+        }))
@@ -0,0 +1,233 @@
+# apps/backend/app/services/audio_relay.py
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from app.core.config import settings
+
+
+class SendTimeout(Exception):
+    """Raised when a peer stopped accepting audio for too long."""
+
+
+@dataclass
+class DirectionStats:
+    frames_in: int = 0
+    frames_out: int = 0
+    merged_frames: int = 0
+    dropped_frames: int = 0
+    dropped_bytes: int = 0
+    send_timeouts: int = 0
+    peak_queued_bytes: int = 0
+    max_lag_ms: float = 0.0
+    lag_ms_total: float = 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "frames_in": self.frames_in,
+            "frames_out": self.frames_out,
+            "merged_frames": self.merged_frames,
+            "dropped_frames": self.dropped_frames,
+            "dropped_bytes": self.dropped_bytes,
+            "send_timeouts": self.send_timeouts,
+            "peak_queued_bytes": self.peak_queued_bytes,
+            "max_lag_ms": self.max_lag_ms,
+            "avg_lag_ms": self.lag_ms_total / self.frames_out if self.frames_out else 0.0,
+        }
+
+    def merge(self, other: "DirectionStats") -> None:
+        for name in ("frames_in", "frames_out", "merged_frames", "dropped_frames", "dropped_bytes",
+                     "send_timeouts", "lag_ms_total"):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.peak_queued_bytes = max(self.peak_queued_bytes, other.peak_queued_bytes)
+        self.max_lag_ms = max(self.max_lag_ms, other.max_lag_ms)
+
+
+@dataclass
+class RelayStats:
+    upstream: DirectionStats = field(default_factory=DirectionStats)     # browser -> model
+    downstream: DirectionStats = field(default_factory=DirectionStats)   # model -> browser
+
+    def as_dict(self) -> Dict[str, dict]:
+        return {"upstream": self.upstream.as_dict(), "downstream": self.downstream.as_dict()}
+
+
+class AudioQueue:
+    """
+    Byte-bounded queue of raw PCM between a producer and a slower consumer.
+
+    While the consumer is busy, new audio is merged into the last queued
+    frame (up to `merge_bytes`), so a backlog turns into a few large sends
+    instead of many small ones. If the backlog still exceeds `max_bytes`,
+    frames are dropped from the `drop` end: "oldest" keeps the freshest audio
+    (live microphone input), "newest" keeps what is already queued.
+    """
+
+    def __init__(self, stats: DirectionStats, max_bytes: int, merge_bytes: int, drop: str = "oldest"):
+        self.stats = stats
+        self.max_bytes = max_bytes
+        self.merge_bytes = merge_bytes
+        self.drop = drop
+        self._frames: deque = deque()   # [bytearray, enqueued_at]
+        self._bytes = 0
+        self._ready = asyncio.Event()
+
+    @property
+    def queued_bytes(self) -> int:
+        return self._bytes
+
+    def put_nowait(self, data: bytes) -> None:
+        self.stats.frames_in += 1
+        if self.drop == "newest" and self._frames and self._bytes + len(data) > self.max_bytes:
+            self.stats.dropped_frames += 1
+            self.stats.dropped_bytes += len(data)
+            return
+
+        if self._frames and len(self._frames[-1][0]) + len(data) <= self.merge_bytes:
+            self._frames[-1][0].extend(data)
+            self.stats.merged_frames += 1
+        else:
+            self._frames.append([bytearray(data), time.monotonic()])
+        self._bytes += len(data)
+
+        while self._bytes > self.max_bytes and len(self._frames) > 1:
+            dropped, _ = self._frames.popleft()
+            self._bytes -= len(dropped)
+            self.stats.dropped_frames += 1
+            self.stats.dropped_bytes += len(dropped)
+
+        self.stats.peak_queued_bytes = max(self.stats.peak_queued_bytes, self._bytes)
+        self._ready.set()
+
+    async def get(self) -> bytes:
+        while not self._frames:
+            self._ready.clear()
+            await self._ready.wait()
+        data, enqueued_at = self._frames.popleft()
+        self._bytes -= len(data)
+        lag_ms = (time.monotonic() - enqueued_at) * 1000
+        self.stats.frames_out += 1
+        self.stats.lag_ms_total += lag_ms
+        self.stats.max_lag_ms = max(self.stats.max_lag_ms, lag_ms)
+        return bytes(data)
+
+
+async def pump(
+    queue: AudioQueue,
+    send: Callable[[bytes], Awaitable[None]],
+    timeout: float = settings.LIVE_SEND_TIMEOUT,
+    max_timeouts: int = settings.LIVE_MAX_SEND_TIMEOUTS,
+) -> None:
+    """
+    Drains `queue` into `send`. A send that takes longer than `timeout` is
+    abandoned (the audio is lost); after `max_timeouts` in a row the peer is
+    considered stalled and SendTimeout ends the relay.
+    """
+    consecutive = 0
+    while True:
+        data = await queue.get()
+        try:
+            await asyncio.wait_for(send(data), timeout)
+            consecutive = 0
+        except asyncio.TimeoutError:
+            queue.stats.send_timeouts += 1
+            consecutive += 1
+            if consecutive >= max_timeouts:
+                raise SendTimeout(f"Peer did not accept audio for {consecutive} sends in a row")
+
+
+async def run_until_first_exit(*coros) -> None:
+    """
+    Runs the coroutines as tasks until the first one returns or raises,
+    then cancels the others and waits for them, so neither side of a relay
+    outlives the other. The first error, if any, is re-raised.
+    """
+    tasks = [asyncio.create_task(coro) for coro in coros]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task.result()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class LiveRelayMetrics:
+    """Totals over all Live relay connections, served by /live-chat/stats."""
+
+    def __init__(self):
+        self.active_connections = 0
+        self.connections = 0
+        self.totals = RelayStats()
+
+    def opened(self) -> RelayStats:
+        self.active_connections += 1
+        self.connections += 1
+        return RelayStats()
+
+    def closed(self, stats: RelayStats) -> None:
+        self.active_connections -= 1
+        self.totals.upstream.merge(stats.upstream)
+        self.totals.downstream.merge(stats.downstream)
+
+    def as_dict(self) -> dict:
+        return {
+            "active_connections": self.active_connections,
+            "connections": self.connections,
+            **self.totals.as_dict(),
+        }
+
+
+# Global instance
+live_relay_metrics = LiveRelayMetrics()
+
+
+async def relay_audio(
+    receive_from_client: Callable[[], Awaitable[Optional[bytes]]],
+    send_to_client: Callable[[bytes], Awaitable[None]],
+    send_to_model: Callable[[bytes], Awaitable[None]],
+    model_audio: Callable[[], AsyncIterator[bytes]],
+    stats: RelayStats,
+) -> None:
+    """
+    Bidirectional audio relay with one bounded queue per direction.
+
+    Four tasks: client reader, model writer, model reader, client writer.
+    Readers never wait on the other side, so a slow peer only grows (and
+    then trims) its own queue. The relay ends as soon as any task ends,
+    e.g. on a disconnect, a stalled peer or a model error.
+    """
+    upstream = AudioQueue(
+        stats.upstream,
+        max_bytes=settings.LIVE_UPSTREAM_MAX_BYTES,
+        merge_bytes=settings.LIVE_MERGE_BYTES,
+        drop="oldest",
+    )
+    downstream = AudioQueue(
+        stats.downstream,
+        max_bytes=settings.LIVE_DOWNSTREAM_MAX_BYTES,
+        merge_bytes=settings.LIVE_MERGE_BYTES,
+        drop="oldest",
+    )
+
+    async def read_client():
+        while True:
+            data = await receive_from_client()
+            if data:
+                upstream.put_nowait(data)
+
+    async def read_model():
+        while True:
+            # model_audio() ends at each turn boundary; start listening again
+            async for data in model_audio():
+                downstream.put_nowait(data)
+
+    await run_until_first_exit(
+        read_client(),
+        pump(upstream, send_to_model),
+        read_model(),
+        pump(downstream, send_to_client),
+    )
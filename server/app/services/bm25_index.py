@@ -0,0 +1,160 @@
+# apps/backend/app/services/bm25_index.py
+import math
+import re
+import threading
+from collections import Counter, OrderedDict, defaultdict
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.documents import Document
+
+from app.core.config import settings
+
+# Keeps SKUs, model numbers and sizes together ("sku-1234", "xl/42", "v2.1")
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[-_./][a-z0-9]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens; compound codes are indexed whole and by their parts."""
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        tokens.append(token)
+        parts = re.split(r"[-_./]", token)
+        if len(parts) > 1:
+            tokens.extend(part for part in parts if part)
+    return tokens
+
+
+class BM25Index:
+    """
+    Incremental Okapi BM25 inverted index. Adding documents only touches the
+    postings of their own terms, and a search only scores documents that
+    share at least one term with the query.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.documents: List[Document] = []
+        self.ids: List[str] = []
+        self._id_set = set()
+        self._lengths: List[int] = []
+        self._total_length = 0
+        self._postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def add(self, ids: Sequence[str], documents: Sequence[Document]) -> None:
+        for doc_id, doc in zip(ids, documents):
+            if doc_id in self._id_set:
+                continue
+            index = len(self.documents)
+            terms = Counter(tokenize(doc.page_content))
+            length = sum(terms.values())
+            # Document data first, postings last, so a concurrent search
+            # never sees a posting for a document that is not there yet
+            self.documents.append(doc)
+            self.ids.append(doc_id)
+            self._id_set.add(doc_id)
+            self._lengths.append(length)
+            self._total_length += length
+            for term, freq in terms.items():
+                self._postings[term][index] = freq
+
+    def search(self, query: str, k: int) -> List[Tuple[str, Document, float]]:
+        if not self.documents:
+            return []
+        n_docs = len(self.documents)
+        avg_length = self._total_length / n_docs
+        scores: Dict[int, float] = defaultdict(float)
+
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for index, freq in list(postings.items()):
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[index] / avg_length)
+                scores[index] += idf * freq * (self.k1 + 1) / (freq + norm)
+
+        best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(self.ids[index], self.documents[index], score) for index, score in best]
+
+
+class SessionKeywordIndex:
+    """
+    Per-session BM25 indexes, kept in an LRU. An index that is not in memory
+    (new process, evicted session) is rebuilt once from the vector store via
+    `loader`, then kept up to date by `add` on every ingestion.
+
+    Searches may pass the session's current document version: an index
+    built at another version is rebuilt, so uploads handled by another
+    worker are picked up. Without a version the index in memory is used.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str], Tuple[List[str], List[Document]]],
+        max_sessions: int = settings.SESSION_CONTEXT_CACHE_SIZE,
+    ):
+        self.loader = loader
+        self.max_sessions = max_sessions
+        self._indexes: "OrderedDict[str, Tuple[BM25Index, Optional[int]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cached(self, session_id: str, version: Optional[int]) -> Optional[BM25Index]:
+        entry = self._indexes.get(session_id)
+        if entry is None or (version is not None and entry[1] != version):
+            return None
+        self._indexes.move_to_end(session_id)
+        return entry[0]
+
+    def _get(self, session_id: str, version: Optional[int] = None) -> BM25Index:
+        with self._lock:
+            index = self._cached(session_id, version)
+            if index is not None:
+                return index
+
+        index = BM25Index()
+        ids, documents = self.loader(session_id)
+        index.add(ids, documents)
+
+        with self._lock:
+            # Another thread may have loaded the same version meanwhile
+            current = self._cached(session_id, version)
+            if current is not None:
+                return current
+            self._indexes[session_id] = (index, version)
+            self._indexes.move_to_end(session_id)
+            while len(self._indexes) > self.max_sessions:
+                self._indexes.popitem(last=False)
+        return index
+
+    def add(self, session_id: str, ids: Sequence[str], documents: Sequence[Document]) -> None:
+        index = self._get(session_id)
+        with self._lock:
+            index.add(ids, documents)
+
+    def search(
+        self, session_id: str, query: str, k: int, version: Optional[int] = None
+    ) -> List[Tuple[str, Document, float]]:
+        return self._get(session_id, version).search(query, k)
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: Sequence[Sequence[Tuple[str, Document]]],
+    k: int,
+    rrf_k: int = settings.RAG_RRF_K,
+) -> List[Document]:
+    """
+    Fuses several ranked (id, document) lists: each document scores
+    sum(1 / (rrf_k + rank)) over the lists it appears in.
+    """
+    scores: Dict[str, float] = defaultdict(float)
+    documents: Dict[str, Document] = {}
+    for ranked in ranked_lists:
+        for rank, (doc_id, doc) in enumerate(ranked, start=1):
+            scores[doc_id] += 1.0 / (rrf_k + rank)
+            documents.setdefault(doc_id, doc)
+    best = sorted(scores, key=scores.get, reverse=True)[:k]
+    return [documents[doc_id] for doc_id in best]
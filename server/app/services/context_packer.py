@@ -0,0 +1,266 @@
+# apps/backend/app/services/context_packer.py
+import math
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+
+from langchain_core.documents import Document
+
+from app.core.config import settings
+from app.core.session import estimate_tokens
+from app.services.bm25_index import tokenize
+from app.services.voice_pipeline import split_sentences
+
+# Question words and glue that say nothing about which passage is relevant
+STOPWORDS = {
+    "a", "an", "and", "are", "at", "be", "by", "can", "do", "does", "for", "from", "how", "i", "in", "is",
+    "it", "me", "my", "of", "on", "or", "the", "this", "to", "was", "what", "when", "where", "which",
+    "who", "why", "with", "you",
+}
+
+# A chunk is only cut to fit when at least this much budget is left for it
+MIN_TRIMMED_TOKENS = 60
+
+
+def trim_to_budget(text: str, query: str, max_tokens: int) -> str:
+    """
+    Keeps the sentences of `text` that best match the query, up to
+    `max_tokens`, in their original order. Sentences are scored by how many
+    query terms they contain, normalised by length so long boilerplate
+    does not win, with a small bonus for appearing early in the text.
+    Sentences without any query term (navigation, cookie banners) are only
+    used when nothing matches at all.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    sentences = split_sentences(text)
+    query_terms = set(tokenize(query)) - STOPWORDS
+
+    scored = []
+    for index, sentence in enumerate(sentences):
+        terms = tokenize(sentence)
+        overlap = len(query_terms.intersection(terms))
+        scored.append((overlap / math.sqrt(len(terms) + 1) + 0.1 / (index + 1), overlap, index))
+    if any(overlap for _, overlap, _ in scored):
+        scored = [item for item in scored if item[1]]
+
+    kept, used = [], 0
+    for _, _, index in sorted(scored, reverse=True):
+        sentence = sentences[index]
+        cost = estimate_tokens(sentence)
+        if used + cost > max_tokens:
+            continue
+        kept.append(index)
+        used += cost
+    if not kept:
+        # A single sentence longer than the whole budget: cut it
+        return text[: max_tokens * 4]
+    return " ".join(sentences[index] for index in sorted(kept))
+
+
+def _overlap(a: str, b: str, min_chars: int) -> int:
+    """Length of the longest suffix of `a` that is also a prefix of `b` (0 if under min_chars)."""
+    probe = b[:min_chars]
+    if len(probe) < min_chars:
+        return 0
+    start = a.find(probe, max(0, len(a) - len(b)))
+    while start != -1:
+        if b.startswith(a[start:]):
+            return len(a) - start
+        start = a.find(probe, start + 1)
+    return 0
+
+
+def _join(a: str, b: str, min_chars: int) -> Optional[str]:
+    """Joins two chunks of the same source if one contains or runs on into the other."""
+    if b in a:
+        return a
+    if a in b:
+        return b
+    size = _overlap(a, b, min_chars)
+    if size:
+        return a + b[size:]
+    size = _overlap(b, a, min_chars)
+    if size:
+        return b + a[size:]
+    return None
+
+
+def _pages(doc: Document) -> List[int]:
+    if "pages" in doc.metadata:
+        return list(doc.metadata["pages"])
+    return [doc.metadata["page"]] if isinstance(doc.metadata.get("page"), int) else []
+
+
+def merge_overlapping(documents: List[Document], min_chars: int = settings.CONTEXT_MIN_OVERLAP_CHARS) -> List[Document]:
+    """
+    Merges chunks of the same source whose text overlaps, e.g. neighbouring
+    chunks from the splitter's 200-character overlap, into one passage.
+    Passages keep the rank of their best chunk.
+    """
+    merged: List[Document] = []
+    for doc in documents:
+        merged.append(doc)
+        i = len(merged) - 1
+        j = 0
+        while j < len(merged):
+            other = merged[j]
+            if j == i or other.metadata.get("source") != merged[i].metadata.get("source"):
+                j += 1
+                continue
+            first, second = min(i, j), max(i, j)
+            joined = _join(merged[first].page_content, merged[second].page_content, min_chars)
+            if joined is None:
+                j += 1
+                continue
+            # The joined passage takes the better-ranked slot, then is checked
+            # against the others again, since the longer text may overlap one
+            pages = sorted(set(_pages(merged[first])) | set(_pages(merged[second])))
+            merged[first] = Document(page_content=joined, metadata={**merged[first].metadata, "pages": pages})
+            del merged[second]
+            i, j = first, 0
+    return merged
+
+
+def document_name(doc: Document) -> str:
+    """
+    The name the file was uploaded under. Chunks stored before the name was
+    recorded only have "source", the upload's temporary path.
+    """
+    return doc.metadata.get("filename") or os.path.basename(str(doc.metadata.get("source", ""))) or "document"
+
+
+def citation(doc: Document) -> str:
+    """Compact source label: the file name and pages, or the URL of a web result."""
+    if doc.metadata.get("web"):
+        return f"Web: {doc.metadata.get('source', '')}"
+    name = document_name(doc)
+    pages = _pages(doc)
+    if not pages:
+        return name
+    # Page numbers are stored 0-based
+    if pages[0] == pages[-1]:
+        return f"{name} p.{pages[0] + 1}"
+    return f"{name} p.{pages[0] + 1}-{pages[-1] + 1}"
+
+
+def _similarity(a: Set[str], b: Set[str]) -> float:
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+@dataclass
+class PackedContext:
+    text: str
+    tokens: int
+    citations: List[str]
+    tokens_in: int       # What joining the raw chunks would have cost
+
+
+@dataclass
+class PackerStats:
+    packs: int = 0
+    chunks_in: int = 0
+    passages_out: int = 0
+    tokens_in: int = 0
+    tokens_out: int = 0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "packs": self.packs,
+            "chunks_in": self.chunks_in,
+            "passages_out": self.passages_out,
+            "tokens_in": self.tokens_in,
+            "tokens_out": self.tokens_out,
+            "tokens_saved_ratio": 1 - self.tokens_out / self.tokens_in if self.tokens_in else 0.0,
+        }
+
+
+class ContextPacker:
+    """
+    Turns retrieved chunks into the context block of a prompt:
+
+    1. merges overlapping chunks of the same source into single passages
+    2. picks passages by maximal marginal relevance (retrieval rank and
+       query-term overlap, minus word overlap with passages already
+       picked) until the token budget of the route is spent, cutting the
+       last one down to its most relevant sentences if needed
+    3. numbers each passage with a compact citation, e.g. "[2] policy.pdf p.3"
+
+    Budgets come from CONTEXT_TOKEN_BUDGETS, keyed by route or by
+    "route:model" for a model-specific override.
+    """
+
+    def __init__(
+        self,
+        budgets: Dict[str, int] = settings.CONTEXT_TOKEN_BUDGETS,
+        default_budget: int = settings.CONTEXT_DEFAULT_TOKEN_BUDGET,
+        mmr_lambda: float = settings.CONTEXT_MMR_LAMBDA,
+    ):
+        self.budgets = budgets
+        self.default_budget = default_budget
+        self.mmr_lambda = mmr_lambda
+        self.stats = PackerStats()
+
+    def budget_for(self, route: str, model: Optional[str] = None) -> int:
+        if model and f"{route}:{model}" in self.budgets:
+            return self.budgets[f"{route}:{model}"]
+        return self.budgets.get(route, self.default_budget)
+
+    def _select(self, query: Optional[str], passages: List[Document], budget: int) -> List[Document]:
+        query_terms = set(tokenize(query or "")) - STOPWORDS
+        terms = [set(tokenize(doc.page_content)) - STOPWORDS for doc in passages]
+        relevance = []
+        for rank, passage_terms in enumerate(terms):
+            score = 1 - rank / len(passages)
+            if query_terms:
+                score = (score + len(query_terms & passage_terms) / len(query_terms)) / 2
+            relevance.append(score)
+
+        selected, used = [], 0
+        remaining = list(range(len(passages)))
+        while remaining and used < budget:
+            best = max(remaining, key=lambda i: self.mmr_lambda * relevance[i] - (1 - self.mmr_lambda) * max(
+                (_similarity(terms[i], terms[j]) for j in selected), default=0.0))
+            remaining.remove(best)
+            passage = passages[best]
+            cost = estimate_tokens(passage.page_content)
+            if used + cost > budget:
+                if budget - used < MIN_TRIMMED_TOKENS:
+                    continue
+                passage = Document(
+                    page_content=trim_to_budget(passage.page_content, query or "", budget - used),
+                    metadata=passage.metadata,
+                )
+                cost = estimate_tokens(passage.page_content)
+            selected.append(best)
+            passages[best] = passage
+            used += cost
+        return [passages[i] for i in selected]
+
+    def pack(
+        self,
+        query: Optional[str],
+        documents: List[Document],
+        route: str,
+        model: Optional[str] = None,
+    ) -> PackedContext:
+        """Packs ranked documents into a cited context block within the route's budget."""
+        tokens_in = estimate_tokens("\n\n".join(doc.page_content for doc in documents)) if documents else 0
+        passages = self._select(query, merge_overlapping(documents), self.budget_for(route, model))
+        citations = [citation(doc) for doc in passages]
+        text = "\n\n".join(
+            f"[{number}] {label}\n{doc.page_content}"
+            for number, (label, doc) in enumerate(zip(citations, passages), start=1)
+        )
+        tokens = estimate_tokens(text) if text else 0
+
+        self.stats.packs += 1
+        self.stats.chunks_in += len(documents)
+        self.stats.passages_out += len(passages)
+        self.stats.tokens_in += tokens_in
+        self.stats.tokens_out += tokens
+        return PackedContext(text=text, tokens=tokens, citations=citations, tokens_in=tokens_in)
+
+
+# Global instance
+context_packer = ContextPacker()
@@ -1,23 +1,123 @@
 # apps/backend/app/services/document_parser.py
+import multiprocessing
+from collections import deque
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 from langchain_community.document_loaders import (
-    PyPDFLoader,
     Docx2txtLoader,
     UnstructuredFileLoader,
     TextLoader,
     CSVLoader,
 )
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from typing import List
+from typing import Iterator, List, Optional
 from langchain_core.documents import Document
+from pypdf import PdfReader
 
-def parse_file(file_path: str, file_type: str) -> List[Document]:
+from app.core.config import settings
+
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_text_splitter() -> RecursiveCharacterTextSplitter:
+    # Split documents into smaller chunks for better RAG performance
+    return RecursiveCharacterTextSplitter(
+        chunk_size=1000,
+        chunk_overlap=200,
+        length_function=len
+    )
+
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    """Lazily creates the process pool used to parse large PDFs by page range."""
+    global _pdf_pool
+    if _pdf_pool is None:
+        _pdf_pool = ProcessPoolExecutor(
+            max_workers=settings.PDF_PARSE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pdf_pool
+
+
+def _pdf_metadata(reader: PdfReader, file_path: str) -> dict:
     """
-    Parses a file based on its type and returns a list of Document chunks.
+    Document-level metadata in the shape PyPDFLoader produced: the PDF's info
+    fields (producer, creator, dates...) with lower-cased keys, plus the
+    source and page count.
+    """
+    metadata = {"producer": "PyPDF", "creator": "PyPDF", "creationdate": ""}
+    for key, value in (reader.metadata or {}).items():
+        key = key.lstrip("/").lower()
+        value = value if isinstance(value, (str, int)) else str(value)
+        if key in ("creationdate", "moddate"):
+            try:
+                value = datetime.strptime(value.replace("'", ""), "D:%Y%m%d%H%M%S%z").isoformat("T")
+            except ValueError:
+                pass
+        metadata[key] = value.strip() if isinstance(value, str) else value
+    metadata.update({"source": file_path, "total_pages": len(reader.pages)})
+    return metadata
+
+
+def _parse_pdf_pages(file_path: str, start: int, end: int) -> List[Document]:
+    """
+    Extracts and chunks pages [start, end) of a PDF. Runs in a worker process,
+    so only this page range is ever held in memory.
+    """
+    reader = PdfReader(file_path)
+    splitter = _get_text_splitter()
+    metadata = _pdf_metadata(reader, file_path)
+    pages = [
+        Document(
+            page_content=reader.pages[page].extract_text() or "",
+            metadata={**metadata, "page": page, "page_label": reader.page_labels[page]},
+        )
+        for page in range(start, end)
+    ]
+    return splitter.split_documents(pages)
+
+
+def _iter_pdf_chunks(file_path: str) -> Iterator[Document]:
+    page_count = len(PdfReader(file_path).pages)
+    pages_per_task = settings.PDF_PAGES_PER_TASK
+
+    # Small files are not worth the round trip to another process
+    if page_count <= pages_per_task:
+        yield from _parse_pdf_pages(file_path, 0, page_count)
+        return
+
+    pool = _get_pdf_pool()
+    ranges = iter([(start, min(start + pages_per_task, page_count)) for start in range(0, page_count, pages_per_task)])
+    # Keep only a few page ranges in flight so memory stays bounded and
+    # results can be yielded in page order as soon as they are ready.
+    in_flight = deque()
+    for _ in range(settings.PDF_PARSE_WORKERS * 2):
+        page_range = next(ranges, None)
+        if page_range is None:
+            break
+        in_flight.append(pool.submit(_parse_pdf_pages, file_path, *page_range))
+
+    while in_flight:
+        chunks = in_flight.popleft().result()
+        page_range = next(ranges, None)
+        if page_range is not None:
+            in_flight.append(pool.submit(_parse_pdf_pages, file_path, *page_range))
+        yield from chunks
+
+
+def iter_chunks(file_path: str, file_type: str) -> Iterator[Document]:
+    """
+    Parses a file based on its type and yields Document chunks page by page,
+    in document order. PDFs are parsed in a process pool by page range; other
+    formats are loaded lazily and split one loaded document at a time.
     """
     file_type = file_type.lower().strip('.')
-    
+
+    if file_type == 'pdf':
+        yield from _iter_pdf_chunks(file_path)
+        return
+
     loader_map = {
-        'pdf': PyPDFLoader,
         'docx': Docx2txtLoader,
         'doc': Docx2txtLoader,
         'txt': TextLoader,
@@ -35,13 +135,14 @@ def parse_file(file_path: str, file_type: str) -> List[Document]:
         # Fallback for other types like .xlsx, .pptx, etc.
         loader = UnstructuredFileLoader(file_path)
 
-    documents = loader.load()
+    text_splitter = _get_text_splitter()
+    for document in loader.lazy_load():
+        yield from text_splitter.split_documents([document])
 
-    # Split documents into smaller chunks for better RAG performance
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=200,
-        length_function=len
-    )
-    
-    return text_splitter.split_documents(documents)
\ No newline at end of file
+
+def parse_file(file_path: str, file_type: str) -> List[Document]:
+    """
+    Parses a file based on its type and returns a list of Document chunks.
+    Prefer iter_chunks for large files.
+    """
+    return list(iter_chunks(file_path, file_type))
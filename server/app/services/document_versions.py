@@ -0,0 +1,96 @@
+# apps/backend/app/services/document_versions.py
+from typing import Optional
+
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+DOC_VERSION_KEY_PREFIX = "doc_version:"
+
+
+class DocumentVersions:
+    """
+    Version number of each session's uploaded documents, kept in Redis so
+    that every worker sees an upload, whichever worker ingested it.
+
+    Ingestion bumps the version once a file is stored. The per-process
+    state built from a session's documents (response cache buckets, voice
+    context bundles, BM25 indexes) records the version it was built at and
+    is rebuilt when the current one differs.
+
+    `get` returns None when Redis is unavailable; callers then decide
+    whether to use what they have or to skip their cache.
+    """
+
+    def __init__(
+        self,
+        redis_client_factory=None,
+        sync_redis_client_factory=None,
+        ttl_seconds: int = settings.HISTORY_TTL_SECONDS,
+    ):
+        self._redis_factory = redis_client_factory
+        self._sync_redis_factory = sync_redis_client_factory
+        self._redis = None
+        self._sync_redis = None
+        self.ttl_seconds = ttl_seconds
+
+    def _redis_client(self):
+        if self._redis is None:
+            self._redis = self._redis_factory()
+        return self._redis
+
+    def _sync_redis_client(self):
+        if self._sync_redis is None:
+            self._sync_redis = self._sync_redis_factory()
+        return self._sync_redis
+
+    def _key(self, session_id: str) -> str:
+        return DOC_VERSION_KEY_PREFIX + session_id
+
+    async def get(self, session_id: str) -> Optional[int]:
+        """Current version of the session's documents; 0 before the first upload."""
+        try:
+            return int(await self._redis_client().get(self._key(session_id)) or 0)
+        except Exception as e:
+            logger.warning("doc_version.load_failed", session_id=session_id, error=e)
+            return None
+
+    def get_sync(self, session_id: str) -> Optional[int]:
+        """Blocking `get`, for the synchronous retrieval path."""
+        try:
+            return int(self._sync_redis_client().get(self._key(session_id)) or 0)
+        except Exception as e:
+            logger.warning("doc_version.load_failed", session_id=session_id, error=e)
+            return None
+
+    async def bump(self, session_id: str) -> Optional[int]:
+        """Marks the session's documents as changed. Expires with the conversation history."""
+        key = self._key(session_id)
+        try:
+            async with self._redis_client().pipeline(transaction=False) as pipe:
+                pipe.incr(key)
+                pipe.expire(key, self.ttl_seconds)
+                version, _ = await pipe.execute()
+            return version
+        except Exception as e:
+            logger.warning("doc_version.bump_failed", session_id=session_id, error=e)
+            return None
+
+
+def _shared_redis_client():
+    # Imported on first use so the store works in scripts without the chat stack
+    from app.core.session import get_redis_client
+    return get_redis_client()
+
+
+def _shared_sync_redis_client():
+    import redis
+    return redis.Redis.from_url(settings.REDIS_URL)
+
+
+# Global instance
+document_versions = DocumentVersions(
+    redis_client_factory=_shared_redis_client,
+    sync_redis_client_factory=_shared_sync_redis_client,
+)
@@ -0,0 +1,202 @@
+# apps/backend/app/services/embedding_cache.py
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from app.core.config import settings
+from app.core.telemetry import external_call
+
+
+@dataclass
+class EmbeddingCacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    embedded_batches: int = 0
+
+    def as_dict(self) -> Dict[str, float]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        hits = self.memory_hits + self.disk_hits
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "embedded_batches": self.embedded_batches,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+
+class EmbeddingStore:
+    """
+    Two-tier vector store keyed by content hash: an in-memory LRU in front of
+    a SQLite table holding raw float32 bytes (4 bytes per dimension).
+    """
+
+    def __init__(self, path: Optional[str], memory_items: int):
+        self.memory_items = memory_items
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+            self._db.commit()
+
+    def get_many(self, keys: List[str], stats: EmbeddingCacheStats) -> Dict[str, np.ndarray]:
+        found: Dict[str, np.ndarray] = {}
+        missing = []
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+                    stats.memory_hits += 1
+                else:
+                    missing.append(key)
+
+            if missing and self._db is not None:
+                placeholders = ",".join("?" * len(missing))
+                rows = self._db.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", missing
+                ).fetchall()
+                for key, blob in rows:
+                    vector = np.frombuffer(blob, dtype=np.float32)
+                    found[key] = vector
+                    self._remember(key, vector)
+                    stats.disk_hits += 1
+
+            stats.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items: Dict[str, np.ndarray]) -> None:
+        with self._lock:
+            for key, vector in items.items():
+                self._remember(key, vector)
+            if self._db is not None:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [(key, vector.tobytes()) for key, vector in items.items()],
+                )
+                self._db.commit()
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps any LangChain Embeddings so identical texts are never embedded twice.
+
+    Texts are keyed by a SHA-256 of their content (documents and queries are
+    kept apart). Cache misses are deduplicated and sent to the underlying
+    model in batches of `batch_size`, with at most `max_concurrency` batches
+    in flight. The async methods read and write the SQLite tier in a worker
+    thread, so a cache lookup never blocks the event loop on disk I/O.
+    """
+
+    def __init__(
+        self,
+        underlying: Embeddings,
+        namespace: str,
+        cache_path: Optional[str] = None,
+        memory_items: int = settings.EMBEDDING_CACHE_MEMORY_ITEMS,
+        batch_size: int = settings.EMBEDDING_BATCH_SIZE,
+        max_concurrency: int = settings.EMBEDDING_MAX_CONCURRENCY,
+    ):
+        self.underlying = underlying
+        self.namespace = namespace
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.stats = EmbeddingCacheStats()
+        self.store = EmbeddingStore(cache_path, memory_items)
+
+    def _key(self, kind: str, text: str) -> str:
+        return hashlib.sha256(f"{self.namespace}\x00{kind}\x00{text}".encode("utf-8")).hexdigest()
+
+    def _batches(self, texts: List[str]) -> List[List[str]]:
+        return [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+
+    def _plan(self, texts: List[str], kind: str):
+        """Returns keys for every text, cached vectors, and unique texts still to embed."""
+        keys = [self._key(kind, text) for text in texts]
+        found = self.store.get_many(list(dict.fromkeys(keys)), self.stats)
+        to_embed: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in to_embed:
+                to_embed[key] = text
+        return keys, found, to_embed
+
+    def _finish(self, keys: List[str], found: Dict[str, np.ndarray], new_keys: List[str], vectors) -> List[List[float]]:
+        fresh = {key: np.asarray(vector, dtype=np.float32) for key, vector in zip(new_keys, vectors)}
+        if fresh:
+            self.store.put_many(fresh)
+            found.update(fresh)
+        return [found[key].tolist() for key in keys]
+
+    def _embed_batch(self, batch: List[str]) -> List[List[float]]:
+        with external_call("embedding", "documents", self.namespace, batch_size=len(batch)):
+            return self.underlying.embed_documents(batch)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, found, to_embed = self._plan(texts, "doc")
+        new_keys, new_texts = list(to_embed.keys()), list(to_embed.values())
+
+        vectors: List[List[float]] = []
+        if new_texts:
+            batches = self._batches(new_texts)
+            self.stats.embedded_batches += len(batches)
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+                for batch_vectors in pool.map(self._embed_batch, batches):
+                    vectors.extend(batch_vectors)
+
+        return self._finish(keys, found, new_keys, vectors)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, found, to_embed = await asyncio.to_thread(self._plan, texts, "doc")
+        new_keys, new_texts = list(to_embed.keys()), list(to_embed.values())
+
+        vectors: List[List[float]] = []
+        if new_texts:
+            batches = self._batches(new_texts)
+            self.stats.embedded_batches += len(batches)
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+
+            async def embed_batch(batch: List[str]):
+                async with semaphore:
+                    with external_call("embedding", "documents", self.namespace, batch_size=len(batch)):
+                        return await self.underlying.aembed_documents(batch)
+
+            for batch_vectors in await asyncio.gather(*(embed_batch(batch) for batch in batches)):
+                vectors.extend(batch_vectors)
+
+        return await asyncio.to_thread(self._finish, keys, found, new_keys, vectors)
+
+    def embed_query(self, text: str) -> List[float]:
+        keys, found, to_embed = self._plan([text], "query")
+        vectors = []
+        if to_embed:
+            with external_call("embedding", "query", self.namespace):
+                vectors = [self.underlying.embed_query(text)]
+        return self._finish(keys, found, list(to_embed.keys()), vectors)[0]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        keys, found, to_embed = await asyncio.to_thread(self._plan, [text], "query")
+        vectors = []
+        if to_embed:
+            with external_call("embedding", "query", self.namespace):
+                vectors = [await self.underlying.aembed_query(text)]
+        return (await asyncio.to_thread(self._finish, keys, found, list(to_embed.keys()), vectors))[0]
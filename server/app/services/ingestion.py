@@ -0,0 +1,234 @@
+# apps/backend/app/services/ingestion.py
+import asyncio
+import itertools
+import os
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+from langchain_core.documents import Document
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.core.session import get_redis_client
+from app.services import document_parser, vector_store
+from app.services.document_versions import document_versions
+from app.services.response_cache import response_cache
+from app.services.session_context import session_context
+
+logger = get_logger(__name__)
+
+
+# Redis set of file hashes fully ingested per session
+INGESTED_FILES_PREFIX = "ingested_files:"
+
+
+class IngestionQueueFull(Exception):
+    """Raised when the ingestion queue cannot accept another job."""
+
+
+class JobCancelled(Exception):
+    """Raised inside a worker when the job it is processing was cancelled."""
+
+
+@dataclass
+class IngestionJob:
+    session_id: str
+    filename: str
+    file_path: str
+    file_extension: str
+    job_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    status: str = "queued"  # queued -> parsing -> embedding -> completed | failed | cancelled
+    chunks_parsed: int = 0
+    chunks_embedded: int = 0
+    chunks_stored: int = 0
+    chunks_skipped: int = 0   # Already stored for this session
+    duplicate_file: bool = False
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    cancel_requested: bool = False
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data.pop("file_path")
+        data.pop("cancel_requested")
+        return data
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in ("completed", "failed", "cancelled")
+
+
+class IngestionService:
+    """
+    Runs uploads through parse -> chunk -> embed -> upsert on a fixed pool of
+    background workers, so the /upload request returns as soon as the file
+    is on disk. Progress is tracked per job and can be polled or cancelled.
+    """
+
+    def __init__(
+        self,
+        workers: int = settings.INGESTION_WORKERS,
+        queue_size: int = settings.INGESTION_QUEUE_SIZE,
+        batch_size: int = settings.EMBEDDING_BATCH_SIZE,
+        job_ttl_seconds: int = settings.INGESTION_JOB_TTL_SECONDS,
+    ):
+        self.worker_count = workers
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.job_ttl_seconds = job_ttl_seconds
+        self.jobs: Dict[str, IngestionJob] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._workers = [
+            asyncio.create_task(self._worker(i), name=f"ingestion-worker-{i}")
+            for i in range(self.worker_count)
+        ]
+        logger.info("ingestion.started", workers=self.worker_count)
+
+    async def stop(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, job: IngestionJob) -> IngestionJob:
+        """Queues a job. Raises IngestionQueueFull when the backlog is at capacity."""
+        self._prune_finished()
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise IngestionQueueFull(f"Ingestion queue is full ({self.queue_size} jobs).")
+        self.jobs[job.job_id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[IngestionJob]:
+        """Requests cancellation; the worker stops before its next batch."""
+        job = self.jobs.get(job_id)
+        if job and not job.is_finished:
+            job.cancel_requested = True
+            if job.status == "queued":
+                job.status = "cancelled"
+                job.finished_at = time.time()
+        return job
+
+    def _prune_finished(self) -> None:
+        cutoff = time.time() - self.job_ttl_seconds
+        for job_id in [job_id for job_id, job in self.jobs.items() if job.finished_at and job.finished_at < cutoff]:
+            del self.jobs[job_id]
+
+    async def _worker(self, worker_id: int) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                if not job.cancel_requested:
+                    await self._process(job)
+                    job.status = "completed"
+            except JobCancelled:
+                job.status = "cancelled"
+                logger.info("ingestion.cancelled", job_id=job.job_id, chunks=job.chunks_stored)
+            except Exception as e:
+                job.status = "failed"
+                job.error = str(e)
+                logger.error("ingestion.failed", job_id=job.job_id, session_id=job.session_id, error=e)
+            finally:
+                job.finished_at = job.finished_at or time.time()
+                if job.chunks_stored:
+                    # Cached RAG answers, voice context and keyword indexes no longer
+                    # reflect the session's documents, on this worker or any other
+                    await document_versions.bump(job.session_id)
+                    response_cache.invalidate_session(job.session_id)
+                    await session_context.refresh(job.session_id)
+                if os.path.exists(job.file_path):
+                    os.remove(job.file_path)
+                    logger.debug("ingestion.file_removed", path=job.file_path)
+                self._queue.task_done()
+
+    async def _is_ingested(self, session_id: str, content_hash: str) -> bool:
+        """
+        True if the file was ingested for the session and its chunks are still
+        in the vector store. A record whose chunks are gone is dropped, so the
+        file is indexed again.
+        """
+        key = INGESTED_FILES_PREFIX + session_id
+        try:
+            if not await get_redis_client().sismember(key, content_hash):
+                return False
+            if await asyncio.to_thread(vector_store.has_file, session_id, content_hash):
+                return True
+            logger.info("ingestion.stale_record", session_id=session_id)
+            await get_redis_client().srem(key, content_hash)
+            return False
+        except Exception as e:
+            # Chunk-level dedup in the vector store still prevents duplicates
+            logger.warning("ingestion.check_failed", session_id=session_id, error=e)
+            return False
+
+    async def _mark_ingested(self, session_id: str, content_hash: str) -> None:
+        # Only files that were stored completely are recorded, so a cancelled
+        # or failed upload can simply be retried. Expires with the session's
+        # conversation history.
+        key = INGESTED_FILES_PREFIX + session_id
+        try:
+            async with get_redis_client().pipeline(transaction=False) as pipe:
+                pipe.sadd(key, content_hash)
+                pipe.expire(key, settings.HISTORY_TTL_SECONDS)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("ingestion.record_failed", session_id=session_id, error=e)
+
+    def _check_cancelled(self, job: IngestionJob) -> None:
+        if job.cancel_requested:
+            raise JobCancelled()
+
+    async def _process(self, job: IngestionJob) -> None:
+        # --- Re-uploads of a file already ingested for this session are no-ops ---
+        content_hash = await asyncio.to_thread(vector_store.file_hash, job.file_path)
+        if await self._is_ingested(job.session_id, content_hash):
+            job.duplicate_file = True
+            logger.info("ingestion.duplicate_file", job_id=job.job_id, filename=job.filename, session_id=job.session_id)
+            return
+
+        # --- Parse + chunk lazily; blocking loaders run in a thread, one batch at a time ---
+        job.status = "parsing"
+        logger.info("ingestion.parsing", job_id=job.job_id, filename=job.filename)
+        chunk_iter = document_parser.iter_chunks(job.file_path, job.file_extension)
+
+        while True:
+            self._check_cancelled(job)
+            batch: List[Document] = await asyncio.to_thread(
+                lambda: list(itertools.islice(chunk_iter, self.batch_size))
+            )
+            if not batch:
+                break
+            job.chunks_parsed += len(batch)
+            job.status = "embedding"
+
+            # Warms the embedding cache; the upsert below then reuses these vectors
+            await vector_store.embedding_function.aembed_documents([doc.page_content for doc in batch])
+            job.chunks_embedded += len(batch)
+
+            self._check_cancelled(job)
+            added = await asyncio.to_thread(
+                vector_store.add_documents_to_store, batch, job.session_id, content_hash, job.filename
+            )
+            job.chunks_stored += added
+            job.chunks_skipped += len(batch) - added
+
+        if not job.chunks_parsed:
+            raise ValueError(f"Could not parse any content from the file: {job.filename}")
+
+        await self._mark_ingested(job.session_id, content_hash)
+        logger.info("ingestion.done", job_id=job.job_id, session_id=job.session_id, chunks=job.chunks_stored)
+
+
+# Global instance
+ingestion_service = IngestionService()
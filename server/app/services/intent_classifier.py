@@ -0,0 +1,185 @@
+# apps/backend/app/services/intent_classifier.py
+import json
+import os
+import random
+import re
+import time
+import unicodedata
+import zlib
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+INTENTS = ["rag", "web_search", "direct", "product", "order"]
+
+# Whole-word rules used when the classifier is not confident. Word
+# boundaries matter: "live" must not match "deliver", "current" must not
+# match "currently"-style substrings inside other words.
+KEYWORD_RULES: List[Tuple[str, re.Pattern]] = [
+    ("rag", re.compile(r"\b(document|pdf|file|uploaded|attached|report|contract|according to)\b")),
+    ("order", re.compile(r"\b(order|orders|refund|return|deliver(y|ed)?|shipped|shipping|track|cancel|exchange|parcel|package)\b")),
+    ("web_search", re.compile(
+        r"\b(latest|current|recent|news|today|tonight|this week|search for|find information about|"
+        r"what's happening|web search|google|internet|online|real-time|live score|up-to-date|newest|20\d\d)\b"
+    )),
+    ("product", re.compile(r"\b(show me|buy|kurtas?|kurtis?|sarees?|dress|shirts?|shoes|size|colou?rs?|in stock|price of)\b")),
+]
+
+
+def keyword_intent(text: str) -> str:
+    lowered = text.lower()
+    for intent, pattern in KEYWORD_RULES:
+        if pattern.search(lowered):
+            return intent
+    return "direct"
+
+
+def _normalize(text: str) -> str:
+    return unicodedata.normalize("NFKC", text).lower()
+
+
+def hashed_features(text: str, bits: int = settings.INTENT_HASH_BITS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sparse feature vector of a message: word unigrams and bigrams plus
+    character 3-5 grams of each word, hashed (crc32, stable across
+    processes) into 2**bits buckets and L2-normalised.
+    """
+    mask = (1 << bits) - 1
+    words = re.findall(r"[\w']+", _normalize(text))
+    grams = [f"w:{word}" for word in words]
+    grams += [f"b:{a} {b}" for a, b in zip(words, words[1:])]
+    for word in words:
+        padded = f" {word} "
+        for n in (3, 4, 5):
+            grams += [f"c:{padded[i:i + n]}" for i in range(len(padded) - n + 1)]
+
+    counts: Dict[int, float] = {}
+    for gram in grams:
+        index = zlib.crc32(gram.encode("utf-8")) & mask
+        counts[index] = counts.get(index, 0.0) + 1.0
+    if not counts:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+    indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+    values = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+    return indices, values / np.linalg.norm(values)
+
+
+@dataclass
+class IntentPrediction:
+    intent: str
+    confidence: float
+    source: str            # "model" or "keywords"
+    scores: Dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class IntentStats:
+    predictions: int = 0
+    fallbacks: int = 0
+    by_intent: Dict[str, int] = field(default_factory=dict)
+    total_ms: float = 0.0
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "predictions": self.predictions,
+            "fallbacks": self.fallbacks,
+            "fallback_rate": self.fallbacks / self.predictions if self.predictions else 0.0,
+            "by_intent": dict(self.by_intent),
+            "avg_ms": self.total_ms / self.predictions if self.predictions else 0.0,
+        }
+
+
+class IntentClassifier:
+    """
+    Multinomial logistic regression over hashed n-gram features, trained
+    in-process from a small labelled set (a fraction of a second) and then
+    answering in well under a millisecond. Predictions below
+    `threshold` confidence fall back to whole-word keyword rules.
+    """
+
+    def __init__(
+        self,
+        intents: List[str] = INTENTS,
+        bits: int = settings.INTENT_HASH_BITS,
+        threshold: float = settings.INTENT_CONFIDENCE_THRESHOLD,
+    ):
+        self.intents = intents
+        self.bits = bits
+        self.threshold = threshold
+        self.weights = np.zeros((1 << bits, len(intents)), dtype=np.float32)
+        self.bias = np.zeros(len(intents), dtype=np.float32)
+        self.stats = IntentStats()
+
+    def fit(self, examples: List[Tuple[str, str]], epochs: int = 30, learning_rate: float = 0.5,
+            l2: float = 1e-4, seed: int = 0) -> "IntentClassifier":
+        """Plain SGD on the softmax loss; each update touches only the active features."""
+        rows = [(hashed_features(text, self.bits), self.intents.index(intent)) for text, intent in examples]
+        rng = random.Random(seed)
+        for epoch in range(epochs):
+            rng.shuffle(rows)
+            rate = learning_rate / (1 + epoch * 0.1)
+            for (indices, values), label in rows:
+                probs = self._softmax(values @ self.weights[indices] + self.bias)
+                probs[label] -= 1.0
+                self.weights[indices] -= rate * (np.outer(values, probs) + l2 * self.weights[indices])
+                self.bias -= rate * probs
+        return self
+
+    @staticmethod
+    def _softmax(logits: np.ndarray) -> np.ndarray:
+        exp = np.exp(logits - logits.max())
+        return exp / exp.sum()
+
+    def predict_proba(self, text: str) -> np.ndarray:
+        indices, values = hashed_features(text, self.bits)
+        if not len(indices):
+            return self._softmax(self.bias.copy())
+        return self._softmax(values @ self.weights[indices] + self.bias)
+
+    def classify(self, text: str) -> IntentPrediction:
+        start = time.perf_counter()
+        probs = self.predict_proba(text)
+        best = int(probs.argmax())
+        scores = {intent: float(p) for intent, p in zip(self.intents, probs)}
+        if probs[best] >= self.threshold:
+            prediction = IntentPrediction(self.intents[best], float(probs[best]), "model", scores)
+        else:
+            prediction = IntentPrediction(keyword_intent(text), float(probs[best]), "keywords", scores)
+            self.stats.fallbacks += 1
+
+        self.stats.predictions += 1
+        self.stats.by_intent[prediction.intent] = self.stats.by_intent.get(prediction.intent, 0) + 1
+        self.stats.total_ms += (time.perf_counter() - start) * 1000
+        return prediction
+
+
+def load_examples(path: Optional[str] = settings.INTENT_TRAIN_PATH) -> List[Tuple[str, str]]:
+    """Reads a labelled set: a JSON list of {"text": ..., "intent": ...}."""
+    if not path or not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [(row["text"], row["intent"]) for row in json.load(f) if row.get("text")]
+
+
+def build_intent_classifier(path: Optional[str] = settings.INTENT_TRAIN_PATH) -> IntentClassifier:
+    classifier = IntentClassifier()
+    examples = load_examples(path)
+    if examples:
+        start = time.perf_counter()
+        classifier.fit(examples)
+        logger.info("intent_classifier.trained", examples=len(examples), seconds=round(time.perf_counter() - start, 2))
+    else:
+        # Untrained: every prediction is low-confidence and uses the keyword rules
+        logger.warning("intent_classifier.untrained", path=path)
+    return classifier
+
+
+# Global instance
+intent_classifier = build_intent_classifier()
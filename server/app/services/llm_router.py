@@ -0,0 +1,505 @@
+# apps/backend/app/services/llm_router.py
+import asyncio
+import re
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Set
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.core.session import estimate_tokens
+from app.core.telemetry import record_external
+
+logger = get_logger(__name__)
+
+# Calls made by the router run without the caller's callbacks, so a losing
+# hedge never leaks tokens into astream_events; only the winner's chunks are
+# re-emitted through the router model's own run.
+_DETACHED = {"callbacks": []}
+
+# Whole words only. Shopping messages mention errors ("payment error") and
+# codes ("promo code") all the time, so neither makes a request a code task.
+CODE_KEYWORDS = ("code", "python", "javascript", "function", "bug", "script", "programming")
+CREATIVE_KEYWORDS = ("creative", "write", "story", "poem", "slogan")
+
+_SHOPPING_CODES = re.compile(r"\b(?:promo|discount|coupon|voucher|gift|referral|pin|zip|postal|tracking)\s+codes?\b")
+
+
+def _words(keywords) -> "re.Pattern":
+    return re.compile(r"\b(?:" + "|".join(keywords) + r")s?\b")
+
+
+_CODE_RE = _words(CODE_KEYWORDS)
+_CREATIVE_RE = _words(CREATIVE_KEYWORDS)
+
+
+def classify_task(messages: List[BaseMessage]) -> str:
+    """Cheap task type from the last message: code, creative or chat."""
+    text = str(messages[-1].content).lower() if messages else ""
+    if _CODE_RE.search(_SHOPPING_CODES.sub(" ", text)):
+        return "code"
+    if _CREATIVE_RE.search(text):
+        return "creative"
+    return "chat"
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class CircuitBreaker:
+    """
+    Opens after `failures` consecutive errors and rejects calls for
+    `reset_seconds`. Then one trial call is let through (half-open): success
+    closes the circuit, another failure opens it again.
+    """
+
+    def __init__(
+        self,
+        failures: int = settings.LLM_BREAKER_FAILURES,
+        reset_seconds: float = settings.LLM_BREAKER_RESET_SECONDS,
+    ):
+        self.failures = failures
+        self.reset_seconds = reset_seconds
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+        self.trips = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self.trial_in_flight:
+            self.trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def abandon(self) -> None:
+        """A call was cancelled (lost a hedge) before it could succeed or fail."""
+        self.trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        self.trial_in_flight = False
+        if self.opened_at is not None or self.consecutive_failures >= self.failures:
+            if self.opened_at is None:
+                self.trips += 1
+            self.opened_at = time.monotonic()
+
+
+# Latency is tracked per kind of call: a full generation and the time to
+# the first streamed token are different quantities, and the hedge delay
+# of a call must come from calls of the same kind.
+CALL_KINDS = ("generate", "stream")
+
+
+@dataclass
+class ProviderStats:
+    """Rolling latency and error windows of one provider, plus token and cost totals."""
+    window: int = settings.LLM_ROUTER_WINDOW
+    # kind -> seconds until the full response (generate) or the first token (stream)
+    latencies: Dict[str, deque] = field(default_factory=lambda: {kind: deque() for kind in CALL_KINDS})
+    outcomes: deque = field(default_factory=deque)    # True = success
+    calls: int = 0
+    errors: int = 0
+    hedges_won: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost_usd: float = 0.0
+
+    def add_latency(self, kind: str, latency: float) -> None:
+        latencies = self.latencies[kind]
+        latencies.append(latency)
+        if len(latencies) > self.window:
+            latencies.popleft()
+
+    def record(self, ok: bool, kind: Optional[str] = None, latency: Optional[float] = None) -> None:
+        self.calls += 1
+        self.outcomes.append(ok)
+        if len(self.outcomes) > self.window:
+            self.outcomes.popleft()
+        if not ok:
+            self.errors += 1
+        if latency is not None:
+            self.add_latency(kind, latency)
+
+    def mark_failed(self) -> None:
+        """A call already recorded as a success failed afterwards (mid-stream)."""
+        self.errors += 1
+        for i in range(len(self.outcomes) - 1, -1, -1):
+            if self.outcomes[i]:
+                self.outcomes[i] = False
+                break
+
+    @property
+    def error_rate(self) -> float:
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+    def p95(self, kind: str, prior: float = settings.LLM_ROUTER_PRIOR_LATENCY,
+            min_samples: int = settings.LLM_ROUTER_MIN_SAMPLES) -> float:
+        latencies = self.latencies[kind]
+        if len(latencies) < min_samples:
+            return prior
+        return percentile(latencies, 95)
+
+    def as_dict(self) -> Dict[str, float]:
+        latency = {}
+        for kind, latencies in self.latencies.items():
+            latency[f"{kind}_p50_ms"] = percentile(latencies, 50) * 1000 if latencies else 0.0
+            latency[f"{kind}_p95_ms"] = percentile(latencies, 95) * 1000 if latencies else 0.0
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "error_rate": self.error_rate,
+            **latency,
+            "hedges_won": self.hedges_won,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cost_usd": round(self.cost_usd, 6),
+        }
+
+
+class Provider:
+    """
+    One LLM backend. `factory(temperature)` builds its chat model; models are
+    created on first use and kept per temperature.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        factory: Callable[[float], BaseChatModel],
+        tasks: Set[str],
+        input_cost_per_m: float = 0.0,
+        output_cost_per_m: float = 0.0,
+    ):
+        self.name = name
+        self.factory = factory
+        self.tasks = tasks
+        self.input_cost_per_m = input_cost_per_m
+        self.output_cost_per_m = output_cost_per_m
+        self.stats = ProviderStats()
+        self.breaker = CircuitBreaker()
+        self._models: Dict[float, BaseChatModel] = {}
+
+    def chat_model(self, temperature: float) -> BaseChatModel:
+        model = self._models.get(temperature)
+        if model is None:
+            model = self._models[temperature] = self.factory(temperature)
+        return model
+
+    def record_usage(self, messages: List[BaseMessage], message: BaseMessage) -> None:
+        usage = getattr(message, "usage_metadata", None)
+        if usage:
+            input_tokens, output_tokens = usage["input_tokens"], usage["output_tokens"]
+        else:
+            input_tokens = sum(estimate_tokens(str(m.content)) for m in messages)
+            output_tokens = estimate_tokens(str(message.content))
+        self.stats.input_tokens += input_tokens
+        self.stats.output_tokens += output_tokens
+        self.stats.cost_usd += (input_tokens * self.input_cost_per_m + output_tokens * self.output_cost_per_m) / 1e6
+
+
+class NoProviderAvailable(Exception):
+    """Raised when every provider failed or has an open circuit."""
+
+
+@dataclass
+class RouterStats:
+    routed: Dict[str, int] = field(default_factory=dict)   # Calls per task type
+    hedged: int = 0
+    failovers: int = 0
+    rejected: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"routed": dict(self.routed), "hedged": self.hedged, "failovers": self.failovers, "rejected": self.rejected}
+
+
+class LLMRouter:
+    """
+    Picks an LLM provider per call from the task type, each provider's
+    rolling p95 latency and error rate, and its token price.
+
+    - Providers with an open circuit breaker are skipped.
+    - If the chosen provider has not responded by its own p95, the next
+      best one is started as a hedge and whichever answers first wins.
+    - A provider that fails before responding is replaced by the next one.
+    """
+
+    def __init__(self, providers: List[Provider], hedge: bool = settings.LLM_HEDGE_ENABLED):
+        self.providers = providers
+        self.hedge = hedge
+        self.stats = RouterStats()
+
+    def score(self, provider: Provider, task: str, kind: str = "generate") -> float:
+        """Lower is better; every term is expressed in seconds of latency."""
+        blended_cost = (provider.input_cost_per_m + provider.output_cost_per_m) / 2
+        return (
+            provider.stats.p95(kind)
+            + provider.stats.error_rate * settings.LLM_ROUTER_ERROR_WEIGHT
+            + blended_cost * settings.LLM_ROUTER_COST_WEIGHT
+            + (0.0 if task in provider.tasks else settings.LLM_ROUTER_TASK_PENALTY)
+        )
+
+    def rank(self, task: str, kind: str = "generate") -> List[Provider]:
+        return sorted(self.providers, key=lambda provider: self.score(provider, task, kind))
+
+    def _candidates(self, task: str, kind: str) -> Iterator[Provider]:
+        """Ranked providers whose circuit lets a call through, best first."""
+        self.stats.routed[task] = self.stats.routed.get(task, 0) + 1
+        for provider in self.rank(task, kind):
+            if provider.breaker.allow():
+                yield provider
+
+    def _failed(self, provider: Provider, error: BaseException, task: str, latency: float) -> None:
+        logger.warning("llm.provider_failed", provider=provider.name, task=task, error=error)
+        record_external("llm", task, provider.name, "error", latency)
+        provider.stats.record(False)
+        provider.breaker.record_failure()
+
+    def _succeeded(self, provider: Provider, task: str, kind: str, latency: float) -> None:
+        record_external("llm", task, provider.name, "ok", latency)
+        provider.stats.record(True, kind, latency)
+        provider.breaker.record_success()
+
+    def _failed_after_start(self, provider: Provider, error: BaseException, task: str) -> None:
+        # The call was counted, with its latency, when its first token arrived
+        logger.warning("llm.stream_failed", provider=provider.name, task=task, error=error)
+        provider.stats.mark_failed()
+        provider.breaker.record_failure()
+
+    def _no_provider(self, last_error: Optional[BaseException]) -> NoProviderAvailable:
+        self.stats.rejected += 1
+        return NoProviderAvailable(f"No LLM provider available (last error: {last_error!r})")
+
+    def generate(self, messages: List[BaseMessage], temperature: float, task: Optional[str] = None, **kwargs) -> AIMessage:
+        """Blocking call with failover; hedging needs the async path."""
+        task = task or classify_task(messages)
+        last_error = None
+        for attempt, provider in enumerate(self._candidates(task, "generate")):
+            if attempt:
+                self.stats.failovers += 1
+            start = time.perf_counter()
+            try:
+                message = provider.chat_model(temperature).invoke(messages, config=_DETACHED, **kwargs)
+            except Exception as e:
+                self._failed(provider, e, task, time.perf_counter() - start)
+                last_error = e
+                continue
+            self._succeeded(provider, task, "generate", time.perf_counter() - start)
+            provider.record_usage(messages, message)
+            return message
+        raise self._no_provider(last_error)
+
+    async def _race(self, task: str, kind: str, start_call, discard=None):
+        """
+        Starts the best candidate and, if it is still running at its p95
+        for this kind of call, the next one too. Returns (provider, result)
+        of the first call to succeed; a call that fails is replaced by the
+        next candidate. Losing calls are cancelled, and `discard` releases
+        results nobody used.
+        """
+        candidates = self._candidates(task, kind)
+        running: Dict[asyncio.Task, tuple] = {}   # task -> (provider, started, is_hedge)
+        last_error = None
+
+        def launch(is_hedge: bool = False) -> bool:
+            provider = next(candidates, None)
+            if provider is None:
+                return False
+            running[asyncio.create_task(start_call(provider))] = (provider, time.perf_counter(), is_hedge)
+            return True
+
+        try:
+            if not launch():
+                raise self._no_provider(None)
+            while running:
+                timeout = None
+                if self.hedge and len(running) == 1:
+                    provider, started, _ = next(iter(running.values()))
+                    timeout = max(0.0, provider.stats.p95(kind) - (time.perf_counter() - started))
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # Slowest percentile: race the next provider against this one
+                    if launch(is_hedge=True):
+                        self.stats.hedged += 1
+                    else:
+                        done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+
+                for call in done:
+                    provider, started, is_hedge = running.pop(call)
+                    error = call.exception()
+                    if error is not None:
+                        self._failed(provider, error, task, time.perf_counter() - started)
+                        last_error = error
+                        continue
+                    self._succeeded(provider, task, kind, time.perf_counter() - started)
+                    if is_hedge:
+                        provider.stats.hedges_won += 1
+                    return provider, call.result()
+
+                if not running:
+                    # Everything in flight failed; fall over to the next provider
+                    if not launch():
+                        break
+                    self.stats.failovers += 1
+            raise self._no_provider(last_error)
+        finally:
+            for call, (provider, started, _) in running.items():
+                if call.done() and call.exception() is None:
+                    if discard is not None:
+                        await discard(call.result())
+                else:
+                    call.cancel()
+                    provider.breaker.abandon()
+                    # Keep the latency honest: the call took at least this long
+                    provider.stats.add_latency(kind, time.perf_counter() - started)
+                    record_external("llm", task, provider.name, "cancelled", time.perf_counter() - started)
+            await asyncio.gather(*running, return_exceptions=True)
+
+    async def agenerate(self, messages: List[BaseMessage], temperature: float, task: Optional[str] = None, **kwargs) -> AIMessage:
+        async def call(provider: Provider):
+            return await provider.chat_model(temperature).ainvoke(messages, config=_DETACHED, **kwargs)
+
+        provider, message = await self._race(task or classify_task(messages), "generate", call)
+        provider.record_usage(messages, message)
+        return message
+
+    async def astream(self, messages: List[BaseMessage], temperature: float, task: Optional[str] = None, **kwargs) -> AsyncIterator[AIMessageChunk]:
+        """
+        Streams from the first provider to produce a token. Hedging and
+        failover apply until then; an error after the first token is raised,
+        since part of the answer has already been delivered.
+        """
+        async def open_stream(provider: Provider):
+            stream = provider.chat_model(temperature).astream(messages, config=_DETACHED, **kwargs)
+            try:
+                return stream, await stream.__anext__()
+            except BaseException:
+                await stream.aclose()
+                raise
+
+        async def close_stream(result):
+            await result[0].aclose()
+
+        task = task or classify_task(messages)
+        provider, (stream, first) = await self._race(task, "stream", open_stream, close_stream)
+        message = first
+        try:
+            yield first
+            async for chunk in stream:
+                message = message + chunk
+                yield chunk
+        except Exception as e:
+            self._failed_after_start(provider, e, task)
+            raise
+        finally:
+            await stream.aclose()
+        provider.record_usage(messages, message)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            **self.stats.as_dict(),
+            "providers": {
+                provider.name: {
+                    **provider.stats.as_dict(),
+                    "circuit": provider.breaker.state,
+                    "circuit_trips": provider.breaker.trips,
+                }
+                for provider in self.providers
+            },
+        }
+
+
+class RoutedChatModel(BaseChatModel):
+    """
+    Chat model that sends each call through an LLMRouter, so the agent
+    nodes keep using the plain invoke / ainvoke / astream interface.
+    `task` fixes the task type (e.g. "rag"); None classifies each call.
+    """
+
+    router: Any
+    task: Optional[str] = None
+    temperature: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "routed"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if stop:
+            kwargs["stop"] = stop
+        message = self.router.generate(messages, self.temperature, self.task, **kwargs)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if stop:
+            kwargs["stop"] = stop
+        message = await self.router.agenerate(messages, self.temperature, self.task, **kwargs)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        if stop:
+            kwargs["stop"] = stop
+        async for chunk in self.router.astream(messages, self.temperature, self.task, **kwargs):
+            yield ChatGenerationChunk(message=chunk)
+
+
+def _gemini(temperature: float) -> BaseChatModel:
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    return ChatGoogleGenerativeAI(model=settings.GEMINI_MODEL, google_api_key=settings.GOOGLE_API_KEY, temperature=temperature)
+
+
+def _groq(temperature: float) -> BaseChatModel:
+    from langchain_groq import ChatGroq
+    return ChatGroq(model=settings.GROQ_MODEL, api_key=settings.GROQ_API_KEY, temperature=temperature)
+
+
+def _local(temperature: float) -> BaseChatModel:
+    # Any OpenAI-compatible server, e.g. Docker Model Runner or Ollama
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(
+        base_url=settings.LOCAL_LLM_BASE_URL,
+        api_key=settings.LOCAL_LLM_API_KEY,
+        model=settings.LOCAL_LLM_MODEL,
+        temperature=temperature,
+    )
+
+
+def build_providers() -> List[Provider]:
+    """Gemini always; Groq and the local endpoint when they are configured."""
+    providers = [
+        Provider("gemini", _gemini, {"chat", "creative", "rag", "web", "summary"},
+                 settings.GEMINI_INPUT_COST_PER_M, settings.GEMINI_OUTPUT_COST_PER_M),
+    ]
+    if settings.GROQ_API_KEY:
+        providers.append(Provider("groq", _groq, {"chat", "code"},
+                                  settings.GROQ_INPUT_COST_PER_M, settings.GROQ_OUTPUT_COST_PER_M))
+    if settings.LOCAL_LLM_BASE_URL:
+        providers.append(Provider("local", _local, {"chat", "summary"},
+                                  settings.LOCAL_LLM_INPUT_COST_PER_M, settings.LOCAL_LLM_OUTPUT_COST_PER_M))
+    return providers
+
+
+# Global instance
+llm_router = LLMRouter(build_providers())
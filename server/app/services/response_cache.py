@@ -0,0 +1,173 @@
+# apps/backend/app/services/response_cache.py
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.services import vector_store
+from app.services.document_versions import document_versions
+
+# Routes whose answers are safe to reuse. Web search answers are time
+# sensitive ("latest", "today"...) so they always go to the graph.
+CACHEABLE_ROUTES = {"rag_retrieval", "generate_direct"}
+
+
+@dataclass
+class CacheEntry:
+    response: str
+    created_at: float
+    embedding: Optional[np.ndarray] = None
+
+
+@dataclass
+class CacheKey:
+    bucket: str      # route + session-document fingerprint
+    query: str       # normalized query text
+
+
+@dataclass
+class CacheStats:
+    exact_hits: int = 0
+    semantic_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+    def as_dict(self) -> Dict[str, float]:
+        lookups = self.exact_hits + self.semantic_hits + self.misses
+        hits = self.exact_hits + self.semantic_hits
+        return {
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+
+class ResponseCache:
+    """
+    In-process cache of final agent answers.
+
+    Entries are grouped in buckets by route and, for RAG answers, by the
+    session's document version. The version lives in Redis, so an upload
+    on any worker makes the old RAG answers unreachable on all of them. Lookups try an exact match on the normalized
+    query first and then, if an embedding function is configured, the most
+    similar cached query in the same bucket above `similarity_threshold`.
+    """
+
+    def __init__(
+        self,
+        embedding_function=None,
+        max_entries: int = settings.RESPONSE_CACHE_MAX_ENTRIES,
+        ttl_seconds: int = settings.RESPONSE_CACHE_TTL_SECONDS,
+        similarity_threshold: float = settings.RESPONSE_CACHE_SIMILARITY_THRESHOLD,
+    ):
+        self.embedding_function = embedding_function
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.stats = CacheStats()
+
+        self._entries: "OrderedDict[Tuple[str, str], CacheEntry]" = OrderedDict()
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Lowercases, strips punctuation and collapses whitespace."""
+        query = re.sub(r"[^\w\s]", " ", query.lower())
+        return " ".join(query.split())
+
+    async def make_key(self, query: str, route: str, session_id: str) -> Optional[CacheKey]:
+        """
+        Returns the cache key for a request, or None if the route is not
+        cacheable, or the session's document version cannot be read.
+        """
+        if route not in CACHEABLE_ROUTES:
+            return None
+        if route == "rag_retrieval":
+            # RAG answers depend on what the session has uploaded
+            version = await document_versions.get(session_id)
+            if version is None:
+                return None
+            fingerprint = f"{session_id}:{version}"
+        else:
+            fingerprint = ""
+        return CacheKey(bucket=f"{route}|{fingerprint}", query=self.normalize(query))
+
+    def invalidate_session(self, session_id: str) -> None:
+        """
+        Frees this worker's RAG answers of a session after a new upload.
+        Other workers never reach theirs again, as their keys carry the old
+        document version, and they age out of the LRU.
+        """
+        prefix = f"rag_retrieval|{session_id}:"
+        stale = [key for key in self._entries if key[0].startswith(prefix)]
+        for key in stale:
+            del self._entries[key]
+        self.stats.invalidations += 1
+
+    async def lookup(self, key: CacheKey) -> Tuple[Optional[str], Optional[np.ndarray]]:
+        """
+        Returns (cached response or None, query embedding or None). The
+        embedding is handed back so `store` does not have to compute it again.
+        """
+        now = time.monotonic()
+        entry = self._entries.get((key.bucket, key.query))
+        if entry and now - entry.created_at <= self.ttl_seconds:
+            self._entries.move_to_end((key.bucket, key.query))
+            self.stats.exact_hits += 1
+            return entry.response, entry.embedding
+
+        if self.embedding_function is None or not self.similarity_threshold:
+            self.stats.misses += 1
+            return None, None
+
+        embedding = await self._embed(key.query)
+        candidates: List[Tuple[Tuple[str, str], CacheEntry]] = [
+            (entry_key, candidate)
+            for entry_key, candidate in self._entries.items()
+            if entry_key[0] == key.bucket
+            and candidate.embedding is not None
+            and now - candidate.created_at <= self.ttl_seconds
+        ]
+        if candidates:
+            matrix = np.stack([candidate.embedding for _, candidate in candidates])
+            scores = matrix @ embedding
+            best = int(np.argmax(scores))
+            if scores[best] >= self.similarity_threshold:
+                best_key, best_entry = candidates[best]
+                self._entries.move_to_end(best_key)
+                self.stats.semantic_hits += 1
+                return best_entry.response, embedding
+
+        self.stats.misses += 1
+        return None, embedding
+
+    async def store(self, key: CacheKey, response: str, embedding: Optional[np.ndarray] = None) -> None:
+        """Adds an answer to the cache, evicting the least recently used entries."""
+        if not response:
+            return
+        if embedding is None and self.embedding_function is not None and self.similarity_threshold:
+            embedding = await self._embed(key.query)
+
+        self._entries[(key.bucket, key.query)] = CacheEntry(
+            response=response, created_at=time.monotonic(), embedding=embedding
+        )
+        self._entries.move_to_end((key.bucket, key.query))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    async def _embed(self, text: str) -> np.ndarray:
+        vector = np.asarray(await self.embedding_function.aembed_query(text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+# Global instance
+response_cache = ResponseCache(embedding_function=vector_store.embedding_function)
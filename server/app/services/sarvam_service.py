@@ -1,19 +1,25 @@
-import requests
-import base64
-import io
-import asyncio
-import aiohttp
 import asyncio
-import aiohttp
-import json
 import base64
-from typing import Optional
+import random
+import aiohttp
+from typing import Dict, List, Optional
 from app.core.config import settings
+from app.core.logger import get_logger
+from app.core.telemetry import external_call
+from app.services.translation_cache import TranslationCache, translation_cache, translation_cache_key
+from app.services.tts_cache import TTSCache, load_prewarm_phrases, tts_cache, tts_cache_key
+from app.services.voice_pipeline import split_sentences
 
 # Sarvam API endpoints
-SARVAM_TTS_URL = "https://api.sarvam.ai/text-to-speech"
-SARVAM_STT_URL = "https://api.sarvam.ai/speech-to-text"
-SARVAM_TRANSLATE_URL = "https://api.sarvam.ai/translate"
+SARVAM_TTS_URL = f"{settings.SARVAM_BASE_URL}/text-to-speech"
+SARVAM_STT_URL = f"{settings.SARVAM_BASE_URL}/speech-to-text"
+SARVAM_TRANSLATE_URL = f"{settings.SARVAM_BASE_URL}/translate"
+SARVAM_TRANSLATE_MODEL = "mayura:v1"
+
+# Status codes worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+logger = get_logger(__name__)
 
 # Supported Indian languages by Sarvam with updated voices
 SARVAM_LANGUAGES = {
@@ -49,12 +55,84 @@ SARVAM_VOICES = {
 }
 
 class SarvamService:
-    def __init__(self):
+    def __init__(
+        self,
+        max_connections: int = settings.SARVAM_MAX_CONNECTIONS,
+        max_concurrency: int = settings.SARVAM_MAX_CONCURRENCY,
+        max_retries: int = settings.SARVAM_MAX_RETRIES,
+        audio_cache: Optional[TTSCache] = tts_cache,
+        text_cache: Optional[TranslationCache] = translation_cache,
+    ):
         self.api_key = settings.SARVAM_API_KEY
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
+        self.max_connections = max_connections
+        self.max_retries = max_retries
+        self.timeouts = {
+            SARVAM_TTS_URL: aiohttp.ClientTimeout(total=settings.SARVAM_TTS_TIMEOUT, connect=5),
+            SARVAM_STT_URL: aiohttp.ClientTimeout(total=settings.SARVAM_STT_TIMEOUT, connect=5),
+            SARVAM_TRANSLATE_URL: aiohttp.ClientTimeout(total=settings.SARVAM_TRANSLATE_TIMEOUT, connect=5),
+        }
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.audio_cache = audio_cache
+        self.text_cache = text_cache
+
+    async def start(self):
+        """
+        Opens the shared keep-alive connection pool. Called once at app
+        startup so every voice turn reuses warm TCP+TLS connections.
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                keepalive_timeout=60,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, headers=self.headers)
+
+    async def close(self):
+        """Closes the connection pool on app shutdown."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _post(self, url: str, payload: dict, label: str) -> Optional[dict]:
+        """
+        POSTs to a Sarvam endpoint through the shared pool. Retries rate
+        limits, 5xx responses and connection errors with exponential backoff
+        and jitter. Returns the JSON body, or None on a non-retryable error.
+        """
+        if self._session is None or self._session.closed:
+            await self.start()  # Scripts and tests that skip the app lifespan
+
+        with external_call("sarvam", label.lower(), "sarvam") as call:
+            result = await self._send(url, payload, label)
+            if result is None:
+                call.outcome = "error"
+            return result
+
+    async def _send(self, url: str, payload: dict, label: str) -> Optional[dict]:
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self._semaphore:
+                    async with self._session.post(url, json=payload, timeout=self.timeouts[url]) as response:
+                        if response.status == 200:
+                            return await response.json()
+                        body = await response.text()
+                        if response.status not in RETRYABLE_STATUSES or attempt == self.max_retries:
+                            logger.error("sarvam.request_failed", operation=label, status=response.status, body=body[:200])
+                            return None
+                        logger.warning("sarvam.retry", operation=label, status=response.status, attempt=attempt + 1)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt == self.max_retries:
+                    raise
+                logger.warning("sarvam.retry", operation=label, error=e, attempt=attempt + 1)
+
+            await asyncio.sleep(settings.SARVAM_RETRY_BACKOFF * (2 ** attempt) * (1 + random.random()))
+        return None
 
     async def text_to_speech(self, text: str, language: str = "hindi", voice: str = "anushka") -> Optional[bytes]:
         """
@@ -71,6 +149,14 @@ class SarvamService:
             voice = SARVAM_LANGUAGES[language]["voice"]
         
         lang_config = SARVAM_LANGUAGES[language]
+
+        cache_key = tts_cache_key(
+            text, lang_config["code"], voice, settings.SARVAM_TTS_MODEL, settings.SARVAM_TTS_SAMPLE_RATE
+        )
+        if self.audio_cache is not None:
+            cached_audio = await self.audio_cache.get(cache_key)
+            if cached_audio is not None:
+                return cached_audio
         
         payload = {
             "inputs": [text],
@@ -79,28 +165,54 @@ class SarvamService:
             "pitch": 0,
             "pace": 1.0,
             "loudness": 1.0,
-            "speech_sample_rate": 22050,
+            "speech_sample_rate": settings.SARVAM_TTS_SAMPLE_RATE,
             "enable_preprocessing": True,
-            "model": "bulbul:v1"
+            "model": settings.SARVAM_TTS_MODEL
         }
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(SARVAM_TTS_URL, json=payload, headers=self.headers) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        # Sarvam returns base64 encoded audio
-                        if "audios" in result and len(result["audios"]) > 0:
-                            audio_base64 = result["audios"][0]
-                            audio_bytes = base64.b64decode(audio_base64)
-                            return audio_bytes
-                    else:
-                        print(f"Sarvam TTS Error: {response.status}, {await response.text()}")
-                        return None
+            result = await self._post(SARVAM_TTS_URL, payload, "TTS")
+            # Sarvam returns base64 encoded audio
+            if result and "audios" in result and len(result["audios"]) > 0:
+                audio_base64 = result["audios"][0]
+                audio_bytes = base64.b64decode(audio_base64)
+                if self.audio_cache is not None:
+                    await self.audio_cache.put(cache_key, audio_bytes)
+                return audio_bytes
+            return None
         except Exception as e:
-            print(f"Sarvam TTS Exception: {e}")
+            logger.error("sarvam.tts_failed", error=e)
             return None
 
+    async def prewarm_tts(self, phrases: Optional[List[dict]] = None) -> int:
+        """
+        Synthesises the canned phrases (greetings, "documents do not contain
+        that information", ...) into the TTS cache so the first user to hear
+        them does not wait. Phrases already on disk are skipped.
+        """
+        if self.audio_cache is None or not self.api_key:
+            return 0
+        phrases = load_prewarm_phrases() if phrases is None else phrases
+        semaphore = asyncio.Semaphore(settings.TTS_PREWARM_CONCURRENCY)
+
+        async def warm(phrase: dict) -> bool:
+            language = phrase.get("language", "hindi")
+            voice = phrase.get("voice") or SARVAM_LANGUAGES.get(language, SARVAM_LANGUAGES["hindi"])["voice"]
+            lang_config = SARVAM_LANGUAGES.get(language, SARVAM_LANGUAGES["hindi"])
+            key = tts_cache_key(
+                phrase["text"], lang_config["code"], voice, settings.SARVAM_TTS_MODEL, settings.SARVAM_TTS_SAMPLE_RATE
+            )
+            if await self.audio_cache.contains(key):
+                return False
+            async with semaphore:
+                return await self.text_to_speech(phrase["text"], language, voice) is not None
+
+        results = await asyncio.gather(*(warm(phrase) for phrase in phrases), return_exceptions=True)
+        warmed = sum(1 for result in results if result is True)
+        self.audio_cache.stats.prewarmed += warmed
+        logger.info("tts_cache.prewarmed", warmed=warmed, phrases=len(phrases))
+        return warmed
+
     async def speech_to_text(self, audio_data: bytes, language: str = "hindi") -> Optional[str]:
         """
         Convert speech to text using Sarvam STT API
@@ -123,55 +235,119 @@ class SarvamService:
         }
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(SARVAM_STT_URL, json=payload, headers=self.headers) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        if "transcript" in result:
-                            return result["transcript"]
-                    else:
-                        print(f"Sarvam STT Error: {response.status}, {await response.text()}")
-                        return None
+            result = await self._post(SARVAM_STT_URL, payload, "STT")
+            if result and "transcript" in result:
+                return result["transcript"]
+            return None
         except Exception as e:
-            print(f"Sarvam STT Exception: {e}")
+            logger.error("sarvam.stt_failed", error=e)
             return None
 
-    async def translate_text(self, text: str, source_language: str, target_language: str = "english") -> Optional[str]:
-        """
-        Translate text between supported languages
-        """
-        if not self.api_key:
-            raise ValueError("Sarvam API key not configured")
-        
-        if source_language not in SARVAM_LANGUAGES or target_language not in SARVAM_LANGUAGES:
-            return text  # Return original if languages not supported
-        
-        source_code = SARVAM_LANGUAGES[source_language]["code"]
-        target_code = SARVAM_LANGUAGES[target_language]["code"]
-        
+    async def _translate_request(self, text: str, source_code: str, target_code: str) -> Optional[str]:
+        """One translate call. Returns None on failure so the result is not cached."""
         payload = {
             "input": text,
             "source_language_code": source_code,
             "target_language_code": target_code,
             "speaker_gender": "Male",
             "mode": "formal",
-            "model": "mayura:v1",
+            "model": SARVAM_TRANSLATE_MODEL,
             "enable_preprocessing": True
         }
-
+        if self.text_cache is not None:
+            self.text_cache.stats.api_requests += 1
+            self.text_cache.stats.sentences_sent += text.count("\n") + 1
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(SARVAM_TRANSLATE_URL, json=payload, headers=self.headers) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        if "translated_text" in result:
-                            return result["translated_text"]
-                    else:
-                        print(f"Sarvam Translate Error: {response.status}, {await response.text()}")
-                        return text
+            result = await self._post(SARVAM_TRANSLATE_URL, payload, "Translate")
+            if result and "translated_text" in result:
+                return result["translated_text"]
+            return None
         except Exception as e:
-            print(f"Sarvam Translate Exception: {e}")
+            logger.error("sarvam.translate_failed", error=e)
+            return None
+
+    async def _translate_batch(self, sentences: List[str], source_code: str, target_code: str) -> List[Optional[str]]:
+        """
+        The translate API takes a single input string, so a batch is sent as
+        one newline-separated input and split back by line. If the line count
+        does not survive translation, the batch is retried sentence by sentence.
+        """
+        if len(sentences) == 1:
+            return [await self._translate_request(sentences[0], source_code, target_code)]
+
+        translated = await self._translate_request("\n".join(sentences), source_code, target_code)
+        if translated is not None:
+            lines = [line.strip() for line in translated.split("\n") if line.strip()]
+            if len(lines) == len(sentences):
+                return lines
+
+        if self.text_cache is not None:
+            self.text_cache.stats.batch_fallbacks += 1
+        return list(await asyncio.gather(
+            *(self._translate_request(sentence, source_code, target_code) for sentence in sentences)
+        ))
+
+    async def translate_sentences(self, sentences: List[str], source_language: str, target_language: str = "english") -> List[str]:
+        """
+        Translates a list of sentences. Cached sentences are served from the
+        translation cache; the rest are deduplicated and sent in batches of
+        up to SARVAM_TRANSLATE_MAX_CHARS characters. Sentences that fail to
+        translate come back unchanged.
+        """
+        if source_language not in SARVAM_LANGUAGES or target_language not in SARVAM_LANGUAGES:
+            return sentences  # Return original if languages not supported
+        if source_language == target_language or not sentences:
+            return sentences
+
+        source_code = SARVAM_LANGUAGES[source_language]["code"]
+        target_code = SARVAM_LANGUAGES[target_language]["code"]
+        keys = [translation_cache_key(sentence, source_code, target_code, SARVAM_TRANSLATE_MODEL) for sentence in sentences]
+        found = await self.text_cache.get_many(keys) if self.text_cache is not None else {}
+
+        pending: Dict[str, str] = {}
+        for key, sentence in zip(keys, sentences):
+            if key not in found and key not in pending:
+                pending[key] = sentence
+
+        batches, batch, batch_chars = [], [], 0
+        for key, sentence in pending.items():
+            if batch and batch_chars + len(sentence) > settings.SARVAM_TRANSLATE_MAX_CHARS:
+                batches.append(batch)
+                batch, batch_chars = [], 0
+            batch.append((key, sentence))
+            batch_chars += len(sentence) + 1
+        if batch:
+            batches.append(batch)
+
+        results = await asyncio.gather(
+            *(self._translate_batch([sentence for _, sentence in batch], source_code, target_code) for batch in batches)
+        )
+        translated: Dict[str, str] = {}
+        for batch, batch_result in zip(batches, results):
+            for (key, _), translation in zip(batch, batch_result):
+                if translation is not None:
+                    translated[key] = translation
+        if translated and self.text_cache is not None:
+            await self.text_cache.put_many(translated)
+
+        found.update(translated)
+        return [found.get(key, sentence) for key, sentence in zip(keys, sentences)]
+
+    async def translate_text(self, text: str, source_language: str, target_language: str = "english") -> Optional[str]:
+        """
+        Translate text between supported languages. Long texts are split
+        into sentences so each one can be cached and batched.
+        """
+        if not self.api_key:
+            raise ValueError("Sarvam API key not configured")
+        
+        if source_language not in SARVAM_LANGUAGES or target_language not in SARVAM_LANGUAGES:
+            return text  # Return original if languages not supported
+
+        sentences = split_sentences(text, min_chars=1)
+        if not sentences:
             return text
+        return " ".join(await self.translate_sentences(sentences, source_language, target_language))
 
     def get_supported_languages(self):
         """
@@ -0,0 +1,260 @@
+# apps/backend/app/services/session_context.py
+import asyncio
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.core.telemetry import external_call
+from app.services import vector_store
+from app.services.bm25_index import reciprocal_rank_fusion
+from app.services.context_packer import context_packer, document_name
+from app.services.document_versions import document_versions
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class SessionContext:
+    """Precomputed view of a session's documents, reused by every voice connection."""
+    chunks: List[Document]
+    summary: str
+    built_at: float
+    version: Optional[int] = None   # Document version the bundle was built at
+
+    def as_prompt_text(self, model: Optional[str] = None) -> str:
+        if not self.chunks:
+            return "No documents were found for this session."
+        # Overlapping chunks merged and fitted to the voice budget of the model
+        snippets = context_packer.pack(None, self.chunks, route="voice", model=model).text
+        return f"{self.summary}\n\n---\n\n{snippets}"
+
+
+@dataclass
+class PrefetchStats:
+    started: int = 0
+    hits: int = 0       # Retrievals answered by a speculative task
+    misses: int = 0     # Retrievals with nothing prefetched
+    wasted: int = 0     # Speculative tasks dropped unused (expired or evicted)
+
+    def as_dict(self) -> Dict[str, object]:
+        lookups = self.hits + self.misses
+        return {
+            "started": self.started,
+            "hits": self.hits,
+            "misses": self.misses,
+            "wasted": self.wasted,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class SessionContextService:
+    """
+    Shared per-session state for retrieval:
+
+    - an LRU of filtered retrievers, so they are not rebuilt on every query
+    - an LRU of precomputed context bundles (leading chunks + a short summary
+      of what was uploaded) used for the voice system prompts
+
+    - speculative retrievals started before the router has decided on
+      RAG, picked up by aretrieve when the graph gets there
+
+    Bundles are read straight from Chroma by metadata, with no embedding
+    call, and are rebuilt in the background whenever an upload finishes.
+    Bundles and keyword indexes are checked against the session's document
+    version in Redis, so an upload on another worker is picked up too.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = settings.SESSION_CONTEXT_CACHE_SIZE,
+        context_chunks: int = settings.SESSION_CONTEXT_CHUNKS,
+        max_chunks: int = settings.SESSION_CONTEXT_MAX_CHUNKS,
+    ):
+        self.max_sessions = max_sessions
+        self.context_chunks = context_chunks
+        self.max_chunks = max_chunks
+        self._retrievers: "OrderedDict[tuple, object]" = OrderedDict()
+        self._contexts: "OrderedDict[str, SessionContext]" = OrderedDict()
+        self._prefetched: "OrderedDict[Tuple[str, str], Tuple[asyncio.Task, float]]" = OrderedDict()
+        self.prefetch_stats = PrefetchStats()
+
+    def get_retriever(self, session_id: str, k: int = settings.RAG_TOP_K):
+        key = (session_id, k)
+        retriever = self._retrievers.get(key)
+        if retriever is None:
+            retriever = vector_store.get_retriever(session_id=session_id, search_kwargs={"k": k})
+            self._retrievers[key] = retriever
+        self._retrievers.move_to_end(key)
+        while len(self._retrievers) > self.max_sessions:
+            self._retrievers.popitem(last=False)
+        return retriever
+
+    def _fuse(self, session_id: str, vector_docs: List[Document], keyword_hits) -> List[Document]:
+        # Both legs are keyed by content so the same chunk from either side merges
+        ranked_vector = [(vector_store.chunk_id(session_id, doc.page_content), doc) for doc in vector_docs]
+        ranked_keyword = [(vector_store.chunk_id(session_id, doc.page_content), doc) for _, doc, _ in keyword_hits]
+        fused = reciprocal_rank_fusion([ranked_vector, ranked_keyword], k=settings.RAG_FETCH_K)
+        return vector_store.collapse_near_duplicates(fused, k=settings.RAG_TOP_K)
+
+    def retrieve(self, session_id: str, query: str) -> List[Document]:
+        """Hybrid retrieval: dense vector search fused with BM25 keyword search."""
+        with external_call("chroma", "query", session_id=session_id):
+            vector_docs = self.get_retriever(session_id, k=settings.RAG_FETCH_K).invoke(query)
+        if not settings.RAG_HYBRID_ENABLED:
+            return vector_store.collapse_near_duplicates(vector_docs, k=settings.RAG_TOP_K)
+        version = document_versions.get_sync(session_id)
+        keyword_hits = vector_store.keyword_index.search(session_id, query, settings.RAG_FETCH_K, version)
+        return self._fuse(session_id, vector_docs, keyword_hits)
+
+    async def aretrieve(self, session_id: str, query: str) -> List[Document]:
+        """
+        Async hybrid retrieval. Awaits the speculative task for the same
+        query if one was started, otherwise retrieves now.
+        """
+        entry = self._prefetched.pop((session_id, query), None)
+        if entry is not None:
+            task, started_at = entry
+            if time.monotonic() - started_at < settings.RETRIEVAL_PREFETCH_TTL_SECONDS:
+                try:
+                    documents = await task
+                    self.prefetch_stats.hits += 1
+                    return documents
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning("retrieval.prefetch_failed", session_id=session_id, error=e)
+            else:
+                task.cancel()
+                self.prefetch_stats.wasted += 1
+        self.prefetch_stats.misses += 1
+        return await self._aretrieve(session_id, query)
+
+    def prefetch(self, session_id: Optional[str], query: str) -> None:
+        """
+        Starts retrieval for a query in the background, so that it overlaps
+        with the history load, the cache lookup and routing. A no-op if the
+        same query is already in flight. Needs a running event loop.
+        """
+        if not session_id or (session_id, query) in self._prefetched:
+            return
+        now = time.monotonic()
+        # Drop expired entries first, then the oldest if still over the cap
+        while self._prefetched:
+            key, (task, started_at) = next(iter(self._prefetched.items()))
+            if now - started_at < settings.RETRIEVAL_PREFETCH_TTL_SECONDS and len(self._prefetched) < settings.RETRIEVAL_PREFETCH_MAX:
+                break
+            del self._prefetched[key]
+            task.cancel()
+            self.prefetch_stats.wasted += 1
+
+        task = asyncio.create_task(self._aretrieve(session_id, query))
+        # Mark the exception as retrieved if nobody ends up awaiting it
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._prefetched[(session_id, query)] = (task, now)
+        self.prefetch_stats.started += 1
+
+    async def _vector_search(self, session_id: str, query: str) -> List[Document]:
+        with external_call("chroma", "query", session_id=session_id):
+            return await self.get_retriever(session_id, k=settings.RAG_FETCH_K).ainvoke(query)
+
+    async def _keyword_search(self, session_id: str, query: str):
+        version = await document_versions.get(session_id)
+        return await asyncio.to_thread(
+            vector_store.keyword_index.search, session_id, query, settings.RAG_FETCH_K, version
+        )
+
+    async def _aretrieve(self, session_id: str, query: str) -> List[Document]:
+        """Async hybrid retrieval; the vector and keyword legs run concurrently."""
+        if not settings.RAG_HYBRID_ENABLED:
+            vector_docs = await self._vector_search(session_id, query)
+            return vector_store.collapse_near_duplicates(vector_docs, k=settings.RAG_TOP_K)
+        vector_docs, keyword_hits = await asyncio.gather(
+            self._vector_search(session_id, query),
+            self._keyword_search(session_id, query),
+        )
+        return self._fuse(session_id, vector_docs, keyword_hits)
+
+    def _build_context(self, session_id: str, version: Optional[int]) -> SessionContext:
+        with external_call("chroma", "get", session_id=session_id):
+            # Bounded: a session with a very large upload must not be read whole
+            result = vector_store.vector_store.get(
+                where={"session_id": session_id},
+                include=["documents", "metadatas"],
+                limit=self.max_chunks,
+            )
+        documents = [
+            Document(page_content=text, metadata=metadata or {})
+            for text, metadata in zip(result["documents"], result["metadatas"])
+        ]
+        # Document order: by source file, then page
+        documents.sort(key=lambda doc: (str(doc.metadata.get("source", "")), doc.metadata.get("page", 0)))
+
+        sources = Counter(document_name(doc) for doc in documents)
+        listing = ", ".join(f"{name} ({count} chunks)" for name, count in sources.most_common())
+        truncated = len(documents) >= self.max_chunks
+        if truncated:
+            summary = f"The session has at least {self.max_chunks} chunks; the first {len(documents)} come from: {listing}"
+        else:
+            summary = f"The session has {len(sources)} uploaded document(s) with {len(documents)} chunks in total: {listing}"
+
+        logger.info("session_context.built", session_id=session_id, chunks=len(documents),
+                    documents=len(sources), truncated=truncated)
+        return SessionContext(
+            chunks=vector_store.collapse_near_duplicates(documents, k=self.context_chunks),
+            summary=summary,
+            built_at=time.time(),
+            version=version,
+        )
+
+    def _remember(self, session_id: str, context: SessionContext) -> None:
+        self._contexts[session_id] = context
+        self._contexts.move_to_end(session_id)
+        while len(self._contexts) > self.max_sessions:
+            self._contexts.popitem(last=False)
+
+    async def get_context(self, session_id: Optional[str]) -> SessionContext:
+        """Returns the cached context bundle for a session, building it if needed."""
+        if not session_id:
+            return SessionContext(chunks=[], summary="No session ID was provided.", built_at=time.time())
+
+        # Without the version (Redis down) the bundle in memory is used as is
+        version = await document_versions.get(session_id)
+        context = self._contexts.get(session_id)
+        if context is not None and (version is None or context.version == version):
+            self._contexts.move_to_end(session_id)
+            return context
+
+        context = await asyncio.to_thread(self._build_context, session_id, version)
+        self._remember(session_id, context)
+        return context
+
+    async def get_context_text(self, session_id: Optional[str], model: Optional[str] = None) -> str:
+        """Context text for the voice system prompts, within the voice token budget."""
+        if not session_id:
+            return "No session ID was provided."
+        try:
+            return (await self.get_context(session_id)).as_prompt_text(model)
+        except Exception as e:
+            logger.error("session_context.fetch_failed", session_id=session_id, error=e)
+            return "Error retrieving document context."
+
+    def invalidate(self, session_id: str) -> None:
+        self._contexts.pop(session_id, None)
+
+    async def refresh(self, session_id: str) -> None:
+        """Rebuilds the bundle after an upload so the next voice session starts warm."""
+        self.invalidate(session_id)
+        try:
+            version = await document_versions.get(session_id)
+            self._remember(session_id, await asyncio.to_thread(self._build_context, session_id, version))
+        except Exception as e:
+            logger.error("session_context.rebuild_failed", session_id=session_id, error=e)
+
+
+# Global instance
+session_context = SessionContextService()
@@ -0,0 +1,141 @@
+# apps/backend/app/services/translation_cache.py
+import hashlib
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List
+
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+TRANSLATION_KEY_PREFIX = "translation:"
+REDIS_RETRY_SECONDS = 60   # How long the Redis tier stays off after an error
+
+
+def normalize_sentence(text: str) -> str:
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+
+def translation_cache_key(sentence: str, source_code: str, target_code: str, model: str) -> str:
+    raw = "\x1f".join((model, source_code, target_code, normalize_sentence(sentence)))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class TranslationCacheStats:
+    memory_hits: int = 0
+    redis_hits: int = 0
+    misses: int = 0
+    api_requests: int = 0
+    sentences_sent: int = 0
+    batch_fallbacks: int = 0   # Batches whose line count did not survive translation
+
+    def as_dict(self) -> Dict[str, float]:
+        lookups = self.memory_hits + self.redis_hits + self.misses
+        hits = self.memory_hits + self.redis_hits
+        return {
+            "memory_hits": self.memory_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "api_requests": self.api_requests,
+            "sentences_per_request": self.sentences_sent / self.api_requests if self.api_requests else 0.0,
+            "batch_fallbacks": self.batch_fallbacks,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+
+class TranslationCache:
+    """
+    Sentence-level translation cache: an in-process LRU, optionally backed
+    by Redis so translations are shared between workers and survive
+    restarts. Redis errors only switch the shared tier off for a while,
+    they never fail a translation.
+    """
+
+    def __init__(
+        self,
+        max_items: int = settings.TRANSLATION_CACHE_MAX_ITEMS,
+        redis_client_factory=None,
+        ttl_seconds: int = settings.TRANSLATION_CACHE_TTL_SECONDS,
+    ):
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds
+        self.stats = TranslationCacheStats()
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._redis_factory = redis_client_factory
+        self._redis = None
+        self._redis_retry_at = 0.0
+
+    def _redis_client(self):
+        if self._redis_factory is None or time.monotonic() < self._redis_retry_at:
+            return None
+        if self._redis is None:
+            self._redis = self._redis_factory()
+        return self._redis
+
+    def _redis_failed(self, action: str, error: Exception) -> None:
+        logger.warning("translation_cache.redis_failed", action=action, retry_seconds=REDIS_RETRY_SECONDS, error=error)
+        self._redis_retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+
+    def _remember(self, key: str, translation: str) -> None:
+        self._memory[key] = translation
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    async def get_many(self, keys: List[str]) -> Dict[str, str]:
+        found: Dict[str, str] = {}
+        missing = []
+        for key in keys:
+            translation = self._memory.get(key)
+            if translation is not None:
+                self._memory.move_to_end(key)
+                found[key] = translation
+                self.stats.memory_hits += 1
+            else:
+                missing.append(key)
+
+        redis_client = self._redis_client() if missing else None
+        if redis_client is not None:
+            try:
+                values = await redis_client.mget([TRANSLATION_KEY_PREFIX + key for key in missing])
+                for key, value in zip(missing, values):
+                    if value is not None:
+                        translation = value.decode("utf-8") if isinstance(value, bytes) else value
+                        found[key] = translation
+                        self._remember(key, translation)
+                        self.stats.redis_hits += 1
+            except Exception as e:
+                self._redis_failed("lookup", e)
+
+        self.stats.misses += len(keys) - len(found)
+        return found
+
+    async def put_many(self, items: Dict[str, str]) -> None:
+        for key, translation in items.items():
+            self._remember(key, translation)
+        redis_client = self._redis_client() if items else None
+        if redis_client is not None:
+            try:
+                async with redis_client.pipeline(transaction=False) as pipe:
+                    for key, translation in items.items():
+                        pipe.set(TRANSLATION_KEY_PREFIX + key, translation, ex=self.ttl_seconds)
+                    await pipe.execute()
+            except Exception as e:
+                self._redis_failed("write", e)
+
+
+def _shared_redis_client():
+    # Imported on first use so the cache works in scripts without the chat stack
+    from app.core.session import get_redis_client
+    return get_redis_client()
+
+
+# Global instance
+translation_cache = TranslationCache(
+    redis_client_factory=_shared_redis_client if settings.TRANSLATION_CACHE_REDIS_ENABLED else None
+)
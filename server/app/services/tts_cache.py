@@ -0,0 +1,201 @@
+# apps/backend/app/services/tts_cache.py
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def normalize_tts_text(text: str) -> str:
+    """Same audio for texts that only differ in Unicode form or whitespace."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+
+def tts_cache_key(text: str, language_code: str, voice: str, model: str, sample_rate: int) -> str:
+    raw = "\x1f".join((model, str(sample_rate), language_code, voice, normalize_tts_text(text)))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class TTSCacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    prewarmed: int = 0
+
+    def as_dict(self) -> Dict[str, float]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        hits = self.memory_hits + self.disk_hits
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "prewarmed": self.prewarmed,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+
+class TTSCache:
+    """
+    Synthesised audio keyed by (normalized text, language code, voice, model,
+    sample rate). A byte-bounded in-memory LRU sits in front of a SQLite
+    table that is also byte-bounded, evicting the least recently used clips.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = os.path.join(settings.TTS_CACHE_DIR, "tts.sqlite3"),
+        memory_bytes: int = settings.TTS_CACHE_MEMORY_MB * 1024 * 1024,
+        disk_bytes: int = settings.TTS_CACHE_DISK_MB * 1024 * 1024,
+    ):
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.stats = TTSCacheStats()
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_used = 0
+        self._lock = threading.Lock()
+        self._pending_writes = set()
+        self._disk_used = 0
+        self._db = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS tts_audio ("
+                "key TEXT PRIMARY KEY, audio BLOB NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS tts_audio_last_used ON tts_audio (last_used)")
+            self._db.commit()
+            self._disk_used = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM tts_audio").fetchone()[0]
+
+    def _remember(self, key: str, audio: bytes) -> None:
+        if len(audio) > self.memory_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_used -= len(previous)
+        self._memory[key] = audio
+        self._memory_used += len(audio)
+        while self._memory_used > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_used -= len(evicted)
+            self.stats.evictions += 1
+
+    def _get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                self.stats.memory_hits += 1
+                return audio
+
+            if self._db is not None:
+                row = self._db.execute("SELECT audio FROM tts_audio WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._db.execute("UPDATE tts_audio SET last_used = ? WHERE key = ?", (time.time(), key))
+                    self._db.commit()
+                    self._remember(key, row[0])
+                    self.stats.disk_hits += 1
+                    return row[0]
+
+            self.stats.misses += 1
+            return None
+
+    def _write(self, key: str, audio: bytes) -> None:
+        with self._lock:
+            row = self._db.execute("SELECT size FROM tts_audio WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO tts_audio (key, audio, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, audio, len(audio), time.time()),
+            )
+            self._disk_used += len(audio) - (row[0] if row else 0)
+            while self._disk_used > self.disk_bytes:
+                oldest = self._db.execute(
+                    "SELECT key, size FROM tts_audio ORDER BY last_used LIMIT 64"
+                ).fetchall()
+                if not oldest:
+                    break
+                for old_key, size in oldest:
+                    self._db.execute("DELETE FROM tts_audio WHERE key = ?", (old_key,))
+                    self._disk_used -= size
+                    self.stats.evictions += 1
+                    if self._disk_used <= self.disk_bytes:
+                        break
+            self._db.commit()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            # Memory hits skip the thread hop
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                self.stats.memory_hits += 1
+                return audio
+        if self._db is None:
+            self.stats.misses += 1
+            return None
+        return await asyncio.to_thread(self._get, key)
+
+    def _contains(self, key: str) -> bool:
+        with self._lock:
+            if key in self._memory:
+                return True
+            if self._db is None:
+                return False
+            return self._db.execute("SELECT 1 FROM tts_audio WHERE key = ?", (key,)).fetchone() is not None
+
+    async def contains(self, key: str) -> bool:
+        """Membership check that does not count towards the hit rate."""
+        return await asyncio.to_thread(self._contains, key)
+
+    async def put(self, key: str, audio: bytes) -> None:
+        """
+        Stores the clip in memory right away; the disk write happens in the
+        background so it never adds to the latency of the turn.
+        """
+        with self._lock:
+            self._remember(key, audio)
+        if self._db is None:
+            return
+        task = asyncio.create_task(asyncio.to_thread(self._write, key, audio))
+        self._pending_writes.add(task)
+        task.add_done_callback(self._pending_writes.discard)
+
+    async def flush(self) -> None:
+        """Waits for background disk writes, e.g. on shutdown."""
+        if self._pending_writes:
+            await asyncio.gather(*self._pending_writes, return_exceptions=True)
+
+
+def load_prewarm_phrases(path: Optional[str] = settings.TTS_PREWARM_PHRASES_PATH) -> List[dict]:
+    """
+    Reads the phrase list used to warm the cache at startup: a JSON list of
+    {"text": ..., "language": ..., "voice": optional}.
+    """
+    if not path or not os.path.exists(path):
+        return []
+    try:
+        with open(path, encoding="utf-8") as f:
+            phrases = json.load(f)
+        return [phrase for phrase in phrases if phrase.get("text")]
+    except Exception as e:
+        logger.error("tts_cache.phrases_unreadable", path=path, error=e)
+        return []
+
+
+# Global instance
+tts_cache = TTSCache()
@@ -0,0 +1,236 @@
+# apps/backend/app/services/vad.py
+import io
+import time
+import wave
+from dataclasses import dataclass
+from typing import Dict, List
+
+import numpy as np
+
+from app.core.config import settings
+
+
+def pcm_to_wav(pcm: bytes, sample_rate: int = settings.VAD_SAMPLE_RATE) -> bytes:
+    """Wraps raw 16-bit mono PCM in a WAV container for the STT API."""
+    output = io.BytesIO()
+    with wave.open(output, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return output.getvalue()
+
+
+class PCMRingBuffer:
+    """
+    Fixed-capacity ring buffer of int16 samples. Writing past the capacity
+    overwrites the oldest samples, so memory per connection is bounded no
+    matter how long a client keeps streaming.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=np.int16)
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, samples: np.ndarray) -> None:
+        if len(samples) >= self.capacity:
+            self._data[:] = samples[-self.capacity:]
+            self._start, self._size = 0, self.capacity
+            return
+        end = (self._start + self._size) % self.capacity
+        first = min(len(samples), self.capacity - end)
+        self._data[end:end + first] = samples[:first]
+        self._data[:len(samples) - first] = samples[first:]
+        overflow = max(0, self._size + len(samples) - self.capacity)
+        self._start = (self._start + overflow) % self.capacity
+        self._size = min(self.capacity, self._size + len(samples))
+
+    def keep_last(self, n: int) -> None:
+        """Drops everything but the newest `n` samples."""
+        if n < self._size:
+            self._start = (self._start + self._size - n) % self.capacity
+            self._size = n
+
+    def to_array(self) -> np.ndarray:
+        end = self._start + self._size
+        if end <= self.capacity:
+            return self._data[self._start:end].copy()
+        return np.concatenate((self._data[self._start:], self._data[:end - self.capacity]))
+
+    def clear(self) -> None:
+        self._start = self._size = 0
+
+
+@dataclass
+class Utterance:
+    pcm: bytes
+    duration_ms: float
+    endpointing_ms: float   # Audio waited for after the last speech frame
+
+
+@dataclass
+class VADStats:
+    chunks_received: int = 0       # Each chunk used to be one STT call
+    utterances: int = 0            # STT calls actually made
+    noise_bursts_dropped: int = 0  # Speech-like blips shorter than the minimum utterance
+    audio_ms: float = 0.0
+    speech_ms: float = 0.0
+    endpointing_ms_total: float = 0.0
+    processing_ms_total: float = 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "chunks_received": self.chunks_received,
+            "stt_calls": self.utterances,
+            "stt_calls_saved": max(0, self.chunks_received - self.utterances),
+            "noise_bursts_dropped": self.noise_bursts_dropped,
+            "silence_dropped_ms": max(0.0, self.audio_ms - self.speech_ms),
+            "avg_endpointing_ms": self.endpointing_ms_total / self.utterances if self.utterances else 0.0,
+            "avg_processing_ms_per_chunk": (
+                self.processing_ms_total / self.chunks_received if self.chunks_received else 0.0
+            ),
+        }
+
+
+# Aggregated over all connections, served by /sarvam-vad-stats
+vad_stats = VADStats()
+
+
+class UtteranceSegmenter:
+    """
+    Energy-based voice activity detection and endpointing for one connection.
+
+    Incoming PCM is cut into fixed frames and each frame's RMS is compared to
+    an adaptive threshold (a multiple of the tracked noise floor). Speech
+    starts after `speech_start_ms` of voiced frames and ends after
+    `hangover_ms` of silence. A short pre-roll is kept so the first syllable
+    is not clipped. Silence between utterances is never sent to STT.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = settings.VAD_SAMPLE_RATE,
+        frame_ms: int = settings.VAD_FRAME_MS,
+        speech_start_ms: int = settings.VAD_SPEECH_START_MS,
+        hangover_ms: int = settings.VAD_HANGOVER_MS,
+        pre_roll_ms: int = settings.VAD_PRE_ROLL_MS,
+        min_utterance_ms: int = settings.VAD_MIN_UTTERANCE_MS,
+        max_utterance_ms: int = settings.VAD_MAX_UTTERANCE_SECONDS * 1000,
+        min_rms: float = settings.VAD_MIN_RMS,
+        noise_ratio: float = settings.VAD_NOISE_RATIO,
+        stats: VADStats = vad_stats,
+    ):
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.min_utterance_ms = min_utterance_ms
+        self.min_rms = min_rms
+        self.noise_ratio = noise_ratio
+        self.stats = stats
+
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self._start_frames = max(1, speech_start_ms // frame_ms)
+        self._hangover_frames = max(1, hangover_ms // frame_ms)
+        self._pre_roll_samples = sample_rate * pre_roll_ms // 1000
+        self._max_samples = sample_rate * max_utterance_ms // 1000
+        self._buffer = PCMRingBuffer(self._max_samples + self._pre_roll_samples)
+        self._partial = np.zeros(0, dtype=np.int16)
+        self._noise_floor = min_rms / noise_ratio
+        self._reset()
+
+    def _reset(self) -> None:
+        self._in_speech = False
+        self._voiced_run = 0
+        self._silent_run = 0
+        self._speech_frames = 0
+        self._buffer.keep_last(self._pre_roll_samples)
+
+    def _threshold(self) -> float:
+        return max(self.min_rms, self._noise_floor * self.noise_ratio)
+
+    def feed(self, pcm: bytes) -> List[Utterance]:
+        """Adds a chunk of 16-bit mono PCM and returns any utterances it completed."""
+        started = time.perf_counter()
+        samples = np.frombuffer(pcm[:len(pcm) - len(pcm) % 2], dtype=np.int16)
+        self.stats.chunks_received += 1
+        self.stats.audio_ms += len(samples) * 1000 / self.sample_rate
+
+        samples = np.concatenate((self._partial, samples))
+        n_frames = len(samples) // self.frame_samples
+        self._partial = samples[n_frames * self.frame_samples:]
+        frames = samples[:n_frames * self.frame_samples].reshape(n_frames, self.frame_samples)
+        # RMS of every frame in one vectorised pass
+        rms = np.sqrt(np.mean(frames.astype(np.float32) ** 2, axis=1)) if n_frames else np.zeros(0)
+
+        utterances = []
+        for frame, level in zip(frames, rms):
+            utterance = self._process_frame(frame, float(level))
+            if utterance is not None:
+                utterances.append(utterance)
+
+        self.stats.processing_ms_total += (time.perf_counter() - started) * 1000
+        return utterances
+
+    def _process_frame(self, frame: np.ndarray, level: float):
+        voiced = level > self._threshold()
+        self._buffer.append(frame)
+
+        if not self._in_speech:
+            if voiced:
+                self._voiced_run += 1
+                if self._voiced_run >= self._start_frames:
+                    self._in_speech = True
+                    self._speech_frames = self._voiced_run
+                    self._silent_run = 0
+            else:
+                self._voiced_run = 0
+                # Only track the noise floor while nobody is talking
+                self._noise_floor = 0.95 * self._noise_floor + 0.05 * level
+                self._buffer.keep_last(self._pre_roll_samples + self._voiced_run * self.frame_samples)
+            return None
+
+        if voiced:
+            self._speech_frames += 1
+            self._silent_run = 0
+        else:
+            self._silent_run += 1
+
+        if self._silent_run >= self._hangover_frames or len(self._buffer) >= self._max_samples:
+            return self._finish()
+        return None
+
+    def _finish(self):
+        pcm = self._buffer.to_array()
+        # Trim the hangover silence, except for a short tail
+        tail = min(self._silent_run, self._start_frames) * self.frame_samples
+        pcm = pcm[:len(pcm) - (self._silent_run * self.frame_samples - tail)] if self._silent_run else pcm
+        speech_ms = self._speech_frames * self.frame_ms
+        endpointing_ms = self._silent_run * self.frame_ms
+        self._buffer.clear()
+        self._reset()
+
+        if speech_ms < self.min_utterance_ms:
+            self.stats.noise_bursts_dropped += 1
+            return None
+        self.stats.utterances += 1
+        self.stats.speech_ms += len(pcm) * 1000 / self.sample_rate
+        self.stats.endpointing_ms_total += endpointing_ms
+        return Utterance(
+            pcm=pcm.tobytes(),
+            duration_ms=len(pcm) * 1000 / self.sample_rate,
+            endpointing_ms=endpointing_ms,
+        )
+
+    def flush(self) -> List[Utterance]:
+        """Ends the current utterance now, e.g. when the user stops recording."""
+        self._partial = np.zeros(0, dtype=np.int16)
+        if not self._in_speech:
+            self._buffer.clear()
+            self._reset()
+            return []
+        utterance = self._finish()
+        return [utterance] if utterance is not None else []
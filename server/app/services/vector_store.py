@@ -32,14 +32,22 @@ import chromadb
 from langchain_chroma import Chroma
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from langchain_core.documents import Document
-from typing import List
+import hashlib
+import re
+from typing import List, Optional
 from app.core.config import settings
+from app.core.logger import get_logger
+from app.core.telemetry import external_call
+from app.services.bm25_index import SessionKeywordIndex
+from app.services.embedding_cache import CachedEmbeddings
 from google import genai
 import os 
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = get_logger(__name__)
+
 
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 
@@ -51,12 +59,20 @@ client = genai.Client(api_key=GOOGLE_API_KEY)
 CHROMA_PERSIST_DIRECTORY = "chroma_db"
 CHROMA_COLLECTION_NAME = "multimodal_rag_collection"
 
+EMBEDDING_MODEL = "models/embedding-001"
+
 # --- Initialization ---
 # Initialize the Google Generative AI embedding model
 # We use LangChain's wrapper for seamless integration.
-embedding_function = GoogleGenerativeAIEmbeddings(
-    model="models/embedding-001", 
-    task_type="retrieval_document"
+# The cache wrapper makes sure duplicate chunks and repeated queries are
+# never sent to the embedding API twice, and batches ingestion calls.
+embedding_function = CachedEmbeddings(
+    GoogleGenerativeAIEmbeddings(
+        model=EMBEDDING_MODEL,
+        task_type="retrieval_document"
+    ),
+    namespace=EMBEDDING_MODEL,
+    cache_path=os.path.join(settings.EMBEDDING_CACHE_DIR, "embeddings.sqlite3"),
 )
 
 # Initialize a persistent ChromaDB client
@@ -69,23 +85,121 @@ vector_store = Chroma(
     embedding_function=embedding_function,
 )
 
+def _load_session_documents(session_id: str):
+    """Loads every chunk of a session from Chroma, used to (re)build its keyword index."""
+    result = vector_store.get(where={"session_id": session_id}, include=["documents", "metadatas"])
+    documents = [
+        Document(page_content=text, metadata=metadata or {})
+        for text, metadata in zip(result["documents"], result["metadatas"])
+    ]
+    return result["ids"], documents
+
+
+# BM25 index per session, run alongside the dense retriever for SKUs, sizes and model numbers
+keyword_index = SessionKeywordIndex(loader=_load_session_documents)
+
 # --- Service Functions ---
-def add_documents_to_store(documents: List[Document],session_id: str):
+def chunk_id(session_id: str, text: str) -> str:
+    """Deterministic Chroma id for a chunk: the same text in the same session always maps to one id."""
+    return hashlib.sha256(f"{session_id}\x00{text}".encode("utf-8")).hexdigest()
+
+
+def file_hash(file_path: str) -> str:
+    """SHA-256 of a file's content, read in 1 MB blocks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def add_documents_to_store(
+    documents: List[Document],
+    session_id: str,
+    content_hash: Optional[str] = None,
+    filename: Optional[str] = None,
+) -> int:
     """
     Adds a list of LangChain documents to the persistent Chroma vector store.
     The documents will be embedded using the GoogleGenerativeAIEmbeddings function.
+
+    Chunks get deterministic, content-derived ids, so chunks already stored
+    for the session (re-uploads, repeated boilerplate) are skipped without
+    being embedded again. Returns the number of chunks actually added.
     """
     if not documents:
-        return
+        return 0
     
     # --- CORE CHANGE: Add metadata to each document chunk ---
     for doc in documents:
         doc.metadata = {"session_id": session_id, **doc.metadata}
+        if content_hash:
+            doc.metadata["file_hash"] = content_hash
+        if filename:
+            # "source" is the upload's temporary path; this is the name the user knows
+            doc.metadata["filename"] = filename
     # --------------------------------------------------------
 
-    print(f"Adding {len(documents)} document chunks with session_id '{session_id}' to ChromaDB.")
-    vector_store.add_documents(documents)
-    print("Successfully added documents to the store.")
+    # Deduplicate within the batch, then against what is already stored
+    unique = {}
+    for doc in documents:
+        unique.setdefault(chunk_id(session_id, doc.page_content), doc)
+    with external_call("chroma", "get", session_id=session_id):
+        existing = set(vector_store.get(ids=list(unique.keys()), include=[])["ids"])
+    new_ids = [doc_id for doc_id in unique if doc_id not in existing]
+
+    if not new_ids:
+        logger.info("vector_store.all_duplicates", session_id=session_id, chunks=len(documents))
+        return 0
+
+    new_documents = [unique[doc_id] for doc_id in new_ids]
+    # Includes embedding the new chunks; the embedding calls are timed on their own
+    with external_call("chroma", "add", session_id=session_id, chunks=len(new_ids)):
+        vector_store.add_documents(new_documents, ids=new_ids)
+    keyword_index.add(session_id, new_ids, new_documents)
+    logger.info("vector_store.added", session_id=session_id, chunks=len(new_ids),
+                duplicates=len(documents) - len(new_ids))
+    return len(new_ids)
+
+
+def has_file(session_id: str, content_hash: str) -> bool:
+    """True if the session still has at least one chunk stored from the file with this hash."""
+    with external_call("chroma", "get", session_id=session_id):
+        result = vector_store.get(
+            where={"$and": [{"session_id": session_id}, {"file_hash": content_hash}]},
+            limit=1,
+            include=[],
+        )
+    return bool(result["ids"])
+
+
+def _shingles(text: str, size: int = 5) -> set:
+    words = re.findall(r"\w+", text.lower())
+    if len(words) <= size:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def collapse_near_duplicates(
+    documents: List[Document],
+    k: int,
+    threshold: float = settings.RAG_DEDUP_THRESHOLD,
+) -> List[Document]:
+    """
+    Keeps documents in rank order, dropping any whose word 5-gram overlap
+    (Jaccard) with an already kept document is at least `threshold`.
+    Returns at most k documents.
+    """
+    kept, kept_shingles = [], []
+    for doc in documents:
+        shingles = _shingles(doc.page_content)
+        if any(len(shingles & other) / len(shingles | other) >= threshold for other in kept_shingles):
+            continue
+        kept.append(doc)
+        kept_shingles.append(shingles)
+        if len(kept) == k:
+            break
+    return kept
 
 
 def get_retriever(session_id: str, search_kwargs={"k": 3}):
@@ -93,7 +207,7 @@ def get_retriever(session_id: str, search_kwargs={"k": 3}):
     Returns a retriever for the Chroma vector store that is filtered
     to only search documents matching the given session_id.
     """
-    print(f"Creating retriever for session_id: {session_id}")
+    logger.debug("vector_store.retriever", session_id=session_id)
     # --- CORE CHANGE: Use the 'filter' argument in as_retriever ---
     return vector_store.as_retriever(
         search_kwargs={
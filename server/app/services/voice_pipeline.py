@@ -0,0 +1,126 @@
+# apps/backend/app/services/voice_pipeline.py
+import asyncio
+import re
+from contextlib import aclosing
+from typing import AsyncGenerator, Awaitable, Callable, List, TypeVar
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+# Sentence ends: Latin and Devanagari punctuation followed by whitespace, or a line break
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?।॥])\s+|\n+")
+
+
+class SentenceBuffer:
+    """
+    Turns a stream of LLM tokens into complete sentences. Very short
+    sentences are merged into the next one so TTS is not called for "Yes."
+    on its own.
+    """
+
+    def __init__(self, min_chars: int = settings.VOICE_MIN_SENTENCE_CHARS):
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        self._buffer += text
+        parts = _SENTENCE_END_RE.split(self._buffer)
+        # The last part has no terminator yet
+        self._buffer = parts.pop()
+        return self._merge(parts, keep_tail=True)
+
+    def flush(self) -> List[str]:
+        parts, self._buffer = [self._buffer], ""
+        return self._merge(parts, keep_tail=False)
+
+    def _merge(self, parts: List[str], keep_tail: bool) -> List[str]:
+        sentences, pending = [], ""
+        for part in parts:
+            part = part.strip()
+            if not part:
+                continue
+            pending = f"{pending} {part}".strip()
+            if len(pending) >= self.min_chars:
+                sentences.append(pending)
+                pending = ""
+        if pending:
+            if keep_tail:
+                # Too short to send alone; prepend it to what comes next
+                self._buffer = f"{pending} {self._buffer}"
+            else:
+                sentences.append(pending)
+        return sentences
+
+
+def split_sentences(text: str, min_chars: int = settings.VOICE_MIN_SENTENCE_CHARS) -> List[str]:
+    """Splits a complete text into sentences using the same rules as SentenceBuffer."""
+    buffer = SentenceBuffer(min_chars)
+    return buffer.feed(text) + buffer.flush()
+
+
+async def run_sentence_pipeline(
+    tokens: AsyncGenerator[str, None],
+    process_sentence: Callable[[str], Awaitable[T]],
+    emit: Callable[[int, str, T], Awaitable[None]],
+    max_in_flight: int = settings.VOICE_MAX_SENTENCES_IN_FLIGHT,
+) -> List[str]:
+    """
+    Streams `tokens` into sentences and runs `process_sentence` (translate +
+    TTS) on each one as soon as it is complete, while later sentences are
+    still being generated. Results are passed to `emit` strictly in sentence
+    order. At most `max_in_flight` sentences are processed at once, which
+    also applies backpressure to the token stream.
+
+    Returns the list of sentences that were processed.
+    """
+    in_flight: asyncio.Queue = asyncio.Queue(maxsize=max_in_flight)
+    sentences: List[str] = []
+
+    async def produce():
+        buffer = SentenceBuffer()
+        cancelled = False
+        try:
+            # Closed on the way out, so a cancelled turn also stops generation
+            async with aclosing(tokens):
+                async for token in tokens:
+                    for sentence in buffer.feed(token):
+                        sentences.append(sentence)
+                        await in_flight.put((sentence, asyncio.create_task(process_sentence(sentence))))
+            for sentence in buffer.flush():
+                sentences.append(sentence)
+                await in_flight.put((sentence, asyncio.create_task(process_sentence(sentence))))
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            # Only cancelled once the consumer is gone; nobody would take the end
+            # marker then, and a full queue would block this task forever
+            if not cancelled:
+                await in_flight.put(None)
+
+    async def consume():
+        index = 0
+        while True:
+            item = await in_flight.get()
+            if item is None:
+                return
+            sentence, task = item
+            await emit(index, sentence, await task)
+            index += 1
+
+    producer = asyncio.create_task(produce())
+    try:
+        await consume()
+        await producer
+    finally:
+        if not producer.done():
+            producer.cancel()
+        # Let it finish unwinding and retrieve its exception, if any
+        await asyncio.gather(producer, return_exceptions=True)
+        # Cancel sentence work that will never be emitted
+        while not in_flight.empty():
+            item = in_flight.get_nowait()
+            if item is not None:
+                item[1].cancel()
+    return sentences
@@ -0,0 +1,151 @@
+# apps/backend/app/services/voice_sessions.py
+import json
+import os
+import socket
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+VOICE_SESSION_KEY_PREFIX = "voice_session:"
+
+# Identifies this worker in session messages and stats
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+@dataclass
+class VoiceSession:
+    """State of one voice conversation, independent of the socket carrying it."""
+    kind: str                      # "sarvam" or "live"
+    resume_id: str
+    resumed: bool = False
+    data: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def turns(self) -> int:
+        return self.data.get("turns", 0)
+
+    @property
+    def memory_id(self) -> str:
+        """Key of the conversation history in ConversationMemory."""
+        return f"voice:{self.kind}:{self.resume_id}"
+
+
+class VoiceSessionStore:
+    """
+    Voice session state kept in Redis instead of the websocket coroutine,
+    so a client that reconnects with its resumeId continues the same
+    conversation on whichever worker or node accepts the new socket.
+
+    Redis errors never fail a connection: the session then simply lives
+    for this socket only and cannot be resumed.
+    """
+
+    def __init__(self, redis_client_factory=None, ttl_seconds: int = settings.VOICE_SESSION_TTL_SECONDS):
+        self._redis_factory = redis_client_factory
+        self._redis = None
+        self.ttl_seconds = ttl_seconds
+
+    def _redis_client(self):
+        if self._redis is None:
+            self._redis = self._redis_factory()
+        return self._redis
+
+    def _key(self, kind: str, resume_id: str) -> str:
+        return f"{VOICE_SESSION_KEY_PREFIX}{kind}:{resume_id}"
+
+    async def open(self, kind: str, resume_id: Optional[str], config: Dict[str, Any]) -> VoiceSession:
+        """
+        Resumes the stored session for `resume_id` if there is one, otherwise
+        starts a new one. Values in the new connection's config take
+        precedence over the stored ones (e.g. a changed language).
+        """
+        if resume_id:
+            try:
+                raw = await self._redis_client().get(self._key(kind, resume_id))
+                if raw is not None:
+                    data = json.loads(raw)
+                    data["config"] = {**data.get("config", {}), **config}
+                    return VoiceSession(kind, resume_id, resumed=True, data=data)
+            except Exception as e:
+                logger.warning("voice_session.load_failed", resume_id=resume_id, error=e)
+
+        return VoiceSession(
+            kind,
+            resume_id or uuid.uuid4().hex,
+            data={"config": dict(config), "turns": 0, "created_at": time.time()},
+        )
+
+    async def save(self, session: VoiceSession) -> None:
+        session.data["worker"] = WORKER_ID
+        session.data["updated_at"] = time.time()
+        try:
+            await self._redis_client().set(
+                self._key(session.kind, session.resume_id),
+                json.dumps(session.data),
+                ex=self.ttl_seconds,
+            )
+        except Exception as e:
+            logger.warning("voice_session.save_failed", resume_id=session.resume_id, error=e)
+
+
+class AdmissionLimiter:
+    """
+    Caps the number of concurrent voice connections on this worker. Each
+    one holds an STT/LLM/TTS pipeline or a Gemini Live session, so past the
+    cap new sockets are turned away with a retryable close code and the
+    client (or the load balancer) can try another worker.
+    """
+
+    def __init__(self, max_connections: int = settings.VOICE_MAX_CONNECTIONS_PER_WORKER):
+        self.max_connections = max_connections
+        self.active = 0
+        self.admitted = 0
+        self.rejected = 0
+
+    def try_acquire(self) -> bool:
+        if self.active >= self.max_connections:
+            self.rejected += 1
+            return False
+        self.active += 1
+        self.admitted += 1
+        return True
+
+    def release(self) -> None:
+        self.active -= 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "worker": WORKER_ID,
+            "active_connections": self.active,
+            "max_connections": self.max_connections,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
+
+
+async def refuse_connection(websocket, limiter: AdmissionLimiter) -> None:
+    """Tells an accepted socket that this worker is full, then closes it."""
+    logger.warning("voice.refused", active=limiter.active, max_connections=limiter.max_connections, worker=WORKER_ID)
+    await websocket.send_text(json.dumps({
+        "type": "error",
+        "message": "Server is busy, please reconnect",
+        "retryable": True,
+    }))
+    await websocket.close(code=1013)  # Try Again Later
+
+
+def _shared_redis_client():
+    # Imported on first use so the store works in scripts without the chat stack
+    from app.core.session import get_redis_client
+    return get_redis_client()
+
+
+# Global instances
+voice_sessions = VoiceSessionStore(redis_client_factory=_shared_redis_client)
+voice_admission = AdmissionLimiter()
@@ -1,23 +1,286 @@
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-# from langchain_community.tools.tavily_search import TavilySearchResults
-from langchain_community.tools import TavilySearchResults
-
-
-os.environ["TAVILY_API_KEY"] = os.getenv("TAVILY_API_KEY")
-
-def get_web_search_tool():
-    
-    # This tool is used to search content from the web.
-    
-    return TavilySearchResults(
-            max_results=5,
-            include_answer=True,
-            include_raw_content=True,
-            include_images=True,
-            # search_depth="advanced",
-            # include_domains = []
-            # exclude_domains = []
-        )
\ No newline at end of file
+# apps/backend/app/tools/web_search.py
+import asyncio
+import random
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+import requests
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.core.telemetry import external_call
+from app.services.context_packer import trim_to_budget
+
+TAVILY_SEARCH_URL = f"{settings.TAVILY_BASE_URL}/search"
+
+# Status codes worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+logger = get_logger(__name__)
+
+
+class WebSearchError(Exception):
+    """Tavily returned an error or could not be reached."""
+
+
+def normalize_query(query: str) -> str:
+    """Cache key form of a query: case, spacing and trailing punctuation do not matter."""
+    query = unicodedata.normalize("NFKC", query).lower()
+    return re.sub(r"\s+", " ", query).strip().rstrip("?!. ")
+
+
+@dataclass
+class WebSearchStats:
+    requests: int = 0          # Calls that went to Tavily
+    cache_hits: int = 0
+    coalesced: int = 0         # Callers that waited on an identical in-flight search
+    errors: int = 0
+    response_bytes: int = 0
+    chars_received: int = 0    # Result text before trimming
+    chars_kept: int = 0
+
+    def as_dict(self) -> Dict[str, float]:
+        lookups = self.requests + self.cache_hits + self.coalesced
+        return {
+            "requests": self.requests,
+            "cache_hits": self.cache_hits,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "hit_rate": (self.cache_hits + self.coalesced) / lookups if lookups else 0.0,
+            "avg_response_bytes": self.response_bytes / self.requests if self.requests else 0.0,
+            "kept_ratio": self.chars_kept / self.chars_received if self.chars_received else 0.0,
+        }
+
+
+class WebSearchClient:
+    """
+    Tavily search client used by the web search nodes.
+
+    - one keep-alive connection pool (aiohttp for ainvoke, a requests
+      session for the blocking invoke path) instead of a new tool per call
+    - asks only for what the nodes use: the top results' url, title and
+      content, no generated answer or images, raw page text only if enabled
+    - trims each result to a token budget by sentence relevance
+    - a TTL cache keyed by the normalised query, and identical searches that
+      are already in flight are shared rather than sent twice
+
+    Results keep the shape of TavilySearchResults: a list of dicts with
+    "url", "title" and "content".
+    """
+
+    def __init__(
+        self,
+        url: str = TAVILY_SEARCH_URL,
+        max_results: int = settings.WEB_SEARCH_MAX_RESULTS,
+        result_tokens: int = settings.WEB_SEARCH_RESULT_TOKENS,
+        include_raw_content: bool = settings.WEB_SEARCH_INCLUDE_RAW_CONTENT,
+        ttl_seconds: float = settings.WEB_SEARCH_CACHE_TTL_SECONDS,
+        max_items: int = settings.WEB_SEARCH_CACHE_MAX_ITEMS,
+        max_retries: int = settings.WEB_SEARCH_MAX_RETRIES,
+    ):
+        self.url = url
+        self.max_results = max_results
+        self.result_tokens = result_tokens
+        self.include_raw_content = include_raw_content
+        self.ttl_seconds = ttl_seconds
+        self.max_items = max_items
+        self.max_retries = max_retries
+        self.headers = {
+            "Authorization": f"Bearer {settings.TAVILY_API_KEY}",
+            "Content-Type": "application/json",
+        }
+        self.stats = WebSearchStats()
+        self._cache: "OrderedDict[str, Tuple[float, List[dict]]]" = OrderedDict()
+        self._lock = threading.Lock()   # The cache is shared with the blocking path's threads
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._sync_session: Optional[requests.Session] = None
+
+    async def start(self):
+        """Opens the shared connection pool. Called once at app startup."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=settings.WEB_SEARCH_MAX_CONNECTIONS,
+                keepalive_timeout=60,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=settings.WEB_SEARCH_TIMEOUT, connect=5),
+            )
+
+    async def close(self):
+        """Closes the connection pools on app shutdown."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        if self._sync_session is not None:
+            self._sync_session.close()
+            self._sync_session = None
+
+    def _payload(self, query: str) -> dict:
+        return {
+            "query": query,
+            "max_results": self.max_results,
+            "search_depth": settings.WEB_SEARCH_DEPTH,
+            "include_answer": False,
+            "include_images": False,
+            "include_raw_content": self.include_raw_content,
+        }
+
+    def _results(self, body: dict, query: str) -> List[dict]:
+        results = []
+        for result in body.get("results", [])[: self.max_results]:
+            text = result.get("raw_content") or result.get("content") or ""
+            trimmed = trim_to_budget(text, query, self.result_tokens)
+            self.stats.chars_received += len(text)
+            self.stats.chars_kept += len(trimmed)
+            results.append({"url": result.get("url", ""), "title": result.get("title", ""), "content": trimmed})
+        return results
+
+    def _cached(self, key: str) -> Optional[List[dict]]:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            stored_at, results = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            self.stats.cache_hits += 1
+            return results
+
+    def _store(self, key: str, results: List[dict]) -> None:
+        with self._lock:
+            self._cache[key] = (time.monotonic(), results)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_items:
+                self._cache.popitem(last=False)
+
+    def _failed(self, status, body: str, attempt: int) -> None:
+        """Raises unless the status is worth retrying and retries are left."""
+        if status in RETRYABLE_STATUSES and attempt < self.max_retries:
+            logger.warning("web_search.retry", status=status, attempt=attempt + 1)
+            return
+        self.stats.errors += 1
+        raise WebSearchError(f"Tavily error {status}: {body[:200]}")
+
+    async def _afetch(self, query: str) -> List[dict]:
+        if self._session is None or self._session.closed:
+            await self.start()  # Scripts and tests that skip the app lifespan
+
+        for attempt in range(self.max_retries + 1):
+            self.stats.requests += 1
+            try:
+                async with self._session.post(self.url, json=self._payload(query)) as response:
+                    raw = await response.read()
+                    self.stats.response_bytes += len(raw)
+                    if response.status == 200:
+                        return self._results(await response.json(content_type=None), query)
+                    self._failed(response.status, raw.decode("utf-8", "replace"), attempt)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt == self.max_retries:
+                    self.stats.errors += 1
+                    raise WebSearchError(f"Tavily unreachable: {e!r}") from e
+                logger.warning("web_search.retry", error=e, attempt=attempt + 1)
+            await asyncio.sleep(settings.WEB_SEARCH_RETRY_BACKOFF * (2 ** attempt) * (1 + random.random()))
+        return []
+
+    def _fetch(self, query: str, deadline: Optional[float] = None) -> List[dict]:
+        if self._sync_session is None:
+            self._sync_session = requests.Session()
+            self._sync_session.headers.update(self.headers)
+
+        for attempt in range(self.max_retries + 1):
+            timeout = settings.WEB_SEARCH_TIMEOUT
+            if deadline is not None:
+                # A blocking request cannot be cancelled, so it must end by the deadline itself
+                timeout = min(timeout, deadline - time.monotonic())
+                if timeout <= 0:
+                    self.stats.errors += 1
+                    raise WebSearchError("Search deadline passed")
+            self.stats.requests += 1
+            try:
+                response = self._sync_session.post(self.url, json=self._payload(query), timeout=timeout)
+                self.stats.response_bytes += len(response.content)
+                if response.status_code == 200:
+                    return self._results(response.json(), query)
+                self._failed(response.status_code, response.text, attempt)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    self.stats.errors += 1
+                    raise WebSearchError(f"Tavily unreachable: {e!r}") from e
+                logger.warning("web_search.retry", error=e, attempt=attempt + 1)
+            backoff = settings.WEB_SEARCH_RETRY_BACKOFF * (2 ** attempt) * (1 + random.random())
+            if deadline is not None and time.monotonic() + backoff >= deadline:
+                # The retry could not start before the deadline; give up now instead of sleeping
+                self.stats.errors += 1
+                raise WebSearchError("Search deadline passed")
+            time.sleep(backoff)
+        return []
+
+    async def asearch(self, query: str) -> List[dict]:
+        key = normalize_query(query)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.stats.coalesced += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            with external_call("tavily", "search", "tavily"):
+                results = await self._afetch(query)
+            self._store(key, results)
+            future.set_result(results)
+            return results
+        except asyncio.CancelledError:
+            # Only this caller was cancelled; the others see a failed search
+            future.set_exception(WebSearchError("Search was cancelled"))
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Nobody may be waiting; do not log it as unretrieved
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def search(self, query: str, deadline: Optional[float] = None) -> List[dict]:
+        """Blocking search. With a `deadline` (time.monotonic()), no request or retry runs past it."""
+        key = normalize_query(query)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+        with external_call("tavily", "search", "tavily"):
+            results = self._fetch(query, deadline)
+        self._store(key, results)
+        return results
+
+    # Same call shape as the LangChain tool the nodes used before
+    async def ainvoke(self, payload) -> List[dict]:
+        return await self.asearch(payload["query"] if isinstance(payload, dict) else payload)
+
+    def invoke(self, payload, deadline: Optional[float] = None) -> List[dict]:
+        return self.search(payload["query"] if isinstance(payload, dict) else payload, deadline)
+
+
+def get_web_search_tool() -> WebSearchClient:
+    """The shared web search client; cheap to call, nothing is built per search."""
+    return web_search_client
+
+
+# Global instance
+web_search_client = WebSearchClient()
@@ -0,0 +1,108 @@
+"""
+Concurrency benchmark for the agent graph against a stubbed LLM.
+
+Runs N concurrent sessions through the graph with ainvoke and reports p50/p99
+latency per session. Compares the native async nodes with the old behaviour
+(sync nodes only, blocking the event loop).
+
+Run from the server/ directory:
+    python -m benchmarks.agent_concurrency --latency 0.05 --sessions 1 50 500
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+# The agent modules read these at import time; no real calls are made.
+os.environ.setdefault("GOOGLE_API_KEY", "fake-key")
+os.environ.setdefault("GEMINI_MODEL", "gemini-fake")
+os.environ.setdefault("TAVILY_API_KEY", "fake-key")
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from app.agent import graph as agent_graph_module
+from app.agent import nodes
+
+
+class SlowFakeChatModel(BaseChatModel):
+    """Chat model that answers after a fixed delay, blocking or not."""
+
+    latency: float = 0.05
+
+    @property
+    def _llm_type(self) -> str:
+        return "slow-fake"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="ok"))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="ok"))])
+
+
+def build_graph(mode: str):
+    """Builds the graph with async nodes, or sync-only nodes for the baseline."""
+    if mode == "async":
+        return agent_graph_module.create_agent_graph()
+
+    original = agent_graph_module._node
+    agent_graph_module._node = lambda func, afunc: func
+    try:
+        return agent_graph_module.create_agent_graph()
+    finally:
+        agent_graph_module._node = original
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_sessions(graph, sessions: int):
+    async def one_session(i: int) -> float:
+        state = {
+            "messages": [HumanMessage(content=f"hello from session {i}")],
+            "use_rag": False,
+            "session_id": f"bench-{i}",
+        }
+        start = time.perf_counter()
+        await graph.ainvoke(state)
+        return time.perf_counter() - start
+
+    wall_start = time.perf_counter()
+    latencies = await asyncio.gather(*(one_session(i) for i in range(sessions)))
+    wall = time.perf_counter() - wall_start
+    return latencies, wall
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake LLM latency in seconds")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 50, 500])
+    parser.add_argument("--modes", nargs="+", default=["async", "blocking"], choices=["async", "blocking"])
+    args = parser.parse_args()
+
+    fake_llm = SlowFakeChatModel(latency=args.latency)
+    nodes.llm = nodes.llm_rag = nodes.llm_web = fake_llm
+
+    print(f"{'mode':<10}{'sessions':>10}{'p50 (ms)':>12}{'p99 (ms)':>12}{'wall (s)':>10}")
+    for mode in args.modes:
+        graph = build_graph(mode)
+        for sessions in args.sessions:
+            latencies, wall = await run_sessions(graph, sessions)
+            print(
+                f"{mode:<10}{sessions:>10}"
+                f"{statistics.median(latencies) * 1000:>12.1f}"
+                f"{percentile(latencies, 99) * 1000:>12.1f}"
+                f"{wall:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
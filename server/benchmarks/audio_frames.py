@@ -0,0 +1,71 @@
+"""
+Benchmark of the websocket audio wire formats: base64-in-JSON (the old
+format, still used for old clients) against binary frames with the small
+audio_protocol header.
+
+Encodes and decodes synthetic PCM in worklet-sized chunks, both for the
+upstream direction (16 kHz microphone audio) and the downstream one (24 kHz
+Gemini Live audio). Reports bytes on the wire and CPU time per second of
+audio.
+
+Run from the server/ directory:
+    python -m benchmarks.audio_frames --seconds 600
+"""
+import argparse
+import base64
+import json
+import os
+import time
+
+os.environ.setdefault("GOOGLE_API_KEY", "fake-key")
+
+from app.services.audio_protocol import FRAME_PCM16, decode_frame, encode_frame
+from benchmarks.synthetic_pcm import chunks, conversation
+
+
+def legacy_round_trip(chunk: bytes) -> int:
+    message = json.dumps({"type": "audio_chunk", "audio_chunk": base64.b64encode(chunk).decode("utf-8")})
+    base64.b64decode(json.loads(message)["audio_chunk"])
+    return len(message.encode("utf-8"))
+
+
+def binary_round_trip(chunk: bytes, sequence: int) -> int:
+    frame = encode_frame(FRAME_PCM16, sequence, chunk)
+    decode_frame(frame)
+    return len(frame)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=int, default=600)
+    parser.add_argument("--chunk-samples", type=int, default=4096)
+    args = parser.parse_args()
+
+    # ~30 turns give about 2 minutes of audio; repeat to reach --seconds
+    pcm, _ = conversation(30)
+    print(f"{'direction':<12}{'format':<13}{'bytes/s audio':>15}{'overhead':>10}{'CPU us/s audio':>16}")
+    for direction, sample_rate in (("upstream", 16000), ("downstream", 24000)):
+        audio_seconds = args.seconds
+        pieces = list(chunks(pcm, args.chunk_samples))
+        repeats = max(1, int(audio_seconds * sample_rate / len(pcm)))
+        raw_bytes = sum(len(piece) for piece in pieces) * repeats
+        audio_seconds = raw_bytes / 2 / sample_rate
+
+        for name in ("json-base64", "binary-v1"):
+            wire_bytes = 0
+            start = time.process_time()
+            for _ in range(repeats):
+                for sequence, piece in enumerate(pieces):
+                    if name == "json-base64":
+                        wire_bytes += legacy_round_trip(piece)
+                    else:
+                        wire_bytes += binary_round_trip(piece, sequence)
+            cpu = time.process_time() - start
+            print(
+                f"{direction:<12}{name:<13}{wire_bytes / audio_seconds:>15.0f}"
+                f"{(wire_bytes / raw_bytes - 1) * 100:>9.1f}%{cpu / audio_seconds * 1e6:>16.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Benchmark of the context packer on a fixture corpus.
+
+The store handbook in benchmarks/data/store_handbook.md is split with the
+app's own text splitter (1000 characters, 200 overlap) the way an uploaded
+PDF is: pypdf-style text with wrapped lines, one Document per page. For
+each question, retrieval is emulated with the BM25 index (fetch
+RAG_FETCH_K, collapse near-duplicates, keep k) and the context is built
+two ways:
+
+- raw: the chunks' page_content joined, as retrieve_from_rag did
+- packed: overlapping chunks merged, MMR selection within the route's
+  token budget, numbered citations
+
+The voice prompts are compared the same way: the session's first
+SESSION_CONTEXT_CHUNKS chunks pasted in full, against the packed context.
+
+Reports prompt tokens of the context block, the Gemini input cost per
+1,000 requests, whether the answer text survived packing, and the time
+spent packing.
+
+Run from the server/ directory:
+    python -m benchmarks.context_packing
+"""
+import argparse
+import os
+import re
+import textwrap
+import time
+
+os.environ.setdefault("GOOGLE_API_KEY", "fake-key")
+
+from langchain_core.documents import Document
+
+from app.core.config import settings
+from app.core.session import estimate_tokens
+from app.services.bm25_index import BM25Index
+from app.services.context_packer import context_packer
+from app.services.document_parser import _get_text_splitter
+from app.services.session_context import SessionContext
+from app.services.vector_store import collapse_near_duplicates
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "data", "store_handbook.md")
+
+# Question, text the answer needs
+QUESTIONS = [
+    ("How many days do I have to return an item?", "15 days"),
+    ("When will the refund for a prepaid order reach me?", "5 to 7 working days"),
+    ("What is the shipping fee on small orders?", "Rs 79"),
+    ("Which cities get express delivery?", "Pune"),
+    ("How long does international shipping take?", "5 to 9 working days"),
+    ("What kurta size fits a 36 inch bust?", "36 inch bust"),
+    ("How long is a saree?", "5.5 metres"),
+    ("How should I wash cotton kurtas?", "machine washed cold"),
+    ("How do I store a silk saree?", "muslin"),
+    ("How much is a Kesari Club point worth?", "25 paise"),
+    ("When do loyalty points expire?", "12 months"),
+    ("Can I pay in EMI?", "No-cost EMI"),
+    ("What does the WELCOME10 coupon give?", "10 percent off"),
+    ("How long do bridal lehengas take to dispatch?", "21 days"),
+    ("What are the support hours on WhatsApp?", "9 am to 9 pm"),
+    ("Can I cancel a lehenga order?", "within 24 hours"),
+    ("What discount do bulk orders get?", "12 percent"),
+    ("How long are gift cards valid?", "valid for 12 months"),
+]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def load_chunks(page_chars: int = 3000):
+    """Chunks of the handbook as if it were a PDF: wrapped lines, ~page_chars per page."""
+    with open(CORPUS_PATH, encoding="utf-8") as f:
+        paragraphs = [p for p in f.read().split("\n\n") if p.strip()]
+    lines = [line for paragraph in paragraphs for line in textwrap.wrap(paragraph, 90)]
+    pages, current = [], []
+    for line in lines:
+        current.append(line)
+        if sum(len(l) + 1 for l in current) >= page_chars:
+            pages.append("\n".join(current))
+            current = []
+    if current:
+        pages.append("\n".join(current))
+    documents = [Document(page_content=text, metadata={"source": CORPUS_PATH, "page": page})
+                 for page, text in enumerate(pages)]
+    return _get_text_splitter().split_documents(documents)
+
+
+def contains(text: str, answer: str) -> bool:
+    return re.sub(r"\s+", " ", answer) in re.sub(r"\s+", " ", text)
+
+
+def compare(name, cases, cost_per_m):
+    raw_tokens = [estimate_tokens(raw) for raw, _, _, _ in cases]
+    packed_tokens = [packed.tokens for _, packed, _, _ in cases]
+    raw_hits = sum(contains(raw, answer) for raw, _, answer, _ in cases)
+    packed_hits = sum(contains(packed.text, answer) for _, packed, answer, _ in cases if answer)
+    pack_us = [seconds * 1e6 for _, _, _, seconds in cases]
+    with_answers = sum(1 for _, _, answer, _ in cases if answer)
+    for label, tokens, hits in (("raw", raw_tokens, raw_hits), ("packed", packed_tokens, packed_hits)):
+        mean = sum(tokens) / len(tokens)
+        answers = f"{hits}/{with_answers}" if with_answers else "-"
+        print(f"{name + ', ' + label:<24}{mean:>10.0f}{max(tokens):>10}{mean * cost_per_m / 1000:>14.4f}{answers:>10}"
+              + (f"{percentile(pack_us, 50):>12.0f}" if label == "packed" else f"{'':>12}"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--k", type=int, default=settings.RAG_TOP_K, help="Chunks retrieved per question")
+    args = parser.parse_args()
+
+    chunks = load_chunks()
+    index = BM25Index()
+    index.add([str(i) for i in range(len(chunks))], chunks)
+    print(f"{len(chunks)} chunks from {os.path.basename(CORPUS_PATH)}; k={args.k}, "
+          f"budgets {settings.CONTEXT_TOKEN_BUDGETS}\n")
+    print(f"{'context':<24}{'tokens':>10}{'max':>10}{'$ per 1k req':>14}{'answers':>10}{'pack (us)':>12}")
+
+    rag_cases = []
+    for question, answer in QUESTIONS:
+        hits = [doc for _, doc, _ in index.search(question, settings.RAG_FETCH_K)]
+        docs = collapse_near_duplicates(hits, k=args.k)
+        raw = "\n\n".join(doc.page_content for doc in docs)
+        start = time.perf_counter()
+        packed = context_packer.pack(question, docs, route="rag")
+        rag_cases.append((raw, packed, answer, time.perf_counter() - start))
+    compare("RAG", rag_cases, settings.GEMINI_INPUT_COST_PER_M)
+
+    # Voice: the whole-session bundle, the same for every question
+    bundle = collapse_near_duplicates(chunks, k=settings.SESSION_CONTEXT_CHUNKS)
+    session = SessionContext(chunks=bundle, summary="The session has 1 uploaded document(s).", built_at=time.time())
+    raw = f"{session.summary}\n\n---\n\n" + "\n\n---\n\n".join(doc.page_content for doc in bundle)
+    start = time.perf_counter()
+    packed_text = session.as_prompt_text()
+    elapsed = time.perf_counter() - start
+    packed = type(rag_cases[0][1])(text=packed_text, tokens=estimate_tokens(packed_text), citations=[], tokens_in=0)
+    compare("voice", [(raw, packed, "", elapsed)], settings.GEMINI_INPUT_COST_PER_M)
+
+    stats = context_packer.stats.as_dict()
+    print(f"\npacker: {stats['chunks_in']} chunks in, {stats['passages_out']} passages out, "
+          f"{stats['tokens_saved_ratio']:.0%} of context tokens saved")
+
+
+if __name__ == "__main__":
+    main()
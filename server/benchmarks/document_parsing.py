@@ -0,0 +1,88 @@
+"""
+Benchmark of document parsing: the old load-everything path against iter_chunks.
+
+Generates synthetic 10/100/1,000-page PDFs with PyMuPDF, then parses each
+one in a fresh subprocess so peak RSS (parent + largest pool worker) is measured
+in isolation. Reports chunks/sec and peak RSS for both implementations.
+
+Run from the server/ directory:
+    python -m benchmarks.document_parsing --pages 10 100 1000
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("GOOGLE_API_KEY", "fake-key")
+
+LINE = "Product {page}-{line}: cotton kurta with hand block print, sizes S-XXL, machine washable, ships in 2 days."
+
+
+def make_pdf(path: str, pages: int) -> None:
+    import fitz  # PyMuPDF
+
+    doc = fitz.open()
+    for page in range(pages):
+        pdf_page = doc.new_page()
+        text = "\n".join(LINE.format(page=page, line=line) for line in range(40))
+        pdf_page.insert_textbox(pdf_page.rect + (36, 36, -36, -36), text, fontsize=8)
+    doc.save(path)
+    doc.close()
+
+
+def measure(impl: str, path: str) -> dict:
+    """Parses the file with the given implementation and reports stats as JSON."""
+    start = time.perf_counter()
+    if impl == "legacy":
+        from langchain_community.document_loaders import PyPDFLoader
+        from app.services.document_parser import _get_text_splitter
+
+        chunks = len(_get_text_splitter().split_documents(PyPDFLoader(path).load()))
+    else:
+        from app.services.document_parser import iter_chunks
+
+        chunks = sum(1 for _ in iter_chunks(path, ".pdf"))
+    elapsed = time.perf_counter() - start
+
+    self_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return {
+        "chunks": chunks,
+        "seconds": elapsed,
+        "peak_rss_mb": (self_rss + children_rss) / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--measure", nargs=2, metavar=("IMPL", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(*args.measure)))
+        return
+
+    print(f"{'pages':>7}{'impl':>13}{'chunks':>9}{'chunks/s':>11}{'peak RSS (MB)':>16}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in args.pages:
+            path = os.path.join(tmp, f"synthetic_{pages}.pdf")
+            make_pdf(path, pages)
+            for impl in ("legacy", "iter_chunks"):
+                output = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.document_parsing", "--measure", impl, path],
+                    check=True, capture_output=True, text=True,
+                ).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                print(
+                    f"{pages:>7}{impl:>13}{result['chunks']:>9}"
+                    f"{result['chunks'] / result['seconds']:>11.0f}{result['peak_rss_mb']:>16.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark of the embedding cache and batched ingestion.
+
+Uses a deterministic fake embedding model with a fixed per-request latency,
+then ingests a synthetic corpus with duplicate chunks three times: cold
+(empty cache), warm (in-memory LRU) and from disk only (fresh process view
+of the same SQLite file). Reports chunks/sec, API batches and hit rate.
+
+Run from the server/ directory:
+    python -m benchmarks.embedding_cache --chunks 5000 --duplicate-ratio 0.3
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+os.environ.setdefault("GOOGLE_API_KEY", "fake-key")
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from app.services.embedding_cache import CachedEmbeddings
+
+
+class SlowFakeEmbedding(DeterministicFakeEmbedding):
+    """Deterministic vectors, but each API call costs a fixed latency."""
+
+    latency: float = 0.05
+
+    async def aembed_documents(self, texts):
+        await asyncio.sleep(self.latency)
+        return self.embed_documents(texts)
+
+    async def aembed_query(self, text):
+        await asyncio.sleep(self.latency)
+        return self.embed_query(text)
+
+
+def build_corpus(chunks: int, duplicate_ratio: float):
+    unique = [f"SKU-{i:06d} cotton kurta, size {i % 5 + 36}, colour #{i % 17}" for i in range(chunks)]
+    rng = random.Random(0)
+    for i in range(int(chunks * duplicate_ratio)):
+        unique[i] = unique[rng.randrange(chunks)]
+    return unique
+
+
+async def run(embeddings: CachedEmbeddings, corpus):
+    start = time.perf_counter()
+    await embeddings.aembed_documents(corpus)
+    return time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=5000)
+    parser.add_argument("--duplicate-ratio", type=float, default=0.3)
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake latency per API call")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.chunks, args.duplicate_ratio)
+    fake = SlowFakeEmbedding(size=768, latency=args.latency)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache_path = os.path.join(cache_dir, "embeddings.sqlite3")
+
+        def make():
+            return CachedEmbeddings(
+                fake, namespace="fake", cache_path=cache_path,
+                batch_size=args.batch_size, max_concurrency=args.concurrency,
+            )
+
+        print(f"{'pass':<10}{'seconds':>10}{'chunks/s':>12}{'batches':>10}{'hit rate':>10}")
+        warm = make()
+        for name, embeddings in (("cold", warm), ("memory", warm), ("disk", make())):
+            before = embeddings.stats.embedded_batches
+            elapsed = await run(embeddings, corpus)
+            stats = embeddings.stats.as_dict()
+            print(
+                f"{name:<10}{elapsed:>10.3f}{len(corpus) / elapsed:>12.0f}"
+                f"{stats['embedded_batches'] - before:>10}{stats['hit_rate']:>10.2f}"
+            )
+            embeddings.stats.__init__()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
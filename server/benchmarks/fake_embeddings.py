@@ -0,0 +1,55 @@
+"""
+Deterministic stand-in for the Gemini embedding model, used by the benchmarks.
+
+Texts are embedded as hashed bags of words, normalised to unit length, so
+texts that share words are close and vector search still returns sensible
+chunks. Each call waits `latency` seconds (plus `per_text` per text) like a
+remote API would.
+"""
+import asyncio
+import hashlib
+import time
+from typing import List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from app.services.bm25_index import tokenize
+
+
+class HashingEmbeddings(Embeddings):
+    def __init__(self, dimensions: int = 256, latency: float = 0.0, per_text: float = 0.0):
+        self.dimensions = dimensions
+        self.latency = latency
+        self.per_text = per_text
+        self.calls = 0
+        self.texts = 0
+
+    def _vector(self, text: str) -> List[float]:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for term in tokenize(text):
+            digest = hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest()
+            vector[int.from_bytes(digest[:4], "little") % self.dimensions] += 1.0 if digest[4] & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def _delay(self, count: int) -> float:
+        self.calls += 1
+        self.texts += count
+        return self.latency + self.per_text * count
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        time.sleep(self._delay(len(texts)))
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        time.sleep(self._delay(1))
+        return self._vector(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        await asyncio.sleep(self._delay(len(texts)))
+        return [self._vector(text) for text in texts]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        await asyncio.sleep(self._delay(1))
+        return self._vector(text)
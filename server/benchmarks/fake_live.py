@@ -0,0 +1,87 @@
+"""
+In-process stand-in for the Gemini Live API, used by the benchmarks.
+
+Mimics the parts of `genai.Client().aio.live` that the live chat endpoint
+uses. Each session counts the microphone audio it is sent; once a turn's
+worth has arrived it answers after `first_audio_latency` with
+`reply_chunks` chunks of 24 kHz PCM, then marks the turn complete. Like the
+real SDK, `receive()` ends at each turn boundary.
+
+Install it with `live_chat.client = FakeLiveClient()` in the server process.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+MODEL_CHUNK = b"\x02\x00" * 2400     # 100 ms of 24 kHz PCM
+TURN_BYTES = 32000                   # 1 s of 16 kHz microphone PCM
+
+
+def _response(data: bytes = None, turn_complete: bool = False):
+    parts = [SimpleNamespace(inline_data=SimpleNamespace(data=data))] if data else []
+    return SimpleNamespace(
+        session_resumption_update=None,
+        server_content=SimpleNamespace(
+            model_turn=SimpleNamespace(parts=parts) if parts else None,
+            turn_complete=turn_complete,
+        ),
+    )
+
+
+class FakeLiveSession:
+    def __init__(self, first_audio_latency: float, reply_chunks: int, chunk_interval: float):
+        self.first_audio_latency = first_audio_latency
+        self.reply_chunks = reply_chunks
+        self.chunk_interval = chunk_interval
+        self.pending_bytes = 0
+        self._responses: asyncio.Queue = asyncio.Queue()
+        self._replies = set()
+
+    async def send_realtime_input(self, audio=None, **kwargs):
+        self.pending_bytes += len(audio.data)
+        if self.pending_bytes >= TURN_BYTES:
+            self.pending_bytes = 0
+            task = asyncio.create_task(self._reply())
+            self._replies.add(task)
+            task.add_done_callback(self._replies.discard)
+
+    async def _reply(self):
+        await asyncio.sleep(self.first_audio_latency)
+        for i in range(self.reply_chunks):
+            if i:
+                await asyncio.sleep(self.chunk_interval)
+            await self._responses.put(_response(MODEL_CHUNK))
+        await self._responses.put(_response(turn_complete=True))
+
+    async def receive(self):
+        while True:
+            response = await self._responses.get()
+            yield response
+            if response.server_content.turn_complete:
+                return
+
+    def close(self):
+        for task in self._replies:
+            task.cancel()
+
+
+class FakeLiveClient:
+    def __init__(self, connect_latency: float = 0.05, first_audio_latency: float = 0.4,
+                 reply_chunks: int = 20, chunk_interval: float = 0.02):
+        self.connect_latency = connect_latency
+        self.first_audio_latency = first_audio_latency
+        self.reply_chunks = reply_chunks
+        self.chunk_interval = chunk_interval
+        self.sessions = 0
+        # Same attribute path as genai.Client: client.aio.live.connect(...)
+        self.aio = SimpleNamespace(live=SimpleNamespace(connect=self.connect))
+
+    @asynccontextmanager
+    async def connect(self, model: str, config=None):
+        await asyncio.sleep(self.connect_latency)
+        self.sessions += 1
+        session = FakeLiveSession(self.first_audio_latency, self.reply_chunks, self.chunk_interval)
+        try:
+            yield session
+        finally:
+            session.close()
@@ -0,0 +1,90 @@
+"""
+Scripted stand-in for an LLM provider, used by the benchmarks.
+
+Each call draws its latency (time to the first token) and outcome from a
+script, so tail latency, error bursts and outages can be replayed
+deterministically. Responses are streamed word by word like a real model.
+"""
+import asyncio
+import random
+import time
+from typing import Any, AsyncIterator, Callable, Tuple
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+class ProviderError(Exception):
+    """Simulated 5xx / rate limit from a fake provider."""
+
+
+def tail_latency(median: float, tail: float, tail_share: float, error_rate: float = 0.0, seed: int = 0):
+    """Script: mostly ~median latency, with `tail_share` of calls taking ~tail."""
+    rng = random.Random(seed)
+
+    def script(call: int) -> Tuple[float, bool]:
+        latency = tail if rng.random() < tail_share else median
+        return latency * rng.uniform(0.8, 1.2), rng.random() < error_rate
+    return script
+
+
+def outage(script: Callable[[int], Tuple[float, bool]], start: float, end: float, latency: float = 0.05):
+    """
+    Wraps a script so that calls between `start` and `end` seconds after
+    the first call fail fast, like a provider outage.
+    """
+    first_call_at = []
+
+    def wrapped(call: int) -> Tuple[float, bool]:
+        now = time.monotonic()
+        if not first_call_at:
+            first_call_at.append(now)
+        if start <= now - first_call_at[0] < end:
+            return latency, True
+        return script(call)
+    return wrapped
+
+
+class ScriptedChatModel(BaseChatModel):
+    name: str = "fake"
+    script: Any = None                # call index -> (latency seconds, fail?)
+    reply: str = "This is a scripted answer from the fake provider."
+    token_interval: float = 0.005     # Delay between streamed words
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-fake"
+
+    def _next(self) -> Tuple[float, bool]:
+        call = self.calls
+        self.calls += 1
+        return self.script(call) if self.script else (0.0, False)
+
+    def _message(self) -> AIMessage:
+        return AIMessage(content=f"[{self.name}] {self.reply}")
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        latency, fail = self._next()
+        time.sleep(latency)
+        if fail:
+            raise ProviderError(f"{self.name} unavailable")
+        return ChatResult(generations=[ChatGeneration(message=self._message())])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        latency, fail = self._next()
+        await asyncio.sleep(latency)
+        if fail:
+            raise ProviderError(f"{self.name} unavailable")
+        return ChatResult(generations=[ChatGeneration(message=self._message())])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        latency, fail = self._next()
+        await asyncio.sleep(latency)
+        if fail:
+            raise ProviderError(f"{self.name} unavailable")
+        for i, word in enumerate(self._message().content.split(" ")):
+            if i:
+                await asyncio.sleep(self.token_interval)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word if i == 0 else " " + word))
@@ -0,0 +1,82 @@
+"""
+Local stand-in for the Sarvam HTTP API, used by the benchmarks.
+
+Serves /text-to-speech, /speech-to-text and /translate with canned payloads
+and a configurable per-endpoint latency. Point the app at it with
+SARVAM_BASE_URL=http://127.0.0.1:<port>.
+"""
+import asyncio
+import base64
+import json
+from typing import Dict, Optional
+
+from aiohttp import web
+
+# ~0.25 s of 16-bit silence at 22.05 kHz
+FAKE_AUDIO = base64.b64encode(b"\x00\x00" * 5512).decode("utf-8")
+
+
+class FakeSarvam:
+    def __init__(self, latency: Optional[Dict[str, float]] = None):
+        self.latency = {"tts": 0.0, "stt": 0.0, "translate": 0.0, **(latency or {})}
+        self.calls = {"tts": 0, "stt": 0, "translate": 0}
+        self._peers = set()
+        self._runner: Optional[web.AppRunner] = None
+
+    async def _tts(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        self.calls["tts"] += 1
+        await asyncio.sleep(self.latency["tts"])
+        return web.json_response({"audios": [FAKE_AUDIO for _ in payload.get("inputs", [""])]})
+
+    async def _stt(self, request: web.Request) -> web.Response:
+        await request.json()
+        self.calls["stt"] += 1
+        await asyncio.sleep(self.latency["stt"])
+        return web.json_response({"transcript": "mujhe neeli kurta dikhaiye"})
+
+    async def _translate(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        self.calls["translate"] += 1
+        await asyncio.sleep(self.latency["translate"])
+        # Line by line, like the real API does for newline-separated input
+        lines = payload["input"].split("\n")
+        return web.json_response({
+            "translated_text": "\n".join(f"[{payload['target_language_code']}] {line}" for line in lines)
+        })
+
+    @property
+    def connections(self) -> int:
+        """Distinct client connections seen (one per TCP handshake)."""
+        return len(self._peers)
+
+    @web.middleware
+    async def _track_connections(self, request: web.Request, handler):
+        self._peers.add(request.transport.get_extra_info("peername"))
+        return await handler(request)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Starts the server and returns its base URL."""
+        app = web.Application(middlewares=[self._track_connections])
+        app.router.add_post("/text-to-speech", self._tts)
+        app.router.add_post("/speech-to-text", self._stt)
+        app.router.add_post("/translate", self._translate)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = site._server.sockets[0].getsockname()[1]
+        return f"http://{host}:{bound_port}"
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+
+if __name__ == "__main__":
+    async def serve():
+        fake = FakeSarvam()
+        print(f"Fake Sarvam listening on {await fake.start(port=8765)}")
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
@@ -0,0 +1,98 @@
+"""
+Local stand-in for the Tavily search API, used by the benchmarks.
+
+Serves /search with results built from the query. Like the real API,
+asking for a generated answer or raw page content makes a search slower
+and its response bigger. Point the app at it with
+TAVILY_BASE_URL=http://127.0.0.1:<port>.
+"""
+import asyncio
+import random
+from typing import Optional
+
+from aiohttp import web
+
+FILLER = [
+    "Subscribe to our newsletter for the best deals of the season.",
+    "This article was updated by our editorial team.",
+    "Cookies help us deliver our services and improve your experience.",
+    "Read more stories from our fashion desk below.",
+    "Shipping times may vary depending on your location.",
+    "Follow us on social media for daily style inspiration.",
+]
+
+
+class FakeTavily:
+    def __init__(
+        self,
+        latency: float = 0.4,
+        answer_latency: float = 0.6,     # Extra time to generate include_answer
+        raw_latency: float = 0.3,        # Extra time to extract include_raw_content
+        page_sentences: int = 400,       # Raw content length per result
+    ):
+        self.latency = latency
+        self.answer_latency = answer_latency
+        self.raw_latency = raw_latency
+        self.page_sentences = page_sentences
+        self.calls = 0
+        self._runner: Optional[web.AppRunner] = None
+
+    def _page(self, query: str, rng: random.Random) -> str:
+        # Mostly boilerplate, with a few sentences that are about the query
+        sentences = [rng.choice(FILLER) for _ in range(self.page_sentences)]
+        for i in range(5):
+            sentences[rng.randrange(len(sentences))] = f"Fact {i}: {query.rstrip('?')} has changed this week, by {rng.randint(2, 30)}%."
+        return " ".join(sentences)
+
+    async def _search(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        self.calls += 1
+        query = payload["query"]
+        rng = random.Random(query)
+
+        delay = self.latency
+        delay += self.answer_latency if payload.get("include_answer") else 0.0
+        delay += self.raw_latency if payload.get("include_raw_content") else 0.0
+        await asyncio.sleep(delay)
+
+        results = []
+        for i in range(payload.get("max_results", 5)):
+            result = {
+                "title": f"Result {i} for {query}",
+                "url": f"https://example.com/{abs(hash(query)) % 10000}/{i}",
+                "content": f"{query}: summary of result {i}. " + " ".join(rng.choice(FILLER) for _ in range(6)),
+                "score": 1.0 - i * 0.1,
+            }
+            if payload.get("include_raw_content"):
+                result["raw_content"] = self._page(query, rng)
+            results.append(result)
+        body = {"query": query, "results": results, "response_time": delay}
+        if payload.get("include_answer"):
+            body["answer"] = f"Generated answer about {query}."
+        if payload.get("include_images"):
+            body["images"] = [f"https://images.example.com/{i}.jpg" for i in range(5)]
+        return web.json_response(body)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Starts the server and returns its base URL."""
+        app = web.Application()
+        app.router.add_post("/search", self._search)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = site._server.sockets[0].getsockname()[1]
+        return f"http://{host}:{bound_port}"
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+
+if __name__ == "__main__":
+    async def serve():
+        fake = FakeTavily()
+        print(f"Fake Tavily listening on {await fake.start(port=8766)}")
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
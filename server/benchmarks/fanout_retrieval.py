@@ -0,0 +1,162 @@
+"""
+Benchmark of the parallel document + web retrieval path and of
+speculative document retrieval, against fake retrieval, web search and
+LLM backends with jittered latency.
+
+- sequential: document retrieval, then web search, then generation (what
+  combining both sources cost before the fan-out node)
+- fan-out: the rag_and_web graph path, both legs concurrently under the
+  shared deadline (FANOUT_DEADLINE_SECONDS)
+- speculative: a RAG request whose retrieval starts before the pre-graph
+  work (history load, response-cache lookup), compared with starting it
+  when the RAG node runs
+
+The web leg has a slow tail so that the deadline can be seen capping it.
+
+Run from the server/ directory:
+    python -m benchmarks.fanout_retrieval --requests 200 --concurrency 20
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+
+os.environ.setdefault("GOOGLE_API_KEY", "fake-key")
+os.environ.setdefault("TAVILY_API_KEY", "fake-key")
+
+from langchain_core.documents import Document
+from langchain_core.messages import HumanMessage
+
+from app.agent import graph as agent_graph_module
+from app.agent import nodes
+from app.core.config import settings
+from app.services.session_context import session_context
+from benchmarks.fake_llm import ScriptedChatModel
+
+WEB_QUESTION = "What is the latest news today about cotton kurta prices?"
+RAG_QUESTION = "What does the return policy in my uploaded document say?"
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class FakeWebSearch:
+    """Tavily stand-in: ~median latency, with `tail_share` of calls taking `tail` seconds."""
+
+    def __init__(self, median: float, tail: float, tail_share: float, seed: int = 0):
+        self.median, self.tail, self.tail_share = median, tail, tail_share
+        self.rng = random.Random(seed)
+
+    def _latency(self) -> float:
+        base = self.tail if self.rng.random() < self.tail_share else self.median
+        return base * self.rng.uniform(0.8, 1.2)
+
+    def _results(self, query: str):
+        return [
+            {"url": f"https://example.com/{i}", "content": f"Web result {i} for {query}: prices rose {i + 2}% this week."}
+            for i in range(5)
+        ]
+
+    async def ainvoke(self, payload):
+        await asyncio.sleep(self._latency())
+        return self._results(payload["query"])
+
+    def invoke(self, payload, deadline=None):
+        time.sleep(self._latency())
+        return self._results(payload["query"])
+
+
+def install_fakes(rag_latency: float, web: FakeWebSearch, generate_latency: float) -> None:
+    rng = random.Random(1)
+
+    async def fake_retrieval(session_id: str, query: str):
+        await asyncio.sleep(rag_latency * rng.uniform(0.8, 1.2))
+        return [
+            Document(page_content=f"Chunk {i} of the catalogue: returns accepted within {10 + i} days.",
+                     metadata={"source": "uploads/policy.pdf"})
+            for i in range(settings.RAG_TOP_K)
+        ]
+
+    session_context._aretrieve = fake_retrieval
+    nodes.web_search.get_web_search_tool = lambda: web
+    model = ScriptedChatModel(name="fake", script=lambda call: (generate_latency, False))
+    nodes.llm_rag = nodes.llm_web = model
+
+
+async def run_concurrently(one_request, requests: int, concurrency: int):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def timed(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            await one_request(i)
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(timed(i) for i in range(requests)))
+    return latencies
+
+
+def report(name: str, latencies) -> None:
+    print(f"{name:<28}{percentile(latencies, 50) * 1000:>10.0f}{percentile(latencies, 95) * 1000:>10.0f}"
+          f"{percentile(latencies, 99) * 1000:>10.0f}{max(latencies) * 1000:>10.0f}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--rag-latency", type=float, default=0.25, help="Document retrieval seconds")
+    parser.add_argument("--web-latency", type=float, default=0.8, help="Median web search seconds")
+    parser.add_argument("--web-tail", type=float, default=6.0, help="Slow-tail web search seconds")
+    parser.add_argument("--web-tail-share", type=float, default=0.05)
+    parser.add_argument("--generate-latency", type=float, default=0.3)
+    parser.add_argument("--pre-graph", type=float, default=0.15, help="History load + cache lookup seconds")
+    args = parser.parse_args()
+
+    web = FakeWebSearch(args.web_latency, args.web_tail, args.web_tail_share)
+    install_fakes(args.rag_latency, web, args.generate_latency)
+    graph = agent_graph_module.create_agent_graph()
+
+    def state(question: str, i: int) -> dict:
+        return {"messages": [HumanMessage(content=question)], "use_rag": True, "session_id": f"bench-{i}"}
+
+    route = nodes.check_for_rag(state(WEB_QUESTION, 0))
+    assert route == "rag_and_web", f"web question routed to {route}"
+
+    async def sequential(i: int):
+        s = state(WEB_QUESTION, i)
+        rag = await nodes.aretrieve_from_rag(s)
+        web_context = await nodes.arun_web_search(s)
+        await nodes.llm_web.ainvoke(f"{rag['context']}\n\n{web_context['context']}\n\n{WEB_QUESTION}")
+
+    async def fan_out(i: int):
+        await graph.ainvoke(state(WEB_QUESTION, i))
+
+    async def rag_on_demand(i: int):
+        await asyncio.sleep(args.pre_graph)
+        await graph.ainvoke(state(RAG_QUESTION, i))
+
+    async def rag_speculative(i: int):
+        session_context.prefetch(f"bench-{i}", RAG_QUESTION)
+        await asyncio.sleep(args.pre_graph)
+        await graph.ainvoke(state(RAG_QUESTION, i))
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}; retrieval {args.rag_latency * 1000:.0f} ms, "
+          f"web {args.web_latency * 1000:.0f} ms ({args.web_tail_share:.0%} at {args.web_tail * 1000:.0f} ms), "
+          f"generation {args.generate_latency * 1000:.0f} ms, deadline {settings.FANOUT_DEADLINE_SECONDS * 1000:.0f} ms\n")
+    print(f"{'path':<28}{'p50 (ms)':>10}{'p95 (ms)':>10}{'p99 (ms)':>10}{'max (ms)':>10}")
+    report("documents + web, sequential", await run_concurrently(sequential, args.requests, args.concurrency))
+    report("documents + web, fan-out", await run_concurrently(fan_out, args.requests, args.concurrency))
+    report("RAG, retrieve on demand", await run_concurrently(rag_on_demand, args.requests, args.concurrency))
+    report("RAG, speculative", await run_concurrently(rag_speculative, args.requests, args.concurrency))
+
+    stats = session_context.prefetch_stats.as_dict()
+    print(f"\nspeculative retrievals: {stats['started']} started, {stats['hits']} used, {stats['wasted']} wasted")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
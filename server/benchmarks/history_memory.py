@@ -0,0 +1,76 @@
+"""
+Benchmark of conversation memory load/save cost as conversations grow.
+
+Replays 10, 100 and 1,000 turns against fakeredis with an instant fake
+summariser, then measures the cost of loading the prompt window and saving a
+turn, plus the stored list length and prompt size. With rolling
+summarisation all of these should stay flat as the turn count grows.
+
+Run from the server/ directory (needs `pip install fakeredis`):
+    python -m benchmarks.history_memory --turns 10 100 1000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ.setdefault("GOOGLE_API_KEY", "fake-key")
+
+from fakeredis import aioredis as fake_aioredis
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.core.session import HISTORY_KEY_PREFIX, ConversationMemory, estimate_tokens
+
+
+class InstantSummarizer:
+    """Stands in for Gemini: returns a fixed-size summary immediately."""
+
+    async def ainvoke(self, messages):
+        return AIMessage(content="The shopper is comparing running shoes under 5000 INR. " * 4)
+
+
+async def replay(turns: int, samples: int):
+    client = fake_aioredis.FakeRedis()
+    memory = ConversationMemory(redis_client=client, summarizer=InstantSummarizer())
+    session_id = f"bench-{turns}"
+
+    for turn in range(turns):
+        length = await memory.save_turn(
+            session_id,
+            HumanMessage(content=f"Question {turn}: do you have size 9 in the blue model?"),
+            AIMessage(content=f"Answer {turn}: yes, the blue model is available in size 9 and ships in 2 days."),
+        )
+        await memory.summarize_if_needed(session_id, length)
+
+    load_times, save_times = [], []
+    for _ in range(samples):
+        start = time.perf_counter()
+        messages = await memory.build_messages(session_id, "and in red?")
+        load_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        length = await memory.save_turn(session_id, HumanMessage(content="and in red?"), AIMessage(content="Yes."))
+        save_times.append(time.perf_counter() - start)
+        await memory.summarize_if_needed(session_id, length)
+
+    stored = await client.llen(HISTORY_KEY_PREFIX + session_id)
+    prompt_tokens = sum(estimate_tokens(str(message.content)) for message in messages)
+    await client.aclose()
+    return statistics.median(load_times), statistics.median(save_times), stored, prompt_tokens
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--samples", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'turns':>8}{'load (ms)':>12}{'save (ms)':>12}{'stored msgs':>14}{'prompt tokens':>16}")
+    for turns in args.turns:
+        load, save, stored, prompt_tokens = await replay(turns, args.samples)
+        print(f"{turns:>8}{load * 1000:>12.3f}{save * 1000:>12.3f}{stored:>14}{prompt_tokens:>16}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
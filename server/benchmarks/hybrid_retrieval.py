@@ -0,0 +1,114 @@
+"""
+Benchmark of hybrid (BM25 + vector, reciprocal rank fusion) retrieval
+against vector-only retrieval on a synthetic product catalogue.
+
+Builds an in-memory Chroma collection and a BM25 index over N catalogue
+chunks using a deterministic fake embedding, then runs SKU-style queries
+through both paths. Reports p50/p95 latency and hit@k for the exact SKU.
+(Fake embeddings carry no meaning, so vector-only hit@k is a floor; the
+latency numbers are the point.)
+
+Run from the server/ directory:
+    python -m benchmarks.hybrid_retrieval --chunks 100000 --queries 200
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+
+os.environ.setdefault("GOOGLE_API_KEY", "fake-key")
+
+import chromadb
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from app.services.bm25_index import BM25Index, reciprocal_rank_fusion
+
+COLOURS = ["black", "navy", "red", "olive", "white", "maroon", "teal", "mustard"]
+ITEMS = ["kurta", "saree", "sneaker", "backpack", "smartwatch", "jacket", "lehenga", "kettle"]
+
+
+def build_catalogue(chunks: int):
+    rng = random.Random(0)
+    ids, documents = [], []
+    for i in range(chunks):
+        sku = f"SKU-{i:06d}"
+        text = (
+            f"{sku} {rng.choice(COLOURS)} {rng.choice(ITEMS)} model M{rng.randrange(100, 999)}-{rng.choice('ABCDEF')}, "
+            f"size {rng.choice(['S', 'M', 'L', 'XL', '38', '40', '42', '9', '10'])}, "
+            f"price {rng.randrange(299, 9999)} INR, ships in {rng.randrange(1, 7)} days."
+        )
+        ids.append(sku)
+        documents.append(Document(page_content=text, metadata={"session_id": "bench", "sku": sku}))
+    return ids, documents
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--fetch-k", type=int, default=8)
+    args = parser.parse_args()
+
+    ids, documents = build_catalogue(args.chunks)
+
+    print(f"Indexing {args.chunks} chunks...")
+    start = time.perf_counter()
+    store = Chroma(
+        client=chromadb.EphemeralClient(),
+        collection_name="bench_catalogue",
+        embedding_function=DeterministicFakeEmbedding(size=64),
+    )
+    for batch_start in range(0, len(documents), 5000):
+        store.add_documents(documents[batch_start:batch_start + 5000], ids=ids[batch_start:batch_start + 5000])
+    vector_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    keyword = BM25Index()
+    keyword.add(ids, documents)
+    bm25_seconds = time.perf_counter() - start
+    print(f"Chroma indexing: {vector_seconds:.1f}s, BM25 indexing: {bm25_seconds:.1f}s")
+
+    retriever = store.as_retriever(search_kwargs={"k": args.fetch_k, "filter": {"session_id": "bench"}})
+    rng = random.Random(1)
+    targets = [rng.randrange(args.chunks) for _ in range(args.queries)]
+
+    async def vector_only(query):
+        return (await retriever.ainvoke(query))[:args.k]
+
+    async def hybrid(query):
+        vector_docs, keyword_hits = await asyncio.gather(
+            retriever.ainvoke(query),
+            asyncio.to_thread(keyword.search, query, args.fetch_k),
+        )
+        return reciprocal_rank_fusion(
+            [[(doc.metadata["sku"], doc) for doc in vector_docs], [(doc_id, doc) for doc_id, doc, _ in keyword_hits]],
+            k=args.k,
+        )
+
+    print(f"{'mode':<14}{'p50 (ms)':>10}{'p95 (ms)':>10}{'hit@' + str(args.k):>8}")
+    for name, search in (("vector-only", vector_only), ("hybrid (RRF)", hybrid)):
+        latencies, hits = [], 0
+        for target in targets:
+            sku = ids[target]
+            start = time.perf_counter()
+            results = await search(f"is {sku} available in my size?")
+            latencies.append(time.perf_counter() - start)
+            hits += any(doc.metadata["sku"] == sku for doc in results)
+        print(
+            f"{name:<14}{statistics.median(latencies) * 1000:>10.2f}"
+            f"{percentile(latencies, 95) * 1000:>10.2f}{hits / len(targets):>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,102 @@
+"""
+Benchmark of the intent router used by check_for_rag.
+
+Scores three routers on the held-out labelled set in
+benchmarks/data/intent_eval.json. The set is separate from the training
+data in app/data/intent_train.json. The routers are:
+
+- legacy substrings: the old rule, any("live" in message ...) -> web search
+- keyword rules: the whole-word fallback rules on their own
+- classifier: hashed n-gram logistic regression, keyword rules below the
+  confidence threshold
+
+Reports intent accuracy, route accuracy (the graph path actually taken;
+product and order questions currently go to generate_direct), per-intent
+recall, the fallback rate, and latency per classification.
+
+Run from the server/ directory:
+    python -m benchmarks.intent_classifier
+"""
+import argparse
+import json
+import os
+import time
+
+os.environ.setdefault("GOOGLE_API_KEY", "fake-key")
+
+from app.services.intent_classifier import INTENTS, intent_classifier, keyword_intent
+
+EVAL_PATH = os.path.join(os.path.dirname(__file__), "data", "intent_eval.json")
+
+# The routes of the agent graph (kept in sync with nodes.INTENT_ROUTES)
+ROUTES = {"rag": "rag", "web_search": "web_search", "direct": "direct", "product": "direct", "order": "direct"}
+
+# The keyword list check_for_rag used before the classifier
+LEGACY_KEYWORDS = [
+    "latest", "current", "recent", "news", "today", "2024", "2025",
+    "search for", "find information about", "what's happening",
+    "web search", "google", "internet", "online information",
+    "real-time", "live", "up-to-date", "newest",
+]
+
+
+def legacy_intent(text: str) -> str:
+    lowered = text.lower()
+    return "web_search" if any(keyword in lowered for keyword in LEGACY_KEYWORDS) else "direct"
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def evaluate(name, predict, rows, repeats: int):
+    latencies, predictions = [], []
+    for text, _ in rows:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            intent = predict(text)
+            latencies.append(time.perf_counter() - start)
+        predictions.append(intent)
+
+    intent_hits = sum(pred == gold for pred, (_, gold) in zip(predictions, rows))
+    route_hits = sum(ROUTES[pred] == ROUTES[gold] for pred, (_, gold) in zip(predictions, rows))
+    recall = {}
+    for intent in INTENTS:
+        gold_rows = [pred for pred, (_, gold) in zip(predictions, rows) if gold == intent]
+        recall[intent] = sum(pred == intent for pred in gold_rows) / len(gold_rows) if gold_rows else 0.0
+
+    print(
+        f"{name:<20}{intent_hits / len(rows):>9.2f}{route_hits / len(rows):>9.2f}"
+        + "".join(f"{recall[intent]:>12.2f}" for intent in INTENTS)
+        + f"{percentile(latencies, 50) * 1e6:>10.0f}{percentile(latencies, 99) * 1e6:>10.0f}"
+    )
+    return predictions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeats", type=int, default=20, help="Timed classifications per example")
+    parser.add_argument("--show-errors", action="store_true")
+    args = parser.parse_args()
+
+    with open(EVAL_PATH, encoding="utf-8") as f:
+        rows = [(row["text"], row["intent"]) for row in json.load(f)]
+
+    print(f"{len(rows)} labelled messages; recall per intent, latency in microseconds\n")
+    print(f"{'router':<20}{'intent':>9}{'route':>9}" + "".join(f"{intent:>12}" for intent in INTENTS)
+          + f"{'p50 us':>10}{'p99 us':>10}")
+    evaluate("legacy substrings", legacy_intent, rows, args.repeats)
+    evaluate("keyword rules", keyword_intent, rows, args.repeats)
+    predictions = evaluate("classifier", lambda text: intent_classifier.classify(text).intent, rows, args.repeats)
+
+    stats = intent_classifier.stats.as_dict()
+    print(f"\nclassifier fell back to keyword rules on {stats['fallback_rate']:.0%} of calls")
+    if args.show_errors:
+        for pred, (text, gold) in zip(predictions, rows):
+            if pred != gold:
+                print(f"  {gold:>10} -> {pred:<10} {text}")
+
+
+if __name__ == "__main__":
+    main()
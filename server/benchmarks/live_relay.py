@@ -0,0 +1,138 @@
+"""
+Load test of the Gemini Live relay's flow control with slow clients.
+
+Runs many simulated connections through relay_audio for a fixed time. Each
+connection has:
+
+- a microphone sending 16 kHz PCM in real time
+- a fake Live session that streams 24 kHz PCM faster than real time
+- a browser that drains it at a fraction of the needed bandwidth
+
+Some browsers stall completely. The same load also runs through an
+unbounded relay (plain asyncio.Queue, the old behaviour). Reports peak
+traced memory, queue drops, lag and stalled clients that were shed.
+
+Run from the server/ directory:
+    python -m benchmarks.live_relay --connections 200 --seconds 10
+"""
+import argparse
+import asyncio
+import os
+import tracemalloc
+
+os.environ.setdefault("GOOGLE_API_KEY", "fake-key")
+
+from app.services.audio_relay import RelayStats, SendTimeout, relay_audio
+
+MIC_CHUNK = b"\x01\x00" * 4096          # 256 ms of 16 kHz PCM
+MODEL_CHUNK = b"\x02\x00" * 2400        # 100 ms of 24 kHz PCM
+
+
+class FakeConnection:
+    def __init__(self, index: int, client_bytes_per_sec: float, model_speedup: float):
+        self.index = index
+        self.client_bytes_per_sec = client_bytes_per_sec   # 0 = stalled browser
+        self.model_speedup = model_speedup
+
+    async def receive_from_client(self):
+        await asyncio.sleep(0.256)
+        return bytes(bytearray(MIC_CHUNK))  # A fresh buffer, like a real websocket message
+
+    async def send_to_client(self, data: bytes):
+        if self.client_bytes_per_sec == 0:
+            await asyncio.Event().wait()  # Never drains
+        await asyncio.sleep(len(data) / self.client_bytes_per_sec)
+
+    async def send_to_model(self, data: bytes):
+        await asyncio.sleep(0.005)
+
+    async def model_audio(self):
+        for _ in range(50):
+            await asyncio.sleep(0.1 / self.model_speedup)
+            yield bytes(bytearray(MODEL_CHUNK))
+
+
+async def unbounded_relay(connection: FakeConnection):
+    """The old relay: one loop per direction, nothing bounded."""
+    upstream, downstream = asyncio.Queue(), asyncio.Queue()
+
+    async def read_client():
+        while True:
+            await upstream.put(await connection.receive_from_client())
+
+    async def write_model():
+        while True:
+            await connection.send_to_model(await upstream.get())
+
+    async def read_model():
+        while True:
+            async for data in connection.model_audio():
+                await downstream.put(data)
+
+    async def write_client():
+        while True:
+            await connection.send_to_client(await downstream.get())
+
+    await asyncio.gather(read_client(), write_model(), read_model(), write_client())
+
+
+def make_connections(count: int, stalled_share: float):
+    connections = []
+    for i in range(count):
+        if i < count * stalled_share:
+            rate = 0.0
+        else:
+            rate = [12_000, 24_000, 48_000, 96_000][i % 4]
+        connections.append(FakeConnection(i, rate, model_speedup=3.0))
+    return connections
+
+
+async def run(mode: str, connections, seconds: float):
+    all_stats = [RelayStats() for _ in connections]
+    shed = 0
+
+    async def one(connection, stats):
+        nonlocal shed
+        try:
+            if mode == "bounded":
+                await relay_audio(
+                    connection.receive_from_client, connection.send_to_client,
+                    connection.send_to_model, connection.model_audio, stats,
+                )
+            else:
+                await unbounded_relay(connection)
+        except SendTimeout:
+            shed += 1
+
+    tracemalloc.start()
+    tasks = [asyncio.create_task(one(c, s)) for c, s in zip(connections, all_stats)]
+    await asyncio.sleep(seconds)
+    _, peak = tracemalloc.get_traced_memory()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    tracemalloc.stop()
+    return peak, all_stats, shed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--connections", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--stalled-share", type=float, default=0.1)
+    args = parser.parse_args()
+
+    print(f"{'relay':<11}{'peak MB':>9}{'MB/conn':>9}{'dropped MB':>12}{'max lag (s)':>13}{'shed':>6}")
+    for mode in ("unbounded", "bounded"):
+        connections = make_connections(args.connections, args.stalled_share)
+        peak, all_stats, shed = await run(mode, connections, args.seconds)
+        dropped = sum(s.downstream.dropped_bytes + s.upstream.dropped_bytes for s in all_stats)
+        max_lag = max(s.downstream.max_lag_ms for s in all_stats) / 1000
+        print(
+            f"{mode:<11}{peak / 1e6:>9.1f}{peak / 1e6 / args.connections:>9.3f}"
+            f"{dropped / 1e6:>12.1f}{max_lag:>13.2f}{shed:>6}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
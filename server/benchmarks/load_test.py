@@ -0,0 +1,602 @@
+"""
+End-to-end load test of the server against local fakes for every external service.
+
+Starts the real app in its own uvicorn process with:
+
+- Gemini chat models replaced by a scripted streaming model (benchmarks/fake_llm.py)
+  with a configurable median and tail latency
+- the embedding model replaced by hashed bag-of-words embeddings
+  (benchmarks/fake_embeddings.py), still behind the app's embedding cache
+- an embedded Chroma in a temporary directory
+- the Gemini Live API replaced in-process (benchmarks/fake_live.py)
+- Tavily and Sarvam served over HTTP by benchmarks/fake_tavily.py and
+  benchmarks/fake_sarvam.py, and Redis by fakeredis over TCP
+
+Then each scenario runs for --duration seconds with --concurrency virtual
+users, each sending its next request as soon as the previous one finishes:
+
+- chat:        POST /api/v1/chat, a mix of document, web and direct questions
+- chat_stream: POST /api/v1/chat/stream, with the time to the first token
+- upload:      POST /api/v1/upload of the store handbook, polled until ingested
+- sarvam:      /ws/v1/sarvam-live-chat, one spoken utterance per turn
+- live:        /ws/v1/live-chat, one second of microphone audio per turn
+
+Reports throughput, p50/p95/p99 latency, the server's resident memory and
+the calls it made to each external service (from its /metrics). Results
+are saved as JSON under benchmarks/results/, named after the commit, and
+--compare prints the change against an earlier results file.
+
+Run from the server/ directory (needs `pip install fakeredis`):
+    python -m benchmarks.load_test --concurrency 20 --duration 20
+    python -m benchmarks.load_test --scenarios chat sarvam --compare benchmarks/results/<earlier>.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import aiohttp
+import numpy as np
+
+os.environ.setdefault("GOOGLE_API_KEY", "fake-key")
+
+from app.services.audio_protocol import BINARY_AUDIO_FORMAT, FRAME_HEADER, FRAME_PCM16, encode_frame
+from benchmarks.synthetic_pcm import chunks, silence, speech
+
+SCENARIOS = ["chat", "chat_stream", "upload", "sarvam", "live"]
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+HANDBOOK_PATH = os.path.join(os.path.dirname(__file__), "data", "store_handbook.md")
+
+# Answered from the uploaded handbook (use_rag), from the web, or directly
+DOCUMENT_QUESTIONS = [
+    "How many days do I have to return an item?",
+    "When will the refund for a prepaid order reach me?",
+    "Which cities get express delivery?",
+    "How do I store a silk saree?",
+    "How much is a Kesari Club point worth?",
+    "What does the WELCOME10 coupon give?",
+]
+WEB_QUESTIONS = [
+    "What are the latest silk saree trends this week?",
+    "What is the news on monsoon sale dates today?",
+    "Latest cotton kurta prices in 2024?",
+]
+DIRECT_QUESTIONS = [
+    "Hi, how are you?",
+    "Write a short poem about a blue kurta.",
+    "Suggest a colour to pair with a mustard dupatta.",
+]
+
+REPLY = ("Sure, here is what I found. Cotton kurtas ship within two working days from Jaipur. "
+         "Returns are accepted for fifteen days after delivery. Let me know if you need anything else.")
+
+LIVE_FRAME = b"\x01\x00" * 1600    # 100 ms of 16 kHz microphone PCM
+LIVE_FRAMES_PER_TURN = 10          # One second, what the fake Live session answers to
+LIVE_REPLY_BYTES = 20 * 4800       # The fake's 20 chunks of 24 kHz PCM
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve_app(port: int) -> None:
+    """Server process: the real app with the in-process fakes installed."""
+    import chromadb
+    import uvicorn
+    from langchain_chroma import Chroma
+
+    from app.api.v1.endpoints import live_chat
+    from app.services import vector_store
+    from app.services.llm_router import Provider, llm_router
+    from benchmarks.fake_embeddings import HashingEmbeddings
+    from benchmarks.fake_live import FakeLiveClient
+    from benchmarks.fake_llm import ScriptedChatModel, tail_latency
+
+    options = json.loads(os.environ["LOAD_TEST_OPTIONS"])
+    script = tail_latency(options["llm_latency"], options["llm_tail"], options["llm_tail_share"])
+    llm_router.providers = [Provider(
+        "gemini",
+        lambda temperature: ScriptedChatModel(name="gemini", script=script, reply=REPLY, token_interval=0.01),
+        {"chat", "code", "creative", "rag", "web", "summary"},
+    )]
+    vector_store.embedding_function.underlying = HashingEmbeddings(latency=options["embed_latency"])
+    vector_store.vector_store = Chroma(
+        client=chromadb.PersistentClient(path=options["chroma_dir"]),
+        collection_name="load_test",
+        embedding_function=vector_store.embedding_function,
+    )
+    live_chat.client = FakeLiveClient(first_audio_latency=options["live_latency"])
+
+    from app.main import app
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+class Recorder:
+    """Per-scenario timings in seconds, keyed by metric, plus error counts."""
+
+    def __init__(self, duration: float):
+        self.deadline = time.monotonic() + duration
+        self.timings: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.completed = 0
+
+    def running(self) -> bool:
+        return time.monotonic() < self.deadline
+
+    def ok(self, **timings: float) -> None:
+        self.completed += 1
+        for name, seconds in timings.items():
+            self.timings[name].append(seconds)
+
+    def error(self, kind: str) -> None:
+        self.errors[kind] += 1
+
+
+class MemorySampler:
+    """Samples the server's resident memory from /proc (Linux only)."""
+
+    def __init__(self, pid: int, interval: float = 0.25):
+        self.pid = pid
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def rss_mb(self) -> Optional[float]:
+        try:
+            with open(f"/proc/{self.pid}/status") as f:
+                match = re.search(r"VmRSS:\s+(\d+) kB", f.read())
+        except OSError:
+            return None
+        return int(match.group(1)) / 1024 if match else None
+
+    async def _run(self):
+        while True:
+            rss = self.rss_mb()
+            if rss is not None:
+                self.samples.append(rss)
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> Optional[Dict[str, float]]:
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        rss = self.rss_mb()
+        if rss is not None:
+            self.samples.append(rss)
+        if not self.samples:
+            return None
+        return {"start": round(self.samples[0], 1), "peak": round(max(self.samples), 1), "end": round(self.samples[-1], 1)}
+
+
+async def external_calls(session: aiohttp.ClientSession, base: str) -> Dict[str, Dict[str, float]]:
+    """Call count and total seconds per service, from external_call_duration_seconds."""
+    async with session.get(f"{base}/metrics") as response:
+        text = await response.text()
+    totals: Dict[str, Dict[str, float]] = defaultdict(lambda: {"calls": 0.0, "seconds": 0.0})
+    for match in re.finditer(r'^external_call_duration_seconds_(count|sum)\{([^}]*)\} (\S+)$', text, re.MULTILINE):
+        service = re.search(r'service="([^"]*)"', match.group(2)).group(1)
+        totals[service]["calls" if match.group(1) == "count" else "seconds"] += float(match.group(3))
+    return totals
+
+
+def call_deltas(before, after) -> Dict[str, Dict[str, float]]:
+    deltas = {}
+    for service, totals in after.items():
+        calls = totals["calls"] - before.get(service, {}).get("calls", 0.0)
+        seconds = totals["seconds"] - before.get(service, {}).get("seconds", 0.0)
+        if calls:
+            deltas[service] = {"calls": int(calls), "mean_ms": round(seconds / calls * 1000, 1)}
+    return deltas
+
+
+class Context:
+    def __init__(self, session: aiohttp.ClientSession, base: str, rag_sessions: List[str], handbook: bytes):
+        self.session = session
+        self.base = base
+        self.ws_base = base.replace("http://", "ws://")
+        self.rag_sessions = rag_sessions
+        self.handbook = handbook
+        rng = np.random.default_rng(0)
+        pcm = np.concatenate([silence(0.3, rng), speech(1.2, rng), silence(0.9, rng)])
+        self.utterance = [encode_frame(FRAME_PCM16, i, chunk) for i, chunk in enumerate(chunks(pcm))]
+
+    def question(self, rng: random.Random, user: int) -> dict:
+        """Half document questions, the rest web and direct ones."""
+        draw = rng.random()
+        if draw < 0.5:
+            return {"message": rng.choice(DOCUMENT_QUESTIONS), "use_rag": True,
+                    "session_id": self.rag_sessions[user % len(self.rag_sessions)]}
+        pool = WEB_QUESTIONS if draw < 0.7 else DIRECT_QUESTIONS
+        return {"message": rng.choice(pool), "use_rag": False, "session_id": f"load-chat-{user}"}
+
+
+async def run_chat(ctx: Context, user: int, recorder: Recorder) -> None:
+    rng = random.Random(user)
+    while recorder.running():
+        start = time.perf_counter()
+        try:
+            async with ctx.session.post(f"{ctx.base}/api/v1/chat", json=ctx.question(rng, user)) as response:
+                body = await response.json()
+        except aiohttp.ClientError:
+            recorder.error("connection")
+            continue
+        if response.status != 200 or "error occurred" in body.get("response", ""):
+            recorder.error(f"http {response.status}" if response.status != 200 else "agent")
+            continue
+        recorder.ok(latency=time.perf_counter() - start)
+
+
+async def run_chat_stream(ctx: Context, user: int, recorder: Recorder) -> None:
+    rng = random.Random(user)
+    while recorder.running():
+        start = time.perf_counter()
+        first_token = None
+        event = None
+        try:
+            async with ctx.session.post(f"{ctx.base}/api/v1/chat/stream", json=ctx.question(rng, user)) as response:
+                async for raw in response.content:
+                    line = raw.decode("utf-8").strip()
+                    if line.startswith("event:"):
+                        event = line.split(":", 1)[1].strip()
+                        if event == "token" and first_token is None:
+                            first_token = time.perf_counter() - start
+                        elif event in ("done", "error"):
+                            break
+        except aiohttp.ClientError:
+            recorder.error("connection")
+            continue
+        if event != "done":
+            recorder.error(event or f"http {response.status}")
+            continue
+        timings = {"latency": time.perf_counter() - start}
+        if first_token is not None:
+            timings["first_token"] = first_token
+        recorder.ok(**timings)
+
+
+async def run_upload(ctx: Context, user: int, recorder: Recorder) -> None:
+    count = 0
+    while recorder.running():
+        count += 1
+        form = aiohttp.FormData()
+        # A new session per upload, so the file is never skipped as already ingested
+        form.add_field("session_id", f"load-upload-{user}-{count}")
+        form.add_field("file", ctx.handbook, filename="store_handbook.txt", content_type="text/plain")
+        start = time.perf_counter()
+        try:
+            async with ctx.session.post(f"{ctx.base}/api/v1/upload", data=form) as response:
+                body = await response.json()
+            accepted = time.perf_counter() - start
+            if response.status != 202:
+                recorder.error(f"http {response.status}")
+                await asyncio.sleep(0.1)
+                continue
+            status = "queued"
+            while status not in ("completed", "failed", "cancelled"):
+                await asyncio.sleep(0.05)
+                async with ctx.session.get(f"{ctx.base}/api/v1/upload/{body['job_id']}") as response:
+                    status = (await response.json())["status"]
+        except aiohttp.ClientError:
+            recorder.error("connection")
+            continue
+        if status != "completed":
+            recorder.error(status)
+            continue
+        recorder.ok(latency=time.perf_counter() - start, accepted=accepted)
+
+
+async def run_sarvam(ctx: Context, user: int, recorder: Recorder) -> None:
+    config = {
+        "language": "hindi",
+        "isRagEnabled": user % 2 == 0,
+        "sessionId": ctx.rag_sessions[user % len(ctx.rag_sessions)],
+        "audioFormat": BINARY_AUDIO_FORMAT,
+    }
+    while recorder.running():
+        try:
+            async with ctx.session.ws_connect(f"{ctx.ws_base}/ws/v1/sarvam-live-chat") as ws:
+                first = await ws.receive_json()
+                if first.get("type") != "languages":
+                    recorder.error("refused")
+                    await asyncio.sleep(0.5)
+                    continue
+                await ws.send_json({"config": config})
+                while recorder.running():
+                    for frame in ctx.utterance:
+                        await ws.send_bytes(frame)
+                    await ws.send_json({"type": "audio_end"})
+                    start = time.perf_counter()
+                    first_audio = None
+                    async for message in ws:
+                        if message.type == aiohttp.WSMsgType.BINARY:
+                            if first_audio is None:
+                                first_audio = time.perf_counter() - start
+                            continue
+                        if message.type != aiohttp.WSMsgType.TEXT:
+                            raise aiohttp.ClientError(f"socket closed: {message.type}")
+                        data = json.loads(message.data)
+                        if data["type"] == "ai_response":
+                            timings = {"latency": time.perf_counter() - start}
+                            if first_audio is not None:
+                                timings["first_audio"] = first_audio
+                            recorder.ok(**timings)
+                            break
+                        if data["type"] == "error":
+                            recorder.error("turn")
+                            break
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            recorder.error("connection")
+
+
+async def run_live(ctx: Context, user: int, recorder: Recorder) -> None:
+    config = {
+        "isRagEnabled": user % 2 == 0,
+        "sessionId": ctx.rag_sessions[user % len(ctx.rag_sessions)],
+        "audioFormat": BINARY_AUDIO_FORMAT,
+    }
+    sequence = 0
+    while recorder.running():
+        try:
+            async with ctx.session.ws_connect(f"{ctx.ws_base}/ws/v1/live-chat") as ws:
+                await ws.send_json({"config": config})
+                while recorder.running():
+                    for _ in range(LIVE_FRAMES_PER_TURN):
+                        await ws.send_bytes(encode_frame(FRAME_PCM16, sequence, LIVE_FRAME))
+                        sequence += 1
+                    start = time.perf_counter()
+                    first_audio = last_audio = None
+                    received = 0
+                    while received < LIVE_REPLY_BYTES:
+                        # Downstream frames can be merged or dropped; a quiet second ends the turn
+                        try:
+                            message = await ws.receive(timeout=1.0)
+                        except asyncio.TimeoutError:
+                            break
+                        if message.type == aiohttp.WSMsgType.BINARY:
+                            last_audio = time.perf_counter() - start
+                            if first_audio is None:
+                                first_audio = last_audio
+                            received += len(message.data) - FRAME_HEADER.size
+                        elif message.type == aiohttp.WSMsgType.TEXT:
+                            if json.loads(message.data).get("type") == "error":
+                                raise aiohttp.ClientError("refused")
+                        else:
+                            raise aiohttp.ClientError(f"socket closed: {message.type}")
+                    if first_audio is None:
+                        recorder.error("no reply")
+                    else:
+                        recorder.ok(latency=last_audio, first_audio=first_audio)
+        except aiohttp.ClientError:
+            recorder.error("connection")
+            await asyncio.sleep(0.1)
+
+RUNNERS = {
+    "chat": run_chat,
+    "chat_stream": run_chat_stream,
+    "upload": run_upload,
+    "sarvam": run_sarvam,
+    "live": run_live,
+}
+
+
+async def upload_documents(session: aiohttp.ClientSession, base: str, handbook: bytes, sessions: int) -> List[str]:
+    """Uploads the handbook into the sessions the document questions use and waits for ingestion."""
+    session_ids = [f"load-docs-{i}" for i in range(sessions)]
+    for session_id in session_ids:
+        form = aiohttp.FormData()
+        form.add_field("session_id", session_id)
+        form.add_field("file", handbook, filename="store_handbook.txt", content_type="text/plain")
+        async with session.post(f"{base}/api/v1/upload", data=form) as response:
+            job_id = (await response.json())["job_id"]
+        status = "queued"
+        while status not in ("completed", "failed", "cancelled"):
+            await asyncio.sleep(0.1)
+            async with session.get(f"{base}/api/v1/upload/{job_id}") as response:
+                status = (await response.json())["status"]
+        if status != "completed":
+            raise RuntimeError(f"Could not ingest the handbook for {session_id}: {status}")
+    return session_ids
+
+
+async def run_scenario(name: str, ctx: Context, pid: int, args) -> dict:
+    calls_before = await external_calls(ctx.session, ctx.base)
+    memory = MemorySampler(pid)
+    memory.start()
+    recorder = Recorder(args.duration)
+    start = time.perf_counter()
+    await asyncio.gather(*(RUNNERS[name](ctx, user, recorder) for user in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+
+    result = {
+        "requests": recorder.completed,
+        "errors": dict(recorder.errors),
+        "throughput_rps": round(recorder.completed / elapsed, 2),
+        "memory_mb": await memory.stop(),
+        "external_calls": call_deltas(calls_before, await external_calls(ctx.session, ctx.base)),
+    }
+    for metric, values in recorder.timings.items():
+        result[f"{metric}_ms"] = {
+            f"p{pct}": round(percentile(values, pct) * 1000, 1) for pct in (50, 95, 99)
+        }
+    return result
+
+
+def commit_id() -> str:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no", "--", "app"],
+                               capture_output=True, text=True).stdout.strip()
+        return f"{commit}-dirty" if dirty else commit
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_results(scenarios: Dict[str, dict]) -> None:
+    print(f"\n{'scenario':<13}{'requests':>9}{'errors':>8}{'req/s':>8}{'p50 (ms)':>10}{'p95 (ms)':>10}"
+          f"{'p99 (ms)':>10}{'first (ms)':>12}{'peak RSS':>10}")
+    for name, result in scenarios.items():
+        latency = result.get("latency_ms", {})
+        first = result.get("first_token_ms") or result.get("first_audio_ms") or result.get("accepted_ms") or {}
+        peak = result["memory_mb"]["peak"] if result["memory_mb"] else None
+        print(f"{name:<13}{result['requests']:>9}{sum(result['errors'].values()):>8}{result['throughput_rps']:>8.1f}"
+              f"{latency.get('p50', 0):>10.0f}{latency.get('p95', 0):>10.0f}{latency.get('p99', 0):>10.0f}"
+              f"{first.get('p50', 0):>12.0f}{(f'{peak:.0f} MB' if peak else '-'):>10}")
+    print("\n'first' is the p50 time to the first token (chat_stream), first audio (voice) or 202 (upload).")
+    for name, result in scenarios.items():
+        calls = ", ".join(f"{service} {c['calls']} x {c['mean_ms']:.0f} ms" for service, c in result["external_calls"].items())
+        print(f"{name:<13}{calls or 'no external calls'}")
+
+
+def compare(baseline: dict, current: dict) -> None:
+    """Prints the change of the headline numbers against an earlier run."""
+    print(f"\nCompared with {baseline['commit']} ({baseline['timestamp']}):")
+    print(f"{'scenario':<13}{'metric':<20}{'before':>10}{'after':>10}{'change':>10}")
+    for name, result in current["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            continue
+        rows = [("throughput_rps", before["throughput_rps"], result["throughput_rps"])]
+        for metric in ("latency_ms", "first_token_ms", "first_audio_ms"):
+            for pct in ("p50", "p95", "p99"):
+                if metric in before and metric in result:
+                    rows.append((f"{metric[:-3]} {pct} (ms)", before[metric][pct], result[metric][pct]))
+        for label, old, new in rows:
+            change = f"{(new - old) / old:+.1%}" if old else "-"
+            print(f"{name:<13}{label:<20}{old:>10}{new:>10}{change:>10}")
+
+
+async def main(args):
+    from fakeredis import TcpFakeServer
+
+    from benchmarks.fake_sarvam import FakeSarvam
+    from benchmarks.fake_tavily import FakeTavily
+
+    redis_port = free_port()
+    redis_server = TcpFakeServer(("127.0.0.1", redis_port), server_type="redis")
+    threading.Thread(target=redis_server.serve_forever, daemon=True).start()
+    sarvam = FakeSarvam(latency={"tts": args.sarvam_latency, "stt": args.sarvam_latency,
+                                 "translate": args.sarvam_latency / 2})
+    tavily = FakeTavily(latency=args.tavily_latency)
+    workdir = tempfile.mkdtemp(prefix="load_test-")
+
+    port = free_port()
+    env = {
+        **os.environ,
+        "REDIS_URL": f"redis://127.0.0.1:{redis_port}",
+        "SARVAM_BASE_URL": await sarvam.start(),
+        "SARVAM_API_KEY": "fake-key",
+        "TAVILY_BASE_URL": await tavily.start(),
+        "TAVILY_API_KEY": "fake-key",
+        "GEMINI_MODEL": "gemini-fake",
+        "EMBEDDING_CACHE_DIR": os.path.join(workdir, "embedding_cache"),
+        "TTS_CACHE_DIR": os.path.join(workdir, "tts_cache"),
+        "VOICE_MAX_CONNECTIONS_PER_WORKER": str(max(50, args.concurrency)),
+        "LOG_LEVEL": "WARNING",
+        "LOAD_TEST_OPTIONS": json.dumps({
+            "llm_latency": args.llm_latency,
+            "llm_tail": args.llm_tail,
+            "llm_tail_share": args.llm_tail_share,
+            "embed_latency": args.embed_latency,
+            "live_latency": args.live_latency,
+            "chroma_dir": os.path.join(workdir, "chroma"),
+        }),
+    }
+    server = subprocess.Popen([sys.executable, "-m", "benchmarks.load_test", "--serve", str(port)], env=env)
+    base = f"http://127.0.0.1:{port}"
+
+    with open(HANDBOOK_PATH, "rb") as f:
+        handbook = f.read()
+    try:
+        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0)) as session:
+            deadline = time.monotonic() + 120
+            while True:
+                try:
+                    async with session.get(f"{base}/"):
+                        break
+                except aiohttp.ClientError:
+                    if time.monotonic() > deadline or server.poll() is not None:
+                        raise RuntimeError("The server did not start")
+                    await asyncio.sleep(0.5)
+
+            rag_sessions = await upload_documents(session, base, handbook, args.document_sessions)
+            ctx = Context(session, base, rag_sessions, handbook)
+            print(f"{args.concurrency} virtual users, {args.duration:.0f} s per scenario; "
+                  f"LLM {args.llm_latency * 1000:.0f} ms ({args.llm_tail_share:.0%} at {args.llm_tail * 1000:.0f} ms)")
+            scenarios = {}
+            for name in args.scenarios:
+                print(f"running {name}...", flush=True)
+                scenarios[name] = await run_scenario(name, ctx, server.pid, args)
+    finally:
+        server.terminate()
+        server.wait()
+        await sarvam.stop()
+        await tavily.stop()
+        redis_server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    results = {
+        "commit": commit_id(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("serve", "out", "compare")},
+        "fake_calls": {"sarvam": dict(sarvam.calls), "tavily": tavily.calls},
+        "scenarios": scenarios,
+    }
+    print_results(scenarios)
+
+    out = args.out or os.path.join(
+        RESULTS_DIR, f"load_test-{results['commit']}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to {out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", default=SCENARIOS, choices=SCENARIOS)
+    parser.add_argument("--concurrency", type=int, default=20, help="Virtual users per scenario")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per scenario")
+    parser.add_argument("--document-sessions", type=int, default=4, help="Sessions with the handbook uploaded")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="Median time to the first token")
+    parser.add_argument("--llm-tail", type=float, default=2.0, help="Time to the first token of slow calls")
+    parser.add_argument("--llm-tail-share", type=float, default=0.02, help="Share of slow LLM calls")
+    parser.add_argument("--embed-latency", type=float, default=0.05)
+    parser.add_argument("--tavily-latency", type=float, default=0.4)
+    parser.add_argument("--sarvam-latency", type=float, default=0.15, help="STT and TTS; translation takes half")
+    parser.add_argument("--live-latency", type=float, default=0.4, help="Gemini Live time to first audio")
+    parser.add_argument("--out", help="Results file (default: benchmarks/results/load_test-<commit>-<time>.json)")
+    parser.add_argument("--compare", help="Earlier results file to compare with")
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        serve_app(args.serve)
+    else:
+        asyncio.run(main(args))
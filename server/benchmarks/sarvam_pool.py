@@ -0,0 +1,82 @@
+"""
+Latency benchmark of the pooled Sarvam client against a fresh
+aiohttp.ClientSession per call (the previous behaviour).
+
+Runs voice-turn-like sequences (STT -> translate -> TTS) against the local
+fake Sarvam server and reports per-call latency and the number of TCP
+connections opened. Against the real API every avoided connection also
+saves a TLS handshake, so the gap there is larger than on localhost.
+
+Run from the server/ directory:
+    python -m benchmarks.sarvam_pool --turns 200 --concurrency 8
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ.setdefault("GOOGLE_API_KEY", "fake-key")
+os.environ.setdefault("SARVAM_API_KEY", "fake-key")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    from benchmarks.fake_sarvam import FakeSarvam
+
+    fake = FakeSarvam()
+    base_url = await fake.start()
+    os.environ["SARVAM_BASE_URL"] = base_url
+
+    import aiohttp
+    from app.services import sarvam_service as sarvam_module
+
+    service = sarvam_module.SarvamService()
+    audio = b"\x00\x00" * 8000
+    stt_payload = {"language_code": "hi-IN", "audio": "", "model": "saaras:v1"}
+
+    async def fresh_session_turn():
+        # What every call used to do: a new session, so a new connection
+        for url, payload in (
+            (sarvam_module.SARVAM_STT_URL, stt_payload),
+            (sarvam_module.SARVAM_TRANSLATE_URL, {"input": "hello", "target_language_code": "hi-IN"}),
+            (sarvam_module.SARVAM_TTS_URL, {"inputs": ["hello"]}),
+        ):
+            async with aiohttp.ClientSession() as session:
+                async with session.post(url, json=payload, headers=service.headers) as response:
+                    await response.json()
+
+    async def pooled_turn():
+        await service.speech_to_text(audio, "hindi")
+        await service.translate_text("hello", "english", "hindi")
+        await service.text_to_speech("hello", "hindi", "anushka")
+
+    print(f"{'client':<10}{'p50 turn (ms)':>15}{'p95 turn (ms)':>15}{'connections':>13}")
+    for name, turn in (("fresh", fresh_session_turn), ("pooled", pooled_turn)):
+        fake._peers.clear()
+        semaphore = asyncio.Semaphore(args.concurrency)
+        latencies = []
+
+        async def timed():
+            async with semaphore:
+                start = time.perf_counter()
+                await turn()
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(timed() for _ in range(args.turns)))
+        latencies.sort()
+        print(
+            f"{name:<10}{statistics.median(latencies) * 1000:>15.2f}"
+            f"{latencies[int(0.95 * (len(latencies) - 1))] * 1000:>15.2f}{fake.connections:>13}"
+        )
+
+    await service.close()
+    await fake.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,57 @@
+"""
+Synthetic 16-bit mono PCM fixtures for the voice benchmarks.
+
+Speech is approximated by a few harmonics of a gliding pitch with a
+syllable-rate amplitude envelope; silence is low-level white noise. Each
+script is a list of (kind, seconds) segments, so the expected number of
+utterances is known in advance.
+"""
+from typing import Iterator, List, Tuple
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+def speech(seconds: float, rng: np.random.Generator, level: float = 6000.0) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    pitch = 140 + 40 * np.sin(2 * np.pi * 0.7 * t + rng.uniform(0, np.pi))
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    voiced = sum(np.sin(h * phase) / h for h in (1, 2, 3, 4))
+    syllables = 0.55 + 0.45 * np.sin(2 * np.pi * 4 * t) ** 2
+    return (level * syllables * voiced / 2).astype(np.int16)
+
+
+def silence(seconds: float, rng: np.random.Generator, level: float = 60.0) -> np.ndarray:
+    return rng.normal(0, level, int(seconds * SAMPLE_RATE)).astype(np.int16)
+
+
+def click(rng: np.random.Generator) -> np.ndarray:
+    """A short loud burst (door, keyboard) that must not become an utterance."""
+    return speech(0.06, rng, level=12000.0)
+
+
+def conversation(turns: int, seed: int = 0) -> Tuple[np.ndarray, int]:
+    """
+    A turn-taking script: silence, an utterance of 1-4 s (sometimes with a
+    short mid-sentence pause), and the odd click. Returns the PCM and the
+    number of utterances a correct endpointer should produce.
+    """
+    rng = np.random.default_rng(seed)
+    parts: List[np.ndarray] = [silence(1.0, rng)]
+    for _ in range(turns):
+        parts.append(speech(rng.uniform(0.5, 2.0), rng))
+        if rng.random() < 0.5:
+            parts.append(silence(0.25, rng))  # Pause shorter than the hangover
+            parts.append(speech(rng.uniform(0.5, 2.0), rng))
+        parts.append(silence(rng.uniform(1.5, 3.0), rng))
+        if rng.random() < 0.3:
+            parts.append(click(rng))
+            parts.append(silence(1.0, rng))
+    return np.concatenate(parts), turns
+
+
+def chunks(pcm: np.ndarray, samples_per_chunk: int = 4096) -> Iterator[bytes]:
+    """Splits PCM the way the browser worklet sends it."""
+    for start in range(0, len(pcm), samples_per_chunk):
+        yield pcm[start:start + samples_per_chunk].tobytes()
@@ -0,0 +1,144 @@
+"""
+Overhead of the metrics, tracing and structured logging on the hot path.
+
+Measures:
+
+- the cost of one node_span / external_call block: Prometheus histogram
+  only, and with OpenTelemetry spans recorded by the SDK (when installed)
+- the cost of one log call: disabled level, sampled out, and written as
+  JSON to a null stream
+- whole graph runs (direct route, instant fake LLM) with and without the
+  node wrappers, so the per-request overhead is visible next to the
+  graph's own cost
+
+Run from the server/ directory:
+    python -m benchmarks.telemetry_overhead --iterations 20000 --runs 500
+"""
+import argparse
+import asyncio
+import io
+import logging
+import os
+import time
+
+os.environ.setdefault("GOOGLE_API_KEY", "fake-key")
+os.environ.setdefault("GEMINI_MODEL", "gemini-fake")
+os.environ.setdefault("TAVILY_API_KEY", "fake-key")
+
+from langchain_core.messages import HumanMessage
+
+from app.agent import graph as agent_graph_module
+from app.agent import nodes
+from app.core import telemetry
+from app.core.logger import JsonFormatter, get_logger
+from benchmarks.agent_concurrency import SlowFakeChatModel
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def per_call_us(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def span_costs(iterations: int):
+    def node():
+        with telemetry.node_span("generate_direct", "direct", session_id="bench"):
+            pass
+
+    def external():
+        with telemetry.external_call("llm", "chat", "gemini", session_id="bench"):
+            pass
+
+    rows = [
+        ("node_span, metrics only", per_call_us(node, iterations)),
+        ("external_call, metrics only", per_call_us(external, iterations)),
+    ]
+    try:
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+        from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+    except ImportError:
+        rows.append(("with OpenTelemetry spans", None))
+        return rows
+
+    provider = TracerProvider()
+    exporter = InMemorySpanExporter()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    telemetry._tracer = provider.get_tracer("bench")
+    try:
+        rows.append(("node_span + OTel span", per_call_us(node, iterations)))
+        rows.append(("external_call + OTel span", per_call_us(external, iterations)))
+    finally:
+        telemetry._tracer = None
+    return rows
+
+
+def log_costs(iterations: int):
+    logger = get_logger("app.bench")
+    handler = logging.StreamHandler(io.StringIO())
+    handler.setFormatter(JsonFormatter())
+    app_logger = logging.getLogger("app")
+    app_logger.handlers, app_logger.propagate = [handler], False
+    app_logger.setLevel(logging.INFO)
+
+    return [
+        ("log, level disabled", per_call_us(lambda: logger.debug("node.start", node="generate_direct"), iterations)),
+        ("log, sampled out (rate 0)", per_call_us(
+            lambda: logger.info("agent.route", sample=0.0, route="generate_direct"), iterations)),
+        ("log, JSON written", per_call_us(
+            lambda: logger.info("agent.route", route="generate_direct", session_id="bench"), iterations)),
+    ]
+
+
+def build_graph(instrumented: bool):
+    if instrumented:
+        return agent_graph_module.create_agent_graph()
+    timed, atimed = agent_graph_module._timed, agent_graph_module._atimed
+    agent_graph_module._timed = agent_graph_module._atimed = lambda func: func
+    try:
+        return agent_graph_module.create_agent_graph()
+    finally:
+        agent_graph_module._timed, agent_graph_module._atimed = timed, atimed
+
+
+async def graph_runs(runs: int):
+    """Alternates the two graphs run by run, so drift (GC, caches warming) hits both alike."""
+    nodes.llm = nodes.llm_rag = nodes.llm_web = SlowFakeChatModel(latency=0.0)
+    graphs = {"graph, no instrumentation": build_graph(False), "graph, instrumented": build_graph(True)}
+    results = {name: [] for name in graphs}
+    for i in range(runs):
+        for name, graph in graphs.items():
+            state = {"messages": [HumanMessage(content=f"hello {i}")], "use_rag": False, "session_id": f"bench-{i}"}
+            start = time.perf_counter()
+            await graph.ainvoke(state)
+            if i >= runs // 10:  # Skip warm-up
+                results[name].append(time.perf_counter() - start)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--runs", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{'block':<32}{'us per call':>12}")
+    for name, cost in span_costs(args.iterations) + log_costs(args.iterations):
+        print(f"{name:<32}{'n/a' if cost is None else f'{cost:.2f}':>12}")
+
+    print(f"\n{'graph run (direct route)':<32}{'p50 (ms)':>12}{'p99 (ms)':>12}")
+    results = asyncio.run(graph_runs(args.runs))
+    for name, latencies in results.items():
+        print(f"{name:<32}{percentile(latencies, 50) * 1000:>12.3f}{percentile(latencies, 99) * 1000:>12.3f}")
+    base, instrumented = (percentile(latencies, 50) for latencies in results.values())
+    print(f"\noverhead per request: {(instrumented - base) * 1000:.3f} ms ({(instrumented - base) / base:.1%})")
+
+
+if __name__ == "__main__":
+    main()
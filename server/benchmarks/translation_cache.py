@@ -0,0 +1,106 @@
+"""
+Benchmark of sentence-level translation caching and batching in SarvamService.
+
+Replays agent responses for non-English voice sessions against the local
+fake Sarvam translate endpoint. Responses are built from a pool of recurring
+sentences (greetings, policy lines, order-status templates) plus one-off
+sentences. Modes:
+
+- whole response: the old behaviour, one request per full response, no cache
+- batched: sentence split and batched, but with no cache
+- cached: batched with the in-process LRU
+- second worker: a fresh process-local cache sharing the first one's Redis tier
+
+Reports translate requests, hit rate and p50/p95 latency per response.
+
+Run from the server/ directory (needs `pip install fakeredis`):
+    python -m benchmarks.translation_cache --responses 300
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+
+os.environ.setdefault("GOOGLE_API_KEY", "fake-key")
+os.environ.setdefault("SARVAM_API_KEY", "fake-key")
+
+RECURRING = [
+    "Thank you for shopping with us.",
+    "Your order has been shipped and will reach you soon.",
+    "You can return the item within fifteen days of delivery.",
+    "The provided documents do not contain that information.",
+    "Cash on delivery is available for orders below ten thousand rupees.",
+    "Is there anything else I can help you with?",
+    "Delivery usually takes two to three working days.",
+    "You can track your order from the My Orders page.",
+]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def build_responses(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    responses = []
+    for i in range(count):
+        sentences = rng.sample(RECURRING, rng.randint(1, 3))
+        sentences.insert(rng.randrange(len(sentences) + 1), f"The kurta with code K{i:04d} is available in {rng.choice('SMLX')} size.")
+        responses.append(" ".join(sentences))
+    return responses
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--responses", type=int, default=300)
+    parser.add_argument("--translate-latency", type=float, default=0.12)
+    args = parser.parse_args()
+
+    from fakeredis import aioredis as fake_aioredis
+
+    from benchmarks.fake_sarvam import FakeSarvam
+
+    fake = FakeSarvam({"translate": args.translate_latency})
+    os.environ["SARVAM_BASE_URL"] = await fake.start()
+
+    from app.services.sarvam_service import SARVAM_LANGUAGES, SarvamService
+    from app.services.translation_cache import TranslationCache
+
+    responses = build_responses(args.responses)
+    shared_redis = fake_aioredis.FakeRedis()
+    source, target = SARVAM_LANGUAGES["english"]["code"], SARVAM_LANGUAGES["hindi"]["code"]
+
+    def make_cache(mode):
+        if mode == "batched":
+            return TranslationCache(max_items=0)
+        return TranslationCache(redis_client_factory=lambda: shared_redis)
+
+    print(f"{'mode':<16}{'requests':>10}{'hit rate':>10}{'p50 (ms)':>10}{'p95 (ms)':>10}")
+    for mode in ("whole response", "batched", "cached", "second worker"):
+        cache = None if mode == "whole response" else make_cache(mode)
+        service = SarvamService(text_cache=cache)
+        fake.calls["translate"] = 0
+
+        latencies = []
+        for response in responses:
+            start = time.perf_counter()
+            if cache is None:
+                await service._translate_request(response, source, target)
+            else:
+                await service.translate_text(response, "english", "hindi")
+            latencies.append(time.perf_counter() - start)
+        await service.close()
+
+        hit_rate = cache.stats.as_dict()["hit_rate"] if cache else 0.0
+        print(
+            f"{mode:<16}{fake.calls['translate']:>10}{hit_rate:>10.2f}"
+            f"{statistics.median(latencies) * 1000:>10.1f}{percentile(latencies, 95) * 1000:>10.1f}"
+        )
+    await fake.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,85 @@
+"""
+Benchmark of the TTS audio cache in SarvamService.
+
+Replays a voice-turn workload against the local fake Sarvam server. The
+workload is a mix of canned phrases (greetings, "the provided documents do
+not contain that information", order-status templates) and one-off answer
+sentences. It runs without a cache, with a cold cache, and with a cache
+pre-warmed from app/data/tts_phrases.json, and reports the hit rate, the
+p50/p95 TTS latency and the number of TTS API calls.
+
+Run from the server/ directory:
+    python -m benchmarks.tts_cache --requests 500 --canned-share 0.4
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("GOOGLE_API_KEY", "fake-key")
+os.environ.setdefault("SARVAM_API_KEY", "fake-key")
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--canned-share", type=float, default=0.4)
+    parser.add_argument("--tts-latency", type=float, default=0.3)
+    args = parser.parse_args()
+
+    from benchmarks.fake_sarvam import FakeSarvam
+
+    fake = FakeSarvam({"tts": args.tts_latency})
+    os.environ["SARVAM_BASE_URL"] = await fake.start()
+
+    from app.services.sarvam_service import SarvamService
+    from app.services.tts_cache import TTSCache, load_prewarm_phrases
+
+    phrases = load_prewarm_phrases()
+    rng = random.Random(0)
+    workload = []
+    for i in range(args.requests):
+        if phrases and rng.random() < args.canned_share:
+            phrase = rng.choice(phrases)
+            # Whitespace differences still hit the same entry
+            workload.append((f" {phrase['text']}  ", phrase["language"], phrase.get("voice", "anushka")))
+        else:
+            workload.append((f"Answer sentence number {i} about kurta sizes.", "english", "anushka"))
+
+    print(f"{'mode':<12}{'hit rate':>10}{'mean (ms)':>11}{'p50 (ms)':>10}{'p95 (ms)':>10}{'TTS calls':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("no cache", "cold", "pre-warmed"):
+            cache = None if mode == "no cache" else TTSCache(path=os.path.join(tmp, f"{mode}.sqlite3"))
+            service = SarvamService(audio_cache=cache)
+            if mode == "pre-warmed":
+                await service.prewarm_tts(phrases)
+            fake.calls["tts"] = 0
+
+            latencies = []
+            for text, language, voice in workload:
+                start = time.perf_counter()
+                await service.text_to_speech(text, language, voice)
+                latencies.append(time.perf_counter() - start)
+            await service.close()
+            if cache:
+                await cache.flush()
+
+            hit_rate = cache.stats.as_dict()["hit_rate"] if cache else 0.0
+            print(
+                f"{mode:<12}{hit_rate:>10.2f}{statistics.mean(latencies) * 1000:>11.1f}"
+                f"{statistics.median(latencies) * 1000:>10.1f}"
+                f"{percentile(latencies, 95) * 1000:>10.1f}{fake.calls['tts']:>11}"
+            )
+    await fake.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
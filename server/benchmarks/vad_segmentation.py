@@ -0,0 +1,63 @@
+"""
+Benchmark of server-side VAD and endpointing for the Sarvam voice chat.
+
+Streams synthetic conversations (see benchmarks.synthetic_pcm) through
+UtteranceSegmenter in worklet-sized chunks and compares the number of STT
+calls against the old one-call-per-chunk behaviour. Also checks that the
+expected number of utterances was found, and reports the endpointing delay
+and the CPU cost per second of audio.
+
+Run from the server/ directory:
+    python -m benchmarks.vad_segmentation --conversations 20 --turns 10
+"""
+import argparse
+import os
+import sys
+
+os.environ.setdefault("GOOGLE_API_KEY", "fake-key")
+
+from app.services.vad import UtteranceSegmenter, VADStats
+from benchmarks.synthetic_pcm import SAMPLE_RATE, chunks, conversation
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--conversations", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--chunk-samples", type=int, default=4096)
+    args = parser.parse_args()
+
+    stats = VADStats()
+    expected_total = found_total = 0
+    mismatches = []
+    for seed in range(args.conversations):
+        pcm, expected = conversation(args.turns, seed=seed)
+        segmenter = UtteranceSegmenter(sample_rate=SAMPLE_RATE, stats=stats)
+        found = 0
+        for chunk in chunks(pcm, args.chunk_samples):
+            found += len(segmenter.feed(chunk))
+        found += len(segmenter.flush())
+        expected_total += expected
+        found_total += found
+        if found != expected:
+            mismatches.append((seed, expected, found))
+
+    result = stats.as_dict()
+    audio_seconds = stats.audio_ms / 1000
+    print(f"audio streamed:          {audio_seconds:.0f} s in {result['chunks_received']} chunks")
+    print(f"STT calls (per chunk):   {result['chunks_received']}")
+    print(f"STT calls (VAD):         {result['stt_calls']} (expected {expected_total})")
+    print(f"STT calls saved:         {result['stt_calls_saved']}")
+    print(f"noise bursts dropped:    {result['noise_bursts_dropped']}")
+    print(f"silence not sent:        {result['silence_dropped_ms'] / 1000:.0f} s")
+    print(f"avg endpointing delay:   {result['avg_endpointing_ms']:.0f} ms")
+    print(f"CPU per second of audio: {stats.processing_ms_total / audio_seconds:.3f} ms")
+
+    if mismatches:
+        for seed, expected, found in mismatches:
+            print(f"conversation {seed}: expected {expected} utterances, found {found}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark of a Sarvam voice turn: the old serial path (wait for the whole
+answer, translate it, synthesize it) against the sentence pipeline, where
+translation and TTS of each sentence overlap with generation.
+
+The LLM is replaced by a fake token stream with a fixed per-token delay and
+Sarvam by the local fake server with configurable latencies. Reports time
+to first audio and total turn time.
+
+Run from the server/ directory:
+    python -m benchmarks.voice_pipeline --turns 20 --token-delay 0.02
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ.setdefault("GOOGLE_API_KEY", "fake-key")
+os.environ.setdefault("SARVAM_API_KEY", "fake-key")
+
+ANSWER = (
+    "The navy cotton kurta is available in sizes S to XXL. "
+    "It has a hand block print and is machine washable. "
+    "Delivery to Pune usually takes two to three days. "
+    "You can return it within fifteen days if the size does not fit. "
+    "Would you like me to add it to your cart?"
+)
+
+
+async def fake_tokens(token_delay: float):
+    # Roughly word-sized tokens, like a streaming chat model
+    for word in ANSWER.split(" "):
+        await asyncio.sleep(token_delay)
+        yield word + " "
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    parser.add_argument("--tts-latency", type=float, default=0.4)
+    parser.add_argument("--translate-latency", type=float, default=0.15)
+    args = parser.parse_args()
+
+    from benchmarks.fake_sarvam import FakeSarvam
+
+    fake = FakeSarvam({"tts": args.tts_latency, "translate": args.translate_latency})
+    os.environ["SARVAM_BASE_URL"] = await fake.start()
+
+    from app.services.sarvam_service import SarvamService
+    from app.services.voice_pipeline import run_sentence_pipeline
+
+    service = SarvamService()
+    language, voice = "hindi", "anushka"
+
+    async def serial_turn():
+        start = time.perf_counter()
+        text = "".join([token async for token in fake_tokens(args.token_delay)])
+        translated = await service.translate_text(text, "english", language)
+        await service.text_to_speech(translated, language, voice)
+        elapsed = time.perf_counter() - start
+        return elapsed, elapsed
+
+    async def pipelined_turn():
+        start = time.perf_counter()
+        first_audio = None
+
+        async def synthesize(sentence):
+            translated = await service.translate_text(sentence, "english", language)
+            return await service.text_to_speech(translated, language, voice)
+
+        async def emit(index, sentence, audio):
+            nonlocal first_audio
+            if first_audio is None:
+                first_audio = time.perf_counter() - start
+
+        await run_sentence_pipeline(fake_tokens(args.token_delay), synthesize, emit)
+        return first_audio, time.perf_counter() - start
+
+    try:
+        print(f"{'mode':<11}{'first audio p50 (ms)':>22}{'turn p50 (ms)':>15}")
+        for name, turn in (("serial", serial_turn), ("pipelined", pipelined_turn)):
+            results = [await turn() for _ in range(args.turns)]
+            print(
+                f"{name:<11}{statistics.median(r[0] for r in results) * 1000:>22.0f}"
+                f"{statistics.median(r[1] for r in results) * 1000:>15.0f}"
+            )
+    finally:
+        await service.close()
+        await fake.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,204 @@
+"""
+Multi-worker check that Sarvam voice sessions survive a reconnect.
+
+Starts one shared Redis (fakeredis over TCP), the fake Sarvam API and two
+separate uvicorn worker processes. The agent's LLM in each worker is
+replaced by a stub that reports how much conversation history it was
+given. The steps are:
+
+1. A client talks to worker A, completes one turn and disconnects.
+2. The client reconnects to worker B with the resumeId it was given.
+3. The second turn is checked: it must see the first turn's history, and
+   the session message must report a resumed session on another worker.
+4. The per-worker admission limit is checked by opening one connection
+   more than the limit allows.
+
+Run from the server/ directory (needs `pip install fakeredis`):
+    python -m benchmarks.voice_reconnect
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+
+import aiohttp
+import numpy as np
+
+os.environ.setdefault("GOOGLE_API_KEY", "fake-key")
+os.environ.setdefault("SARVAM_API_KEY", "fake-key")
+
+MAX_CONNECTIONS_PER_WORKER = 2
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve_worker(port: int) -> None:
+    """Worker process: the real app with a history-counting stub as the LLM."""
+    from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+    from langchain_core.messages import AIMessage
+    from langchain_core.outputs import ChatGeneration, ChatResult
+
+    class HistoryEchoModel(GenericFakeChatModel):
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            earlier = len(messages) - 1
+            reply = AIMessage(content=f"I can see {earlier} earlier messages in this conversation.")
+            return ChatResult(generations=[ChatGeneration(message=reply)])
+
+    import uvicorn
+
+    from app.agent import nodes
+    nodes.llm = HistoryEchoModel(messages=iter(()))
+
+    from app.main import app
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def utterance_frames(seed: int):
+    """One spoken utterance as binary PCM frames, followed by trailing silence."""
+    from app.services.audio_protocol import FRAME_PCM16, encode_frame
+    from benchmarks.synthetic_pcm import chunks, silence, speech
+
+    rng = np.random.default_rng(seed)
+    pcm = np.concatenate([silence(0.3, rng), speech(1.2, rng), silence(0.9, rng)])
+    return [encode_frame(FRAME_PCM16, i, chunk) for i, chunk in enumerate(chunks(pcm))]
+
+
+async def voice_turn(session: aiohttp.ClientSession, port: int, resume_id=None, seed: int = 0) -> dict:
+    """Connects, speaks one utterance and returns the session info and the answer."""
+    from app.services.audio_protocol import BINARY_AUDIO_FORMAT
+
+    url = f"http://127.0.0.1:{port}/ws/v1/sarvam-live-chat"
+    result = {}
+    async with session.ws_connect(url) as ws:
+        await ws.receive_json()  # languages
+        await ws.send_json({"config": {
+            "language": "english",
+            "audioFormat": BINARY_AUDIO_FORMAT,
+            "resumeId": resume_id,
+        }})
+        for frame in utterance_frames(seed):
+            await ws.send_bytes(frame)
+        await ws.send_json({"type": "audio_end"})
+
+        async for message in ws:
+            if message.type != aiohttp.WSMsgType.TEXT:
+                continue  # Binary TTS audio
+            data = json.loads(message.data)
+            if data["type"] == "session":
+                result["session"] = data
+            elif data["type"] == "ai_response":
+                result["answer"] = data["text"]
+                break
+            elif data["type"] == "error":
+                raise RuntimeError(data["message"])
+    return result
+
+
+async def check_admission(session: aiohttp.ClientSession, port: int) -> dict:
+    """Holds the allowed number of sockets open, then opens one more."""
+    url = f"http://127.0.0.1:{port}/ws/v1/sarvam-live-chat"
+    held = [await session.ws_connect(url) for _ in range(MAX_CONNECTIONS_PER_WORKER)]
+    for ws in held:
+        await ws.receive_json()  # languages: the connection was admitted
+
+    extra = await session.ws_connect(url)
+    refusal = await extra.receive_json()
+    await extra.receive()
+    result = {"refusal": refusal, "close_code": extra.close_code}
+    for ws in held:
+        await ws.close()
+    return result
+
+
+async def wait_until_up(session: aiohttp.ClientSession, port: int, timeout: float = 60) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        try:
+            async with session.get(f"http://127.0.0.1:{port}/"):
+                return
+        except aiohttp.ClientError:
+            if asyncio.get_running_loop().time() > deadline:
+                raise
+            await asyncio.sleep(0.5)
+
+
+async def main():
+    from fakeredis import TcpFakeServer
+
+    from benchmarks.fake_sarvam import FakeSarvam
+
+    redis_port = free_port()
+    redis_server = TcpFakeServer(("127.0.0.1", redis_port), server_type="redis")
+    threading.Thread(target=redis_server.serve_forever, daemon=True).start()
+
+    fake = FakeSarvam()
+    tts_cache_dir = tempfile.mkdtemp()
+    env = {
+        **os.environ,
+        "REDIS_URL": f"redis://127.0.0.1:{redis_port}",
+        "SARVAM_BASE_URL": await fake.start(),
+        "VOICE_MAX_CONNECTIONS_PER_WORKER": str(MAX_CONNECTIONS_PER_WORKER),
+        "TTS_CACHE_DIR": tts_cache_dir,
+    }
+    ports = [free_port(), free_port()]
+    workers = [
+        subprocess.Popen([sys.executable, "-m", "benchmarks.voice_reconnect", "--serve", str(port)], env=env)
+        for port in ports
+    ]
+
+    try:
+        async with aiohttp.ClientSession() as session:
+            for port in ports:
+                await wait_until_up(session, port)
+
+            first = await voice_turn(session, ports[0], seed=1)
+            resume_id = first["session"]["resumeId"]
+            print(f"worker A {first['session']['worker']}: resumed={first['session']['resumed']} -> {first['answer']!r}")
+
+            second = await voice_turn(session, ports[1], resume_id=resume_id, seed=2)
+            print(f"worker B {second['session']['worker']}: resumed={second['session']['resumed']} "
+                  f"turns={second['session']['turns']} -> {second['answer']!r}")
+
+            admission = await check_admission(session, ports[0])
+            print(f"connection {MAX_CONNECTIONS_PER_WORKER + 1} on worker A: "
+                  f"{admission['refusal']['message']!r}, close code {admission['close_code']}")
+
+        checks = {
+            "different workers": first["session"]["worker"] != second["session"]["worker"],
+            "session resumed": second["session"]["resumed"] and second["session"]["resumeId"] == resume_id,
+            "turn count carried over": second["session"]["turns"] == 1,
+            "first turn had no history": "see 0 earlier" in first["answer"],
+            "second turn saw the first": "see 2 earlier" in second["answer"],
+            "over-limit socket refused": admission["close_code"] == 1013 and admission["refusal"]["retryable"],
+        }
+        for name, passed in checks.items():
+            print(f"{'PASS' if passed else 'FAIL'}  {name}")
+        if not all(checks.values()):
+            sys.exit(1)
+    finally:
+        for worker in workers:
+            worker.terminate()
+            worker.wait()
+        await fake.stop()
+        redis_server.shutdown()
+        shutil.rmtree(tts_cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        serve_worker(args.serve)
+    else:
+        asyncio.run(main())
@@ -0,0 +1,128 @@
+"""
+Benchmark of the Tavily web search client against a local fake Tavily.
+
+A workload of repeated and new questions (a few popular queries asked
+often, a long tail asked once) goes through:
+
+- legacy tool: what get_web_search_tool used to do, a new client per
+  search asking for 5 results plus a generated answer, raw page content
+  and images, of which the node used the top 3 snippets
+- client, no cache: the pooled client asking only for the used fields;
+  identical searches in flight at the same time are still shared
+- client: the same with the TTL query cache and in-flight sharing
+- client + raw content: full page text, trimmed to the token budget
+
+Reports latency per search, bytes received per search, the context size
+handed to the LLM, and how many searches reached Tavily.
+
+Run from the server/ directory:
+    python -m benchmarks.web_search --requests 300 --concurrency 16
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+
+os.environ.setdefault("GOOGLE_API_KEY", "fake-key")
+
+import aiohttp
+
+from app.agent.nodes import _format_search_results
+from app.core.session import estimate_tokens
+from app.tools.web_search import WebSearchClient
+from benchmarks.fake_tavily import FakeTavily
+
+TOPICS = ["cotton kurta prices", "silk saree trends", "monsoon sale dates", "festive lehenga colours",
+          "linen shirt demand", "handloom export rules", "wedding season footwear", "khadi store openings"]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def make_workload(requests: int, seed: int = 0):
+    """Zipf-like: a handful of popular questions, phrased slightly differently, plus one-off ones."""
+    rng = random.Random(seed)
+    popular = [f"What are the latest {topic}?" for topic in TOPICS]
+    workload = []
+    for i in range(requests):
+        if rng.random() < 0.6:
+            query = popular[min(int(rng.paretovariate(1.2)) - 1, len(popular) - 1)]
+            workload.append(query.lower() if rng.random() < 0.3 else query)
+        else:
+            workload.append(f"latest news on {rng.choice(TOPICS)} in city {i}")
+    return workload
+
+
+class LegacyTool:
+    """A fresh session and the old request for every search, like TavilySearchResults."""
+
+    def __init__(self, base_url: str):
+        self.url = f"{base_url}/search"
+        self.response_bytes = 0
+
+    async def ainvoke(self, payload):
+        request = {"query": payload["query"], "max_results": 5, "include_answer": True,
+                   "include_raw_content": True, "include_images": True}
+        async with aiohttp.ClientSession() as session:
+            async with session.post(self.url, json=request) as response:
+                raw = await response.read()
+                self.response_bytes += len(raw)
+                body = await response.json()
+        return [{"url": r["url"], "content": r["content"]} for r in body["results"]]
+
+
+async def run(tool, workload, concurrency: int):
+    queue: asyncio.Queue = asyncio.Queue()
+    for query in workload:
+        queue.put_nowait(query)
+    latencies, context_tokens = [], []
+
+    async def worker():
+        while not queue.empty():
+            query = queue.get_nowait()
+            start = time.perf_counter()
+            results = await tool.ainvoke({"query": query})
+            latencies.append(time.perf_counter() - start)
+            context_tokens.append(estimate_tokens(_format_search_results(results)))
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, context_tokens
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    fake = FakeTavily()
+    base_url = await fake.start()
+    workload = make_workload(args.requests)
+    print(f"{len(workload)} searches ({len(set(workload))} distinct), concurrency {args.concurrency}\n")
+    print(f"{'mode':<24}{'p50 (ms)':>10}{'p99 (ms)':>10}{'KB/search':>11}{'ctx tokens':>12}{'to Tavily':>11}")
+
+    modes = [
+        ("legacy tool", lambda: LegacyTool(base_url)),
+        ("client, no cache", lambda: WebSearchClient(url=f"{base_url}/search", ttl_seconds=0)),
+        ("client", lambda: WebSearchClient(url=f"{base_url}/search")),
+        ("client + raw content", lambda: WebSearchClient(url=f"{base_url}/search", include_raw_content=True)),
+    ]
+    for name, make_tool in modes:
+        tool = make_tool()
+        calls_before = fake.calls
+        latencies, context_tokens = await run(tool, workload, args.concurrency)
+        calls = fake.calls - calls_before
+        response_bytes = tool.response_bytes if isinstance(tool, LegacyTool) else tool.stats.response_bytes
+        print(f"{name:<24}{percentile(latencies, 50) * 1000:>10.0f}{percentile(latencies, 99) * 1000:>10.0f}"
+              f"{response_bytes / max(calls, 1) / 1024:>11.1f}{percentile(context_tokens, 50):>12}{calls:>11}")
+        if isinstance(tool, WebSearchClient):
+            await tool.close()
+
+    await fake.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
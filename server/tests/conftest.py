@@ -0,0 +1,4 @@
+import os
+
+# Settings require a key; nothing in the tests calls Google
+os.environ.setdefault("GOOGLE_API_KEY", "fake-key")
@@ -0,0 +1,80 @@
+import asyncio
+import base64
+import json
+
+import pytest
+
+from app.services.audio_protocol import (
+    FRAME_ENCODED,
+    FRAME_HEADER,
+    FRAME_PCM16,
+    AudioTransport,
+    FrameError,
+    decode_frame,
+    encode_frame,
+)
+
+
+class FakeWebSocket:
+    def __init__(self, incoming=()):
+        self.incoming = list(incoming)
+        self.sent = []
+
+    async def receive(self):
+        return self.incoming.pop(0)
+
+    async def send_text(self, text):
+        self.sent.append(text)
+
+    async def send_bytes(self, data):
+        self.sent.append(data)
+
+
+def test_frame_round_trip():
+    frame = encode_frame(FRAME_PCM16, 7, b"\x01\x02")
+    assert len(frame) == FRAME_HEADER.size + 2
+    assert decode_frame(frame) == (FRAME_PCM16, 7, b"\x01\x02")
+
+
+def test_sequence_wraps_at_32_bits():
+    assert decode_frame(encode_frame(FRAME_PCM16, 2 ** 32 + 3, b""))[1] == 3
+
+
+def test_bad_frames_are_rejected():
+    with pytest.raises(FrameError):
+        decode_frame(b"\x01\x01")
+    with pytest.raises(FrameError):
+        decode_frame(b"\x09" + encode_frame(FRAME_PCM16, 0, b"")[1:])
+
+
+def test_receive_both_formats_and_count_gaps():
+    websocket = FakeWebSocket([
+        {"type": "websocket.receive", "bytes": encode_frame(FRAME_PCM16, 0, b"ab")},
+        {"type": "websocket.receive", "bytes": encode_frame(FRAME_PCM16, 2, b"cd")},
+        {"type": "websocket.receive", "text": json.dumps({"audio_chunk": base64.b64encode(b"ef").decode()})},
+        {"type": "websocket.receive", "text": json.dumps({"type": "audio_end"})},
+    ])
+    transport = AudioTransport(websocket, binary=True)
+
+    async def receive_all():
+        return [await transport.receive() for _ in range(4)]
+
+    received = asyncio.run(receive_all())
+    assert [audio for audio, _ in received] == [b"ab", b"cd", b"ef", None]
+    assert received[3][1] == {"type": "audio_end"}
+    assert transport.stats.sequence_gaps == 1
+    assert transport.stats.audio_bytes_in == 6
+
+
+def test_send_audio_in_the_negotiated_format():
+    binary, legacy = FakeWebSocket(), FakeWebSocket()
+    asyncio.run(AudioTransport(binary, binary=True).send_audio(b"wav", frame_type=FRAME_ENCODED, index=0))
+    asyncio.run(AudioTransport(legacy).send_audio(b"wav", index=0))
+
+    assert decode_frame(binary.sent[0]) == (FRAME_ENCODED, 0, b"wav")
+    assert json.loads(legacy.sent[0]) == {"index": 0, "audio_chunk": base64.b64encode(b"wav").decode()}
+
+
+def test_wants_binary():
+    assert AudioTransport.wants_binary({"audioFormat": "binary-v1"})
+    assert not AudioTransport.wants_binary({})
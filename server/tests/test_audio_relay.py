@@ -0,0 +1,56 @@
+import asyncio
+
+from app.services.audio_relay import AudioQueue, DirectionStats
+
+
+def drain(queue):
+    async def get_all():
+        frames = []
+        while queue.queued_bytes:
+            frames.append(await queue.get())
+        return frames
+    return asyncio.run(get_all())
+
+
+def test_backlog_is_merged_up_to_merge_bytes():
+    queue = AudioQueue(DirectionStats(), max_bytes=100, merge_bytes=4)
+    for chunk in (b"ab", b"cd", b"ef"):
+        queue.put_nowait(chunk)
+    assert drain(queue) == [b"abcd", b"ef"]
+    assert queue.stats.merged_frames == 1
+    assert queue.stats.frames_out == 2
+
+
+def test_oldest_audio_is_dropped_over_the_limit():
+    queue = AudioQueue(DirectionStats(), max_bytes=4, merge_bytes=2)
+    for chunk in (b"ab", b"cd", b"ef"):
+        queue.put_nowait(chunk)
+    assert drain(queue) == [b"cd", b"ef"]
+    assert (queue.stats.dropped_frames, queue.stats.dropped_bytes) == (1, 2)
+    assert queue.stats.peak_queued_bytes == 4
+
+
+def test_newest_audio_is_dropped_when_asked():
+    queue = AudioQueue(DirectionStats(), max_bytes=4, merge_bytes=2, drop="newest")
+    for chunk in (b"ab", b"cd", b"ef"):
+        queue.put_nowait(chunk)
+    assert drain(queue) == [b"ab", b"cd"]
+    assert queue.stats.dropped_frames == 1
+
+
+def test_a_single_oversized_frame_is_kept():
+    queue = AudioQueue(DirectionStats(), max_bytes=2, merge_bytes=2)
+    queue.put_nowait(b"abcdef")
+    assert drain(queue) == [b"abcdef"]
+
+
+def test_get_waits_for_audio():
+    async def run():
+        queue = AudioQueue(DirectionStats(), max_bytes=100, merge_bytes=10)
+        getter = asyncio.create_task(queue.get())
+        await asyncio.sleep(0)
+        assert not getter.done()
+        queue.put_nowait(b"ab")
+        return await asyncio.wait_for(getter, 1)
+
+    assert asyncio.run(run()) == b"ab"
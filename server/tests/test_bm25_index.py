@@ -0,0 +1,77 @@
+from langchain_core.documents import Document
+
+from app.services.bm25_index import BM25Index, SessionKeywordIndex, reciprocal_rank_fusion, tokenize
+
+
+def test_tokenize_keeps_codes_whole_and_by_parts():
+    assert tokenize("Kurta SKU-1234, size XL/42") == ["kurta", "sku-1234", "sku", "1234", "size", "xl/42", "xl", "42"]
+
+
+def test_rare_term_ranks_first():
+    index = BM25Index()
+    index.add(
+        ["a", "b", "c"],
+        [
+            Document(page_content="cotton shirt in blue"),
+            Document(page_content="cotton shirt in red, model sku-981"),
+            Document(page_content="cotton trousers in blue"),
+        ],
+    )
+    hits = index.search("sku-981 cotton", k=3)
+    assert [doc_id for doc_id, _, _ in hits][0] == "b"
+    assert index.search("linen", k=3) == []
+
+
+def test_add_skips_known_ids():
+    index = BM25Index()
+    index.add(["a"], [Document(page_content="silk saree")])
+    index.add(["a", "b"], [Document(page_content="silk saree"), Document(page_content="silk dupatta")])
+    assert len(index) == 2
+
+
+class Loader:
+    def __init__(self):
+        self.calls = 0
+        self.texts = ["red shirt"]
+
+    def __call__(self, session_id):
+        self.calls += 1
+        return [f"{session_id}-{i}" for i in range(len(self.texts))], [Document(page_content=t) for t in self.texts]
+
+
+def test_session_index_is_loaded_once():
+    loader = Loader()
+    index = SessionKeywordIndex(loader=loader)
+    index.search("s1", "shirt", 5, version=1)
+    index.search("s1", "shirt", 5, version=1)
+    index.search("s1", "shirt", 5)
+    assert loader.calls == 1
+
+
+def test_session_index_is_rebuilt_for_a_new_version():
+    # Another worker ingested a file: the index in memory is stale
+    loader = Loader()
+    index = SessionKeywordIndex(loader=loader)
+    assert len(index.search("s1", "shirt", 5, version=1)) == 1
+    loader.texts.append("blue shirt")
+    assert len(index.search("s1", "shirt", 5, version=1)) == 1
+    assert len(index.search("s1", "shirt", 5, version=2)) == 2
+    assert loader.calls == 2
+
+
+def test_session_index_evicts_least_recent():
+    loader = Loader()
+    index = SessionKeywordIndex(loader=loader, max_sessions=2)
+    for session_id in ("s1", "s2", "s1", "s3"):
+        index.search(session_id, "shirt", 5)
+    index.search("s1", "shirt", 5)
+    assert loader.calls == 3
+    index.search("s2", "shirt", 5)
+    assert loader.calls == 4
+
+
+def test_rrf_prefers_documents_in_both_lists():
+    a, b, c = (Document(page_content=t) for t in "abc")
+    fused = reciprocal_rank_fusion([[("a", a), ("b", b)], [("c", c), ("b", b)]], k=3)
+    assert fused[0] is b
+    assert set(d.page_content for d in fused) == {"a", "b", "c"}
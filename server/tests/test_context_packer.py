@@ -0,0 +1,93 @@
+from langchain_core.documents import Document
+
+from app.core.session import estimate_tokens
+from app.services.context_packer import ContextPacker, citation, merge_overlapping, trim_to_budget
+
+SHARED = "The return window is fifteen days from the date of delivery for all items. "
+
+
+def doc(text, source, page=None, **metadata):
+    if page is not None:
+        metadata["page"] = page
+    return Document(page_content=text, metadata={"source": source, **metadata})
+
+
+def test_merge_keeps_rank_of_best_chunk():
+    a = doc("Returns policy. " + SHARED, "x.pdf", 0)
+    b = doc("Delivery takes two working days in Jaipur and Delhi.", "y.pdf", 0)
+    c = doc(SHARED + "Refunds reach the original payment method.", "x.pdf", 1)
+
+    merged = merge_overlapping([a, b, c], min_chars=40)
+
+    assert [d.metadata["source"] for d in merged] == ["x.pdf", "y.pdf"]
+    assert merged[0].page_content == "Returns policy. " + SHARED + "Refunds reach the original payment method."
+    assert merged[0].metadata["pages"] == [0, 1]
+    assert merged[1] is b
+
+
+def test_merge_chains_through_a_later_chunk():
+    # c bridges a and b; all three end up in a's slot
+    a = doc("Alpha section text about silk care and storage in muslin cloth.", "x.pdf", 0)
+    b = doc("Gamma section text on dry cleaning only, never machine wash.", "x.pdf", 2)
+    c = doc("storage in muslin cloth. Beta section: Gamma section text on dry cleaning", "x.pdf", 1)
+    other = doc("Unrelated web text.", "https://example.com", web=True)
+
+    merged = merge_overlapping([a, other, b, c], min_chars=20)
+
+    assert len(merged) == 2
+    assert merged[1] is other
+    assert merged[0].page_content.startswith("Alpha section")
+    assert merged[0].page_content.endswith("never machine wash.")
+    assert merged[0].metadata["pages"] == [0, 1, 2]
+
+
+def test_merge_leaves_other_sources_alone():
+    a = doc(SHARED, "x.pdf", 0)
+    b = doc(SHARED, "y.pdf", 0)
+    assert merge_overlapping([a, b], min_chars=40) == [a, b]
+
+
+def test_contained_chunk_is_dropped():
+    a = doc("Intro. " + SHARED + "Outro.", "x.pdf", 0)
+    b = doc(SHARED, "x.pdf", 0)
+    merged = merge_overlapping([a, b], min_chars=40)
+    assert [d.page_content for d in merged] == [a.page_content]
+
+
+def test_trim_keeps_matching_sentences_in_order():
+    text = ("Our stores open at ten in the morning on weekdays. Returns are accepted within fifteen days of delivery. "
+            "Parking is free for customers on Sundays. Refunds for returns take five working days to arrive.")
+    trimmed = trim_to_budget(text, "how do returns work", max_tokens=30)
+    assert trimmed == ("Returns are accepted within fifteen days of delivery. "
+                       "Refunds for returns take five working days to arrive.")
+
+
+def test_trim_leaves_short_text_alone():
+    assert trim_to_budget("Short text.", "anything", max_tokens=30) == "Short text."
+
+
+def test_pack_respects_budget_and_numbers_passages():
+    packer = ContextPacker(budgets={"rag_retrieval": 40}, default_budget=40)
+    docs = [doc(f"Passage {i} about returns and refunds. " * 4, f"file{i}.pdf", i) for i in range(5)]
+
+    packed = packer.pack("returns", docs, route="rag_retrieval")
+
+    # The budget covers passage text; citation headers come on top
+    bodies = [passage.split("\n", 1)[1] for passage in packed.text.split("\n\n")]
+    assert sum(estimate_tokens(body) for body in bodies) <= 40
+    assert len(packed.citations) == len(bodies) < len(docs)
+    assert packed.text.startswith("[1] ")
+    assert packed.citations[0] == "file0.pdf p.1"
+    assert packer.stats.packs == 1
+
+
+def test_citation_uses_uploaded_file_name():
+    chunk = doc("text", "temp_uploads/3f2a9c.pdf", 2, filename="Store Handbook.pdf")
+    assert citation(chunk) == "Store Handbook.pdf p.3"
+    merged = doc("text", "temp_uploads/3f2a9c.pdf", filename="Store Handbook.pdf", pages=[0, 1])
+    assert citation(merged) == "Store Handbook.pdf p.1-2"
+
+
+def test_citation_falls_back_to_source():
+    assert citation(doc("text", "temp_uploads/3f2a9c.txt")) == "3f2a9c.txt"
+    assert citation(doc("text", "https://example.com/a", web=True)) == "Web: https://example.com/a"
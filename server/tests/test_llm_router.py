@@ -0,0 +1,71 @@
+from langchain_core.messages import HumanMessage
+
+from app.services.llm_router import CircuitBreaker, ProviderStats, classify_task
+
+
+def opened_long_ago(breaker):
+    breaker.opened_at -= breaker.reset_seconds + 1
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failures=3, reset_seconds=30)
+    for _ in range(2):
+        breaker.record_failure()
+    breaker.record_success()
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert breaker.trips == 1
+
+
+def test_half_open_lets_one_trial_through():
+    breaker = CircuitBreaker(failures=1, reset_seconds=30)
+    breaker.record_failure()
+    opened_long_ago(breaker)
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_failed_trial_opens_again():
+    breaker = CircuitBreaker(failures=1, reset_seconds=30)
+    breaker.record_failure()
+    opened_long_ago(breaker)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.trips == 1
+
+
+def test_abandoned_trial_frees_the_slot():
+    breaker = CircuitBreaker(failures=1, reset_seconds=30)
+    breaker.record_failure()
+    opened_long_ago(breaker)
+    assert breaker.allow()
+    breaker.abandon()
+    assert breaker.allow()
+
+
+def test_stream_failure_after_success_is_counted_once():
+    stats = ProviderStats()
+    stats.record(True, "stream", 0.2)
+    stats.mark_failed()
+    assert (stats.calls, stats.errors, stats.error_rate) == (1, 1, 1.0)
+    assert len(stats.latencies["stream"]) == 1
+    assert len(stats.latencies["generate"]) == 0
+
+
+def test_classify_task():
+    def task(text):
+        return classify_task([HumanMessage(content=text)])
+
+    assert task("there is a bug in my python script") == "code"
+    assert task("I got a payment error at checkout") == "chat"
+    assert task("my promo code does not work") == "chat"
+    assert task("write a slogan for our sale") == "creative"
+    assert task("show me the scripture book") == "chat"
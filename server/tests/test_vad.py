@@ -0,0 +1,68 @@
+import io
+import wave
+
+import numpy as np
+
+from app.services.vad import PCMRingBuffer, UtteranceSegmenter, VADStats, pcm_to_wav
+from benchmarks.synthetic_pcm import SAMPLE_RATE, chunks, click, conversation, silence, speech
+
+
+def segment(pcm, stats=None):
+    segmenter = UtteranceSegmenter(sample_rate=SAMPLE_RATE, stats=stats or VADStats())
+    utterances = []
+    for chunk in chunks(pcm):
+        utterances.extend(segmenter.feed(chunk))
+    return segmenter, utterances
+
+
+def test_finds_every_utterance_of_a_conversation():
+    for seed in range(3):
+        pcm, expected = conversation(6, seed=seed)
+        segmenter, utterances = segment(pcm)
+        utterances.extend(segmenter.flush())
+        assert len(utterances) == expected
+
+
+def test_silence_and_clicks_are_never_sent():
+    rng = np.random.default_rng(0)
+    stats = VADStats()
+    pcm = np.concatenate([silence(1.0, rng), click(rng), silence(1.0, rng)])
+    segmenter, utterances = segment(pcm, stats)
+    assert utterances == []
+    assert segmenter.flush() == []
+
+
+def test_utterance_ends_after_the_hangover():
+    rng = np.random.default_rng(1)
+    pcm = np.concatenate([silence(0.5, rng), speech(1.0, rng), silence(1.0, rng)])
+    _, utterances = segment(pcm)
+    assert len(utterances) == 1
+    # Speech plus pre-roll and a short tail, not the trailing second of silence
+    assert 900 < utterances[0].duration_ms < 1500
+    assert utterances[0].endpointing_ms >= 600
+
+
+def test_flush_ends_the_current_utterance():
+    rng = np.random.default_rng(2)
+    pcm = np.concatenate([silence(0.5, rng), speech(1.0, rng)])
+    segmenter, utterances = segment(pcm)
+    assert utterances == []
+    assert len(segmenter.flush()) == 1
+
+
+def test_ring_buffer_keeps_the_newest_samples():
+    buffer = PCMRingBuffer(5)
+    buffer.append(np.arange(3, dtype=np.int16))
+    buffer.append(np.arange(3, 7, dtype=np.int16))
+    assert buffer.to_array().tolist() == [2, 3, 4, 5, 6]
+    buffer.keep_last(2)
+    assert buffer.to_array().tolist() == [5, 6]
+    buffer.append(np.arange(10, dtype=np.int16))
+    assert buffer.to_array().tolist() == [5, 6, 7, 8, 9]
+
+
+def test_pcm_to_wav():
+    pcm = np.arange(160, dtype=np.int16).tobytes()
+    with wave.open(io.BytesIO(pcm_to_wav(pcm)), "rb") as wav:
+        assert (wav.getnchannels(), wav.getsampwidth(), wav.getframerate()) == (1, 2, 16000)
+        assert wav.readframes(160) == pcm
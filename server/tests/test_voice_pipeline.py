@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from app.services.voice_pipeline import SentenceBuffer, run_sentence_pipeline, split_sentences
+
+
+def test_sentences_complete_across_tokens():
+    buffer = SentenceBuffer(min_chars=10)
+    out = []
+    for token in ["The blue kurta ", "is in stock. It ships", " tomorrow from Jaipur. Any", "thing else?"]:
+        out.extend(buffer.feed(token))
+    assert out == ["The blue kurta is in stock.", "It ships tomorrow from Jaipur."]
+    assert buffer.flush() == ["Anything else?"]
+
+
+def test_short_sentences_join_the_next_one():
+    buffer = SentenceBuffer(min_chars=25)
+    assert buffer.feed("Yes. ") == []
+    assert buffer.feed("We have it in medium and large. ") == ["Yes. We have it in medium and large."]
+
+
+def test_short_tail_is_kept_on_flush():
+    buffer = SentenceBuffer(min_chars=25)
+    assert buffer.feed("Sure.") == []
+    assert buffer.flush() == ["Sure."]
+    assert buffer.flush() == []
+
+
+def test_devanagari_and_line_breaks_end_sentences():
+    assert split_sentences("यह कुर्ता उपलब्ध है। कल भेजा जाएगा।\nधन्यवाद", min_chars=1) == [
+        "यह कुर्ता उपलब्ध है।",
+        "कल भेजा जाएगा।",
+        "धन्यवाद",
+    ]
+
+
+def test_split_sentences_matches_streaming():
+    text = "Returns are free. Refunds take five days. Exchanges are instant for store credit."
+    buffer = SentenceBuffer(min_chars=20)
+    streamed = []
+    for i in range(0, len(text), 7):
+        streamed.extend(buffer.feed(text[i:i + 7]))
+    streamed.extend(buffer.flush())
+    assert streamed == split_sentences(text, min_chars=20)
+
+
+def test_failed_turn_closes_the_token_stream():
+    closed = []
+
+    async def tokens():
+        try:
+            # Never awaits: the producer ends up blocked on the full queue
+            for i in range(1000):
+                yield f"Sentence number {i} of the answer. "
+        finally:
+            closed.append(True)
+
+    async def process(sentence):
+        return sentence
+
+    async def emit(index, sentence, result):
+        raise RuntimeError("client went away")
+
+    async def run():
+        with pytest.raises(RuntimeError):
+            await run_sentence_pipeline(tokens(), process, emit, max_in_flight=1)
+        # Before the event loop shuts down and finalises leftover generators
+        return list(closed)
+
+    assert asyncio.run(run()) == [True]